@@ -1,5 +1,6 @@
 from src.db.connection import create_connection
 from src.logic.aula_logic import AulaLogic
+from src.compresion import abrir_salida
 import csv
 
 def consultar_aulas_libres(connection, dia, hora_inicio, hora_fin, campus_code=14, pabellon_codes=None, capacidad_minima=None, output_csv=None):
@@ -68,7 +69,7 @@ def consultar_aulas_libres(connection, dia, hora_inicio, hora_fin, campus_code=1
     
     # Exportar a CSV si se solicita
     if output_csv:
-        with open(output_csv, 'w', newline='', encoding='utf-8') as csvfile:
+        with abrir_salida(output_csv) as csvfile:
             writer = csv.writer(csvfile)
             writer.writerow(['Codigo', 'Nombre', 'Capacidad', 'Pabellon', 'Tiempo_Solicitado_Min', 'Tiempo_Solicitado_Horas', 'Rango_Solicitado', 'Bloque_Libre_Completo'])
             for aula in candidatos:
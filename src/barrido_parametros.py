@@ -0,0 +1,143 @@
+from src.priorizador import prioridad_de
+from src.estrategias_solucion import ESTRATEGIAS, calcular_objetivo
+from src.ranking_liberacion import buscar_candidatas, calcular_score_compatibilidad, clave_candidatas
+from src.compresion import abrir_entrada, abrir_salida
+from concurrent.futures import ProcessPoolExecutor
+import csv
+import itertools
+import json
+import os
+
+# Parámetros que puede variar cada escenario del barrido y su valor por defecto
+PARAMETROS_ESCENARIO = {
+    'pabellones': None,
+    'tolerancia_capacidad': 0,
+    'excluir_aulas': [],
+    'priorizacion': None,
+    'estrategia': 'greedy'
+}
+
+def cargar_escenarios(archivo_json, pabellones_por_defecto):
+    """
+    Lee los escenarios del barrido. El archivo puede ser una lista de escenarios
+    o una grilla {parametro: [valores]} que se expande a todas sus combinaciones
+    """
+    with abrir_entrada(archivo_json) as jsonfile:
+        contenido = json.load(jsonfile)
+
+    if isinstance(contenido, dict):
+        claves = list(contenido)
+        escenarios = [dict(zip(claves, valores)) for valores in itertools.product(*(contenido[c] for c in claves))]
+    else:
+        escenarios = contenido
+
+    for numero, escenario in enumerate(escenarios, 1):
+        for parametro, valor in PARAMETROS_ESCENARIO.items():
+            escenario.setdefault(parametro, valor)
+        if not escenario['pabellones']:
+            escenario['pabellones'] = list(pabellones_por_defecto)
+        if escenario['estrategia'] not in ESTRATEGIAS:
+            raise ValueError(f"Estrategia desconocida en escenario {numero}: {escenario['estrategia']}")
+        escenario.setdefault('nombre', f"E{numero:02d}")
+    return escenarios
+
+# Foto compartida por cada proceso trabajador (se envía una sola vez)
+_foto = None
+
+def _inicializar_trabajador(foto):
+    global _foto
+    _foto = foto
+
+def evaluar_escenario(escenario, foto=None):
+    """
+    Libera en conjunto las aulas de la foto bajo los parámetros del escenario.
+    foto: {'libres_por_pabellon': {p: aulas_libres}, 'ocupaciones_por_aula': [(codigo, ocupaciones)],
+    'tablas_priorizacion': {archivo: tabla}}
+    """
+    foto = foto if foto is not None else _foto
+    liberadas = {codigo for codigo, _ in foto['ocupaciones_por_aula']}
+    excluidas = set(escenario['excluir_aulas']) | liberadas
+
+    aulas_libres = {}
+    for pabellon in escenario['pabellones']:
+        for clave_aula, bloques in foto['libres_por_pabellon'][pabellon].items():
+            if clave_aula[0] not in excluidas:
+                aulas_libres[clave_aula] = bloques
+
+    tabla_priorizacion = foto['tablas_priorizacion'].get(escenario['priorizacion'], {})
+    catalogo = {}
+    todas_las_opciones = []
+    for _, ocupaciones in foto['ocupaciones_por_aula']:
+        for ocupacion in ocupaciones:
+            clave = clave_candidatas(ocupacion)
+            if clave not in catalogo:
+                catalogo[clave] = buscar_candidatas(clave, aulas_libres, calcular_score_compatibilidad, escenario['tolerancia_capacidad'])
+            todas_las_opciones.append({
+                'ocupacion': ocupacion,
+                'prioridad': prioridad_de(tabla_priorizacion, ocupacion.get('CODIGOCURSO', '')),
+                'aulas_candidatas': catalogo[clave]
+            })
+
+    plan = ESTRATEGIAS[escenario['estrategia']](todas_las_opciones)
+    peso_ubicado, _, score_total = calcular_objetivo(plan)
+    movimientos = len(plan['movimientos'])
+
+    return {
+        'escenario': escenario['nombre'],
+        'parametros': escenario,
+        'aulas_disponibles': len(aulas_libres),
+        'ocupaciones': len(todas_las_opciones),
+        'movimientos': movimientos,
+        'conflictos': len(plan['conflictos']),
+        'conflictos_tier_1': sum(1 for c in plan['conflictos'] if c['prioridad']['tier'] == 1),
+        'peso_ubicado': peso_ubicado,
+        'score_promedio': round(score_total / movimientos, 2) if movimientos else 0
+    }
+
+def ejecutar_barrido(escenarios, foto, max_workers=None):
+    """
+    Evalúa todos los escenarios en paralelo contra la misma foto.
+    Retorna los resultados en el orden de los escenarios
+    """
+    max_workers = min(max_workers or os.cpu_count() or 1, max(1, len(escenarios)))
+
+    if max_workers <= 1:
+        return [evaluar_escenario(escenario, foto) for escenario in escenarios]
+
+    print(f"🧮 Evaluando {len(escenarios)} escenarios en {max_workers} procesos")
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_inicializar_trabajador, initargs=(foto,)) as executor:
+        return list(executor.map(evaluar_escenario, escenarios))
+
+def exportar_comparacion(resultados, archivo_csv):
+    """
+    Tabla comparativa de escenarios: parámetros y métricas de cada uno
+    """
+    with abrir_salida(archivo_csv) as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow([
+            'Escenario', 'Pabellones', 'Tolerancia_Capacidad', 'Aulas_Excluidas', 'Priorizacion', 'Estrategia',
+            'Aulas_Disponibles', 'Ocupaciones', 'Movimientos', 'Conflictos', 'Conflictos_Tier_1',
+            'Peso_Ubicado', 'Score_Promedio'
+        ])
+        for resultado in resultados:
+            parametros = resultado['parametros']
+            writer.writerow([
+                resultado['escenario'],
+                ','.join(str(p) for p in parametros['pabellones']),
+                parametros['tolerancia_capacidad'],
+                ','.join(parametros['excluir_aulas']),
+                parametros['priorizacion'] or '',
+                parametros['estrategia'],
+                resultado['aulas_disponibles'],
+                resultado['ocupaciones'],
+                resultado['movimientos'],
+                resultado['conflictos'],
+                resultado['conflictos_tier_1'],
+                resultado['peso_ubicado'],
+                resultado['score_promedio']
+            ])
+
+def mostrar_comparacion(resultados):
+    print(f"\n📊 Comparación de escenarios:")
+    for resultado in resultados:
+        print(f"   {resultado['escenario']:>8} | {resultado['movimientos']} movimientos | {resultado['conflictos']} conflictos ({resultado['conflictos_tier_1']} tier 1) | score {resultado['score_promedio']}")
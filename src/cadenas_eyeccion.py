@@ -0,0 +1,152 @@
+from src.logic.indice_reservas import IndiceReservas, hora_a_minutos
+import bisect
+
+HORA_INICIO_JORNADA = '07:00'
+HORA_FIN_JORNADA = '23:00'
+
+class BuscadorCadenas:
+    """
+    Busca cadenas de reubicación (ejection chains) para ocupaciones sin aula:
+    si una candidata está bloqueada por un único curso de OFERTA, se intenta
+    mover ese curso a otra aula, y así hasta `profundidad_maxima` pasos.
+    Se poda por capacidad (solo aulas con capacidad suficiente) y por cruce
+    de horario contra el índice de ocupación de la base y las reservas del plan.
+    """
+    def __init__(self, aulas_ocupadas, reservas=None, profundidad_maxima=2, ocupaciones_de=None):
+        # aulas_ocupadas: {(codigo, nombre, capacidad): [bloques con origen]} de AulaLogic.fetch_libres_y_ocupados
+        # ocupaciones_de(codigo): ocupaciones del aula (con CAPACIDADMAXIMA), para saber cuánto
+        # necesita realmente el curso que se desplaza; solo se consulta para aulas bloqueadas
+        self.profundidad_maxima = profundidad_maxima
+        self.ocupaciones_de = ocupaciones_de
+        self._requerimientos = {}
+        self.reservas = reservas if reservas is not None else IndiceReservas()
+        self.ocupados = IndiceReservas()
+        self.capacidades = {}
+        for (codigo, _, capacidad), bloques in aulas_ocupadas.items():
+            self.capacidades[codigo] = capacidad or 0
+            for bloque in bloques:
+                self.ocupados.reservar(codigo, bloque['dia'], bloque['inicio'], bloque['fin'], bloque['origen'])
+
+        # Aulas ordenadas por capacidad para podar con búsqueda binaria
+        self.aulas_por_capacidad = sorted((capacidad, codigo) for codigo, capacidad in self.capacidades.items())
+        self.inicio_jornada = hora_a_minutos(HORA_INICIO_JORNADA)
+        self.fin_jornada = hora_a_minutos(HORA_FIN_JORNADA)
+
+    def _requerimiento(self, codigo, dia, ini_min, fin_min):
+        """
+        Capacidad que necesita el curso que ocupa el bloque: su CAPACIDADMAXIMA o,
+        si no se conoce, la capacidad del aula que ocupa
+        """
+        if codigo not in self._requerimientos:
+            requerimientos = {}
+            for ocupacion in (self.ocupaciones_de(codigo) if self.ocupaciones_de else None) or []:
+                capacidad = ocupacion.get('CAPACIDADMAXIMA')
+                if capacidad:
+                    clave = (ocupacion['CODIGODIA'], hora_a_minutos(ocupacion['HORAINICIO']), hora_a_minutos(ocupacion['HORAFIN']))
+                    requerimientos[clave] = int(capacidad)
+            self._requerimientos[codigo] = requerimientos
+        return self._requerimientos[codigo].get((dia, ini_min, fin_min), self.capacidades[codigo])
+
+    def _aulas_con_capacidad(self, capacidad_requerida):
+        inicio = bisect.bisect_left(self.aulas_por_capacidad, (capacidad_requerida, ''))
+        return [codigo for _, codigo in self.aulas_por_capacidad[inicio:]]
+
+    def _reubicar(self, bloque, profundidad, visitadas, excluidas):
+        """
+        Retorna la lista ordenada de pasos que ubican `bloque` en alguna aula, o None
+        """
+        dia, inicio, fin = bloque['dia'], bloque['inicio'], bloque['fin']
+        if hora_a_minutos(inicio) < self.inicio_jornada or hora_a_minutos(fin) > self.fin_jornada:
+            return None
+
+        bloqueadas = []
+        for codigo in self._aulas_con_capacidad(bloque['capacidad']):
+            if codigo in visitadas or codigo in excluidas:
+                continue
+            if not self.reservas.esta_libre(codigo, dia, inicio, fin):
+                continue
+
+            cruces = self.ocupados.cruces(codigo, dia, inicio, fin)
+            if not cruces:
+                return [self._paso(bloque, codigo)]
+            # Solo se desplaza un único curso de OFERTA (no cargas no lectivas ni separaciones)
+            if len(cruces) == 1 and cruces[0][2] == 'OFERTA':
+                bloqueadas.append((codigo, cruces[0]))
+
+        if profundidad == 0:
+            return None
+
+        for codigo, (ini_min, fin_min, origen) in bloqueadas:
+            ocupante = {
+                'aula_origen': codigo,
+                'dia': dia,
+                'inicio': f"{ini_min // 60:02d}:{ini_min % 60:02d}",
+                'fin': f"{fin_min // 60:02d}:{fin_min % 60:02d}",
+                'capacidad': self._requerimiento(codigo, dia, ini_min, fin_min),
+                'origen': origen,
+                'curso': None
+            }
+            sub_cadena = self._reubicar(ocupante, profundidad - 1, visitadas | {codigo}, excluidas)
+            if sub_cadena is not None:
+                return sub_cadena + [self._paso(bloque, codigo)]
+
+        return None
+
+    def _paso(self, bloque, aula_destino):
+        return {
+            'aula_origen': bloque['aula_origen'],
+            'aula_destino': aula_destino,
+            'dia': bloque['dia'],
+            'hora_inicio': bloque['inicio'],
+            'hora_fin': bloque['fin'],
+            'origen': bloque['origen'],
+            'curso': bloque['curso']
+        }
+
+    def buscar(self, ocupacion, aula_origen, excluir_aulas=None):
+        """
+        Busca la cadena más corta (profundización iterativa) para ubicar la ocupación
+        """
+        capacidad_raw = ocupacion.get('CAPACIDADMAXIMA')
+        bloque = {
+            'aula_origen': aula_origen,
+            'dia': ocupacion['CODIGODIA'],
+            'inicio': ocupacion['HORAINICIO'],
+            'fin': ocupacion['HORAFIN'],
+            'capacidad': int(capacidad_raw) if capacidad_raw else 0,
+            'origen': ocupacion.get('ORIGEN', 'OFERTA'),
+            'curso': ocupacion.get('NOMBRE_CURSO', '')
+        }
+        excluidas = set(excluir_aulas or []) | {aula_origen}
+
+        for profundidad in range(1, self.profundidad_maxima + 1):
+            cadena = self._reubicar(bloque, profundidad, set(), excluidas)
+            if cadena is not None:
+                return cadena
+        return None
+
+    def aplicar(self, cadena):
+        """
+        Registra la cadena aceptada: los cursos desplazados dejan su aula y todos los
+        pasos quedan reservados en su destino (ya no se vuelven a mover)
+        """
+        for paso in cadena:
+            if paso['curso'] is None:
+                self.ocupados.liberar(paso['aula_origen'], paso['dia'], paso['hora_inicio'], paso['hora_fin'], paso['origen'])
+            self.reservas.reservar(paso['aula_destino'], paso['dia'], paso['hora_inicio'], paso['hora_fin'], paso['curso'])
+
+def proponer_cadenas(buscador, plan_movimientos, aula_origen, tipos=('SIN_AULAS_DISPONIBLES', 'SIN_DESTINO'), excluir_aulas=None):
+    """
+    Recorre los conflictos sin aulas disponibles y adjunta a cada uno la cadena de
+    movimientos propuesta (campo 'cadena'). Retorna la cantidad de cadenas encontradas
+    """
+    encontradas = 0
+    for conflicto in plan_movimientos['conflictos']:
+        if conflicto['tipo'] not in tipos:
+            continue
+        cadena = buscador.buscar(conflicto['ocupacion'], aula_origen, excluir_aulas)
+        if cadena:
+            buscador.aplicar(cadena)
+            conflicto['cadena'] = cadena
+            encontradas += 1
+    return encontradas
@@ -0,0 +1,146 @@
+from src.barrido_parametros import evaluar_escenario
+from concurrent.futures import ProcessPoolExecutor
+import json
+import os
+import socket
+import time
+
+# Cola de escenarios sobre un directorio compartido (carpeta de red o local), sin broker:
+#   <cola>/foto.json          foto de datos que usan todos los trabajadores
+#   <cola>/pendientes/        un JSON por escenario, en espera
+#   <cola>/en_proceso/        escenarios tomados (renombrados) por un trabajador
+#   <cola>/resultados/        un JSON por escenario terminado
+#   <cola>/fallidos/          escenarios que lanzaron error, con el mensaje
+# Tomar un escenario es un os.rename de pendientes/ a en_proceso/, que es atómico:
+# si dos trabajadores lo intentan a la vez, solo uno lo consigue.
+
+CARPETAS_COLA = ('pendientes', 'en_proceso', 'resultados', 'fallidos')
+
+def _escribir_json(ruta, contenido):
+    # Escritura atómica: nadie lee un archivo a medio escribir
+    temporal = f"{ruta}.tmp"
+    with open(temporal, 'w', encoding='utf-8') as jsonfile:
+        json.dump(contenido, jsonfile, ensure_ascii=False, default=str)
+    os.replace(temporal, ruta)
+
+def _leer_json(ruta):
+    with open(ruta, 'r', encoding='utf-8') as jsonfile:
+        return json.load(jsonfile)
+
+def guardar_foto(foto, archivo_json):
+    """
+    La foto tiene claves que JSON no admite (tuplas de aula, pabellones enteros,
+    priorización None); se guarda como listas
+    """
+    _escribir_json(archivo_json, {
+        'libres_por_pabellon': [
+            [pabellon, [[codigo, nombre, capacidad, bloques] for (codigo, nombre, capacidad), bloques in aulas_libres.items()]]
+            for pabellon, aulas_libres in foto['libres_por_pabellon'].items()
+        ],
+        'ocupaciones_por_aula': foto['ocupaciones_por_aula'],
+        'tablas_priorizacion': [[archivo, tabla] for archivo, tabla in foto['tablas_priorizacion'].items()]
+    })
+
+def cargar_foto(archivo_json):
+    contenido = _leer_json(archivo_json)
+    return {
+        'libres_por_pabellon': {
+            pabellon: {(codigo, nombre, capacidad): bloques for codigo, nombre, capacidad, bloques in aulas}
+            for pabellon, aulas in contenido['libres_por_pabellon']
+        },
+        'ocupaciones_por_aula': [(codigo, ocupaciones) for codigo, ocupaciones in contenido['ocupaciones_por_aula']],
+        'tablas_priorizacion': {archivo: tabla for archivo, tabla in contenido['tablas_priorizacion']}
+    }
+
+def encolar_escenarios(directorio, escenarios, foto):
+    """
+    Coordinador: publica la foto y deja cada escenario en pendientes/
+    """
+    for carpeta in CARPETAS_COLA:
+        os.makedirs(os.path.join(directorio, carpeta), exist_ok=True)
+    guardar_foto(foto, os.path.join(directorio, 'foto.json'))
+    for numero, escenario in enumerate(escenarios):
+        _escribir_json(os.path.join(directorio, 'pendientes', f"{numero:05d}.json"), {'numero': numero, 'escenario': escenario})
+    print(f"📥 {len(escenarios)} escenarios encolados en {directorio}")
+
+def _tomar_escenario(directorio, id_trabajador):
+    """
+    Toma el primer escenario pendiente. Retorna (ruta_en_proceso, trabajo) o None si no quedan
+    """
+    pendientes = os.path.join(directorio, 'pendientes')
+    for nombre in sorted(n for n in os.listdir(pendientes) if n.endswith('.json')):
+        destino = os.path.join(directorio, 'en_proceso', f"{nombre[:-5]}.{id_trabajador}.json")
+        try:
+            os.rename(os.path.join(pendientes, nombre), destino)
+        except FileNotFoundError:
+            continue  # Lo tomó otro trabajador
+        # El rename conserva la fecha del archivo; se marca la hora en que se tomó
+        os.utime(destino)
+        return destino, _leer_json(destino)
+    return None
+
+def trabajar_cola(directorio, id_trabajador=None):
+    """
+    Trabajador: toma escenarios hasta vaciar la cola y deja cada resultado en resultados/.
+    Retorna la cantidad de escenarios procesados
+    """
+    id_trabajador = id_trabajador or f"{socket.gethostname()}-{os.getpid()}"
+    foto = cargar_foto(os.path.join(directorio, 'foto.json'))
+    procesados = 0
+    while True:
+        tomado = _tomar_escenario(directorio, id_trabajador)
+        if tomado is None:
+            break
+        ruta_en_proceso, trabajo = tomado
+        nombre = f"{trabajo['numero']:05d}.json"
+        try:
+            resultado = evaluar_escenario(trabajo['escenario'], foto)
+            resultado['trabajador'] = id_trabajador
+            _escribir_json(os.path.join(directorio, 'resultados', nombre), resultado)
+        except Exception as e:
+            _escribir_json(os.path.join(directorio, 'fallidos', nombre), dict(trabajo, error=str(e), trabajador=id_trabajador))
+        try:
+            os.remove(ruta_en_proceso)
+        except FileNotFoundError:
+            pass  # Se reencoló mientras tanto; el resultado ya quedó guardado
+        procesados += 1
+    return procesados
+
+def trabajar_cola_en_procesos(directorio, cantidad_procesos):
+    """
+    Lanza varios trabajadores locales sobre la misma cola
+    """
+    if cantidad_procesos <= 1:
+        return trabajar_cola(directorio)
+    with ProcessPoolExecutor(max_workers=cantidad_procesos) as executor:
+        return sum(executor.map(trabajar_cola, [directorio] * cantidad_procesos))
+
+def reencolar_abandonados(directorio, antiguedad_segundos):
+    """
+    Devuelve a pendientes/ los escenarios tomados hace más de `antiguedad_segundos`
+    (su trabajador se cayó o se detuvo)
+    """
+    en_proceso = os.path.join(directorio, 'en_proceso')
+    reencolados = 0
+    for nombre in os.listdir(en_proceso):
+        ruta = os.path.join(en_proceso, nombre)
+        if nombre.endswith('.json') and time.time() - os.path.getmtime(ruta) > antiguedad_segundos:
+            try:
+                os.rename(ruta, os.path.join(directorio, 'pendientes', f"{nombre.split('.', 1)[0]}.json"))
+                reencolados += 1
+            except FileNotFoundError:
+                continue  # Justo terminó
+    return reencolados
+
+def estado_cola(directorio):
+    return {
+        carpeta: sum(1 for n in os.listdir(os.path.join(directorio, carpeta)) if n.endswith('.json'))
+        for carpeta in CARPETAS_COLA
+    }
+
+def recolectar_resultados(directorio):
+    """
+    Resultados terminados, en el orden en que se encolaron los escenarios
+    """
+    carpeta = os.path.join(directorio, 'resultados')
+    return [_leer_json(os.path.join(carpeta, nombre)) for nombre in sorted(os.listdir(carpeta)) if nombre.endswith('.json')]
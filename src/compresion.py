@@ -0,0 +1,71 @@
+import gzip
+
+# Salidas comprimidas para los exportadores. La compresión se elige por la
+# extensión del archivo (.gz o .zst), así cada exportador solo cambia open() por
+# abrir_salida() y escribe en streaming como siempre. abrir_entrada() detecta la
+# compresión por el contenido, así los lectores aceptan archivos comprimidos o no.
+# zstd usa el paquete opcional zstandard, que solo se importa al usarlo.
+
+EXTENSIONES_COMPRESION = {'gzip': '.gz', 'zstd': '.zst'}
+COMPRESIONES = tuple(EXTENSIONES_COMPRESION)
+
+_MAGIA_GZIP = b'\x1f\x8b'
+_MAGIA_ZSTD = b'\x28\xb5\x2f\xfd'
+
+def zstandard_disponible():
+    try:
+        import zstandard  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def compresion_de(configuracion):
+    """
+    Compresión pedida en la configuración (None, 'gzip' o 'zstd'); si pide zstd y no está instalado, avisa y usa gzip
+    """
+    compresion = (configuracion or {}).get('compresion')
+    if compresion == 'zstd' and not zstandard_disponible():
+        print("⚠️  zstandard no está instalado (pip install zstandard): se comprime con gzip")
+        return 'gzip'
+    return compresion
+
+def sufijo_compresion(configuracion):
+    """
+    Extensión a agregar a los archivos de salida: '.gz', '.zst' o '' sin compresión
+    """
+    return EXTENSIONES_COMPRESION.get(compresion_de(configuracion), '')
+
+def compresion_de_archivo(archivo):
+    for compresion, extension in EXTENSIONES_COMPRESION.items():
+        if archivo.endswith(extension):
+            return compresion
+    return None
+
+def _abrir(archivo, modo, compresion):
+    texto = 'b' not in modo
+    opciones = {'encoding': 'utf-8', 'newline': '' if 'w' in modo or 'a' in modo else None} if texto else {}
+    if compresion == 'gzip':
+        return gzip.open(archivo, modo if not texto else modo + 't', compresslevel=6, **opciones)
+    if compresion == 'zstd':
+        import zstandard
+        return zstandard.open(archivo, modo if not texto else modo + 't', **opciones)
+    return open(archivo, modo, **opciones)
+
+def abrir_salida(archivo, modo='w', compresion=None):
+    """
+    Abre un archivo para escribir, en texto ('w') o binario ('wb'). Comprime según
+    `compresion` o, si no se indica, según la extensión del archivo
+    """
+    return _abrir(archivo, modo, compresion or compresion_de_archivo(archivo))
+
+def abrir_entrada(archivo, modo='r'):
+    """
+    Abre un archivo para leer, descomprimiéndolo si está en gzip o zstd
+    """
+    with open(archivo, 'rb') as archivo_entrada:
+        magia = archivo_entrada.read(4)
+    if magia.startswith(_MAGIA_GZIP):
+        return _abrir(archivo, modo, 'gzip')
+    if magia == _MAGIA_ZSTD:
+        return _abrir(archivo, modo, 'zstd')
+    return _abrir(archivo, modo, None)
@@ -0,0 +1,190 @@
+from src.estrategias_solucion import MatchingAumentante
+from src.logic.indice_reservas import IndiceReservas, hora_a_minutos
+
+def _capacidad_requerida(ocupacion):
+    capacidad_raw = ocupacion.get('CAPACIDADMAXIMA')
+    return int(capacidad_raw) if capacidad_raw else 0
+
+def cota_minima_aulas(sesiones):
+    """
+    Cota inferior de aulas necesarias: para cada umbral de capacidad c, la cantidad
+    máxima de sesiones simultáneas que necesitan al menos c (clique del grafo de
+    intervalos restringido a esas sesiones)
+    """
+    cota = 0
+    for umbral in sorted({s['capacidad'] for s in sesiones}):
+        eventos = []
+        for sesion in sesiones:
+            if sesion['capacidad'] >= umbral:
+                ocupacion = sesion['ocupacion']
+                eventos.append((ocupacion['CODIGODIA'], hora_a_minutos(ocupacion['HORAINICIO']), 1))
+                eventos.append((ocupacion['CODIGODIA'], hora_a_minutos(ocupacion['HORAFIN']), -1))
+        # Los fines se procesan antes que los inicios del mismo minuto (intervalos semiabiertos)
+        eventos.sort()
+        simultaneas = 0
+        dia_actual = None
+        for dia, _, delta in eventos:
+            if dia != dia_actual:
+                dia_actual, simultaneas = dia, 0
+            simultaneas += delta
+            cota = max(cota, simultaneas)
+    return cota
+
+class PlanificadorConsolidacion:
+    """
+    Concentra las ocupaciones de un conjunto de aulas en la menor cantidad posible
+    de ellas, respetando capacidad y cruces de horario. Primero arma una solución
+    con primer ajuste decreciente (sesiones de mayor capacidad primero, aulas
+    grandes y cargadas primero) y luego intenta cerrar aulas una a una reubicando
+    sus sesiones con caminos aumentantes
+    """
+    def __init__(self, aulas, ocupaciones_por_aula, calcular_score, dias=None):
+        # aulas: {codigo: (nombre, capacidad)}; ocupaciones_por_aula: [(codigo, ocupaciones)]
+        self.aulas = aulas
+        self.calcular_score = calcular_score
+        self.sesiones = []
+        for codigo_aula, ocupaciones in ocupaciones_por_aula:
+            for ocupacion in ocupaciones:
+                if dias and ocupacion['CODIGODIA'] not in dias:
+                    continue
+                self.sesiones.append({
+                    'ocupacion': ocupacion,
+                    'aula_actual': codigo_aula,
+                    'capacidad': _capacidad_requerida(ocupacion)
+                })
+        self.cota_minima = cota_minima_aulas(self.sesiones)
+
+    def _candidata(self, sesion, codigo):
+        nombre, capacidad = self.aulas[codigo]
+        return {
+            'codigo': codigo,
+            'nombre': nombre,
+            'capacidad': capacidad,
+            'pabellon': codigo[:2] if len(codigo) >= 2 else 'N/A',
+            'score': self.calcular_score(capacidad, sesion['capacidad'])
+        }
+
+    def _cabe(self, sesion, codigo):
+        return sesion['capacidad'] <= 0 or self.aulas[codigo][1] >= sesion['capacidad']
+
+    def primer_ajuste_decreciente(self):
+        """
+        Retorna (asignacion {indice_sesion: codigo}, aulas_abiertas, sin_aula)
+        """
+        carga = {}
+        for sesion in self.sesiones:
+            carga[sesion['aula_actual']] = carga.get(sesion['aula_actual'], 0) + 1
+        por_abrir = sorted(self.aulas, key=lambda codigo: (-self.aulas[codigo][1], -carga.get(codigo, 0), codigo))
+        orden = sorted(
+            range(len(self.sesiones)),
+            key=lambda i: (
+                -self.sesiones[i]['capacidad'],
+                hora_a_minutos(self.sesiones[i]['ocupacion']['HORAINICIO']) - hora_a_minutos(self.sesiones[i]['ocupacion']['HORAFIN'])
+            )
+        )
+
+        indice = IndiceReservas()
+        abiertas = []
+        asignacion = {}
+        sin_aula = []
+        for i in orden:
+            sesion = self.sesiones[i]
+            ocupacion = sesion['ocupacion']
+            horario = (ocupacion['CODIGODIA'], ocupacion['HORAINICIO'], ocupacion['HORAFIN'])
+
+            # Preferir su aula actual; si no, la abierta más ajustada en capacidad; si no, abrir otra
+            opciones = [sesion['aula_actual']] if sesion['aula_actual'] in abiertas else []
+            opciones += sorted((c for c in abiertas if c != sesion['aula_actual']), key=lambda c: self.aulas[c][1])
+            elegida = next((c for c in opciones if self._cabe(sesion, c) and indice.esta_libre(c, *horario)), None)
+            if elegida is None:
+                elegida = next((c for c in por_abrir if c not in abiertas and self._cabe(sesion, c)), None)
+                if elegida is None:
+                    sin_aula.append(i)
+                    continue
+                abiertas.append(elegida)
+
+            indice.reservar(elegida, *horario, i)
+            asignacion[i] = elegida
+
+        return asignacion, abiertas, sin_aula
+
+    def _reasignar(self, asignacion, aulas_destino):
+        """
+        Intenta ubicar todas las sesiones solo en `aulas_destino`, prefiriendo que cada
+        una se quede en su aula actual. Retorna la nueva asignación o None
+        """
+        opciones = []
+        for i, sesion in enumerate(self.sesiones):
+            preferidas = [c for c in (sesion['aula_actual'], asignacion.get(i)) if c in aulas_destino]
+            resto = sorted((c for c in aulas_destino if c not in preferidas), key=lambda c: self.aulas[c][1])
+            opciones.append({
+                'ocupacion': sesion['ocupacion'],
+                'aulas_candidatas': [self._candidata(sesion, c) for c in dict.fromkeys(preferidas + resto) if self._cabe(sesion, c)]
+            })
+
+        # Primero las sesiones que pueden quedarse en su aula (no se cruzan entre sí)
+        orden = sorted(
+            asignacion,
+            key=lambda i: (self.sesiones[i]['aula_actual'] not in aulas_destino, len(opciones[i]['aulas_candidatas']))
+        )
+        matching = MatchingAumentante(opciones)
+        for i in orden:
+            if not matching.aumentar(i):
+                return None
+        return {i: candidata['codigo'] for i, candidata in matching.asignacion.items()}
+
+    def planificar(self, refinar=True):
+        """
+        Retorna (asignacion, aulas_abiertas, sin_aula)
+        """
+        asignacion, abiertas, sin_aula = self.primer_ajuste_decreciente()
+
+        # Cerrar primero las aulas con menos sesiones asignadas
+        hubo_mejora = refinar
+        while hubo_mejora and len(abiertas) > self.cota_minima:
+            hubo_mejora = False
+            carga = {codigo: 0 for codigo in abiertas}
+            for codigo in asignacion.values():
+                carga[codigo] += 1
+            for cerrar in sorted(abiertas, key=lambda c: (carga[c], self.aulas[c][1])):
+                restantes = [c for c in abiertas if c != cerrar]
+                nueva = self._reasignar(asignacion, restantes)
+                if nueva is not None:
+                    asignacion, abiertas = nueva, restantes
+                    hubo_mejora = True
+                    break
+
+        # Con las aulas ya elegidas, mover lo menos posible
+        nueva = self._reasignar(asignacion, abiertas)
+        if nueva is not None and self._movimientos(nueva) < self._movimientos(asignacion):
+            asignacion = nueva
+
+        return asignacion, abiertas, sin_aula
+
+    def _movimientos(self, asignacion):
+        return sum(1 for i, codigo in asignacion.items() if codigo != self.sesiones[i]['aula_actual'])
+
+    def construir_resultados(self, asignacion, sin_aula, prioridad_de):
+        """
+        Plan por aula de origen en el formato de resultados de la reorganización múltiple:
+        solo las sesiones que cambian de aula son movimientos
+        """
+        planes = {}
+        for i, sesion in enumerate(self.sesiones):
+            plan = planes.setdefault(sesion['aula_actual'], {'movimientos': [], 'conflictos': [], 'aulas_utilizadas': []})
+            ocupacion = sesion['ocupacion']
+            prioridad = prioridad_de(ocupacion)
+            if i in sin_aula:
+                plan['conflictos'].append({'ocupacion': ocupacion, 'prioridad': prioridad, 'tipo': 'SIN_AULA_CON_CAPACIDAD'})
+            elif asignacion[i] != sesion['aula_actual']:
+                aula_destino = self._candidata(sesion, asignacion[i])
+                plan['movimientos'].append({
+                    'ocupacion': ocupacion,
+                    'prioridad': prioridad,
+                    'aula_origen': sesion['aula_actual'],
+                    'aula_destino': aula_destino,
+                    'score': aula_destino['score']
+                })
+                if aula_destino['codigo'] not in plan['aulas_utilizadas']:
+                    plan['aulas_utilizadas'].append(aula_destino['codigo'])
+        return planes
@@ -0,0 +1,67 @@
+from src.db.queries import get_aula_libre
+from src.logic.aula_logic import AulaLogic
+from src.priorizador import Priorizador
+
+def codigo_curso_de_ocupacion(ocupacion):
+    """
+    La consulta de ocupaciones no trae CODIGOCURSO; se toma del prefijo de
+    NOMBRE_CURSO ('033186-(PRA)ET023>...' -> '033186') para poder cruzar
+    con la tabla de priorización
+    """
+    if ocupacion.get('CODIGOCURSO'):
+        return ocupacion['CODIGOCURSO']
+    nombre_curso = ocupacion.get('NOMBRE_CURSO') or ''
+    prefijo = nombre_curso.split('-', 1)[0].strip()
+    return prefijo if prefijo.isdigit() else ''
+
+class ContextoEjecucion:
+    """
+    Datos compartidos de una ejecución: conexión, tabla de priorización, bloques
+    libres/ocupados de las aulas y ocupaciones por aula. Priorizador, Evaluador,
+    Generador y Reorganizador usan el mismo contexto, así cada dato se consulta
+    una sola vez por ejecución
+    """
+    def __init__(self, connection, archivo_priorizacion=None):
+        self.connection = connection
+        self.priorizador = Priorizador(connection)
+        self.aula_logic = AulaLogic(connection)
+        self.archivo_priorizacion = None
+        self._libres_y_ocupados = {}
+        self._ocupaciones = {}
+        self.cargar_priorizacion(archivo_priorizacion)
+
+    def cargar_priorizacion(self, archivo_priorizacion):
+        """
+        Carga la tabla de priorización (una sola vez por archivo)
+        """
+        if not archivo_priorizacion or archivo_priorizacion == self.archivo_priorizacion:
+            return
+        if self.priorizador.cargar_priorizacion_desde_csv(archivo_priorizacion):
+            self.archivo_priorizacion = archivo_priorizacion
+
+    def aplicar_configuracion(self, configuracion):
+        self.cargar_priorizacion(configuracion.get('archivo_priorizacion'))
+
+    def libres_y_ocupados(self, campus_code, pabellon_codes, ano='2025', semestre='2'):
+        """
+        (aulas_libres, aulas_ocupadas) de AulaLogic.fetch_libres_y_ocupados, en caché
+        """
+        clave = (campus_code, tuple(pabellon_codes or []), ano, semestre)
+        if clave not in self._libres_y_ocupados:
+            self._libres_y_ocupados[clave] = self.aula_logic.fetch_libres_y_ocupados(campus_code, pabellon_codes, ano, semestre)
+        return self._libres_y_ocupados[clave]
+
+    def aulas_libres(self, campus_code, pabellon_codes, ano='2025', semestre='2'):
+        return self.libres_y_ocupados(campus_code, pabellon_codes, ano, semestre)[0]
+
+    def ocupaciones_aula(self, codigo_aula, ano='2025', semestre='2'):
+        """
+        Ocupaciones de un aula (get_aula_libre), en caché y con CODIGOCURSO completado
+        """
+        clave = (codigo_aula, ano, semestre)
+        if clave not in self._ocupaciones:
+            ocupaciones = get_aula_libre(self.connection, codigo_aula, ano, semestre)
+            for ocupacion in ocupaciones:
+                ocupacion['CODIGOCURSO'] = codigo_curso_de_ocupacion(ocupacion)
+            self._ocupaciones[clave] = ocupaciones
+        return self._ocupaciones[clave]
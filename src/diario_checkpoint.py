@@ -0,0 +1,70 @@
+import json
+import os
+
+class DiarioCheckpoint:
+    """
+    Diario de checkpoint de solo anexado (un JSON por línea) para la reorganización
+    de múltiples aulas. La primera línea describe la corrida (aulas, prefijo y
+    configuración) y luego se agrega una línea por cada aula terminada, con su
+    resultado y los movimientos aceptados. Permite reanudar una corrida interrumpida
+    """
+    def __init__(self, ruta):
+        self.ruta = ruta
+
+    def _anexar(self, registro):
+        with open(self.ruta, 'a', encoding='utf-8') as archivo:
+            archivo.write(json.dumps(registro, ensure_ascii=False, default=str) + '\n')
+            archivo.flush()
+            os.fsync(archivo.fileno())
+
+    def registrar_inicio(self, aulas, prefijo_archivo, configuracion):
+        self._anexar({
+            'tipo': 'inicio',
+            'aulas': aulas,
+            'prefijo_archivo': prefijo_archivo,
+            'configuracion': configuracion
+        })
+
+    def registrar_aula(self, indice, resultado, movimientos):
+        """
+        movimientos: los movimientos aceptados del aula (formato de movimientos_ya_generados)
+        """
+        self._anexar({
+            'tipo': 'aula',
+            'indice': indice,
+            'aula': resultado['aula'],
+            'resultado': resultado,
+            'movimientos': movimientos
+        })
+
+    def cargar(self):
+        """
+        Retorna (inicio, {indice: registro}). Si la última línea quedó cortada por
+        una interrupción se descarta; esa aula se vuelve a procesar
+        """
+        inicio = None
+        completadas = {}
+        if not os.path.exists(self.ruta):
+            return inicio, completadas
+
+        # Un corte a mitad de un carácter (ñ, tildes) deja bytes inválidos: se reemplazan
+        # para que la línea falle como JSON y se descarte
+        with open(self.ruta, 'r', encoding='utf-8', errors='replace') as archivo:
+            for linea in archivo:
+                try:
+                    registro = json.loads(linea)
+                except json.JSONDecodeError:
+                    print(f"⚠️  Línea incompleta descartada en {self.ruta}")
+                    continue
+                if registro['tipo'] == 'inicio' and inicio is None:
+                    inicio = registro
+                elif registro['tipo'] == 'aula':
+                    completadas[registro['indice']] = registro
+        return inicio, completadas
+
+    def descartar(self):
+        """
+        Borra el diario al terminar la corrida: los consolidados ya tienen todos los resultados
+        """
+        if os.path.exists(self.ruta):
+            os.remove(self.ruta)
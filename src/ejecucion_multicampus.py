@@ -0,0 +1,130 @@
+from src.db.connection import create_connection
+from src.compresion import abrir_entrada
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import contextlib
+import csv
+import os
+import time
+
+def cargar_fragmentos_desde_csv(archivo_csv, campus_por_defecto, pabellones_por_defecto):
+    """
+    Agrupa las aulas del CSV en fragmentos independientes por campus y grupo de
+    pabellones. Columnas: codigo_aula, campus (opcional) y pabellones (opcional,
+    separados por ';'), p. ej. 2101101,14,3;4
+    """
+    fragmentos = {}
+    with abrir_entrada(archivo_csv) as csvfile:
+        reader = csv.DictReader(csvfile)
+        for row in reader:
+            codigo_aula = (row.get('codigo_aula') or '').strip()
+            if not codigo_aula:
+                continue
+            campus = int((row.get('campus') or '').strip() or campus_por_defecto)
+            pabellones_raw = (row.get('pabellones') or '').strip()
+            pabellones = [int(p) for p in pabellones_raw.split(';') if p.strip()] if pabellones_raw else list(pabellones_por_defecto)
+            clave = (campus, tuple(pabellones))
+            fragmentos.setdefault(clave, {'campus_code': campus, 'pabellon_codes': pabellones, 'aulas': []})
+            fragmentos[clave]['aulas'].append(codigo_aula)
+    fragmentos = fusionar_fragmentos_solapados(list(fragmentos.values()))
+    print(f"Cargados {len(fragmentos)} fragmentos ({sum(len(f['aulas']) for f in fragmentos)} aulas) desde {archivo_csv}")
+    return fragmentos
+
+def fusionar_fragmentos_solapados(fragmentos):
+    """
+    Une los fragmentos de un mismo campus que comparten algún pabellón. Cada fragmento
+    corre con su propio índice de reservas, así que dos fragmentos con pabellones en
+    común podrían mandar cursos a la misma aula y horario sin detectar el cruce
+    """
+    fusionados = []
+    for fragmento in fragmentos:
+        fragmento = dict(fragmento, pabellon_codes=list(fragmento['pabellon_codes']), aulas=list(fragmento['aulas']))
+        # Absorber todos los fragmentos ya fusionados con los que se solapa (puede unir varios)
+        for otro in [f for f in fusionados if f['campus_code'] == fragmento['campus_code']
+                     and set(f['pabellon_codes']) & set(fragmento['pabellon_codes'])]:
+            fusionados.remove(otro)
+            print(f"⚠️  Campus {fragmento['campus_code']}: pabellones {otro['pabellon_codes']} y {fragmento['pabellon_codes']} se solapan, se procesan juntos")
+            fragmento['pabellon_codes'] = sorted(set(otro['pabellon_codes']) | set(fragmento['pabellon_codes']))
+            fragmento['aulas'] = otro['aulas'] + [a for a in fragmento['aulas'] if a not in otro['aulas']]
+        fusionados.append(fragmento)
+    return fusionados
+
+def prefijo_fragmento(fragmento, timestamp):
+    pabellones = '-'.join(str(p) for p in fragmento['pabellon_codes'])
+    return f"consolidado_c{fragmento['campus_code']}_p{pabellones}_{timestamp}"
+
+def procesar_fragmento(fragmento, configuracion):
+    """
+    Reorganiza las aulas de un fragmento con su propia conexión y su propia foto.
+    La salida de consola va a <prefijo>.log para no mezclarse con otros fragmentos
+    """
+    # Import local: reorganizador_automatico importa este módulo
+    from src.contexto_ejecucion import ContextoEjecucion
+    from src.reorganizador_automatico import ReorganizadorAutomatico
+
+    configuracion = dict(configuracion, campus_code=fragmento['campus_code'], pabellon_codes=fragmento['pabellon_codes'])
+    inicio = time.time()
+    resultados = []
+    error = None
+    with open(f"{configuracion['prefijo_archivo']}.log", 'w', encoding='utf-8') as log, contextlib.redirect_stdout(log):
+        connection = None
+        try:
+            connection = create_connection()
+            contexto = ContextoEjecucion(connection, configuracion.get('archivo_priorizacion'))
+            reorganizador = ReorganizadorAutomatico(connection, contexto)
+            resultados = reorganizador.reorganizar_multiples_aulas(fragmento['aulas'], configuracion)
+        except Exception as e:
+            error = str(e)
+            print(f"❌ Error en fragmento campus {fragmento['campus_code']}: {error}")
+        finally:
+            if connection is not None:
+                connection.close()
+
+    return {
+        'campus_code': fragmento['campus_code'],
+        'pabellon_codes': fragmento['pabellon_codes'],
+        'prefijo_archivo': configuracion['prefijo_archivo'],
+        'resultados': resultados,
+        'error': error,
+        'segundos': round(time.time() - inicio, 1)
+    }
+
+def ejecutar_fragmentos(fragmentos, configuracion, max_conexiones=4):
+    """
+    Ejecuta los fragmentos en procesos separados, con a lo sumo `max_conexiones`
+    fragmentos (y conexiones) a la vez. Los procesos de evaluación se reparten
+    entre los fragmentos simultáneos. Retorna los resultados en el orden de entrada,
+    después de unir los fragmentos que comparten pabellones
+    """
+    fragmentos = fusionar_fragmentos_solapados(fragmentos)
+    simultaneos = max(1, min(max_conexiones, len(fragmentos)))
+    workers_por_fragmento = max(1, (configuracion.get('workers') or os.cpu_count() or 1) // simultaneos)
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+
+    configuraciones = [
+        dict(configuracion, workers=workers_por_fragmento, resume=None, prefijo_archivo=prefijo_fragmento(fragmento, timestamp))
+        for fragmento in fragmentos
+    ]
+
+    print(f"🌐 {len(fragmentos)} fragmentos, {simultaneos} simultáneos, {workers_por_fragmento} procesos de evaluación por fragmento")
+    if simultaneos == 1:
+        return [procesar_fragmento(fragmento, conf) for fragmento, conf in zip(fragmentos, configuraciones)]
+
+    # Los fragmentos más grandes primero: el tiempo total se acerca al del campus más grande
+    orden = sorted(range(len(fragmentos)), key=lambda i: -len(fragmentos[i]['aulas']))
+    resultados = [None] * len(fragmentos)
+    with ProcessPoolExecutor(max_workers=simultaneos) as executor:
+        futuros = {i: executor.submit(procesar_fragmento, fragmentos[i], configuraciones[i]) for i in orden}
+        for i, futuro in futuros.items():
+            try:
+                resultados[i] = futuro.result()
+            except Exception as e:
+                resultados[i] = {
+                    'campus_code': fragmentos[i]['campus_code'],
+                    'pabellon_codes': fragmentos[i]['pabellon_codes'],
+                    'prefijo_archivo': configuraciones[i]['prefijo_archivo'],
+                    'resultados': [],
+                    'error': str(e),
+                    'segundos': 0
+                }
+    return resultados
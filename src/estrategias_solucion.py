@@ -0,0 +1,384 @@
+from src.logic.indice_reservas import IndiceReservas, mascara_horario
+import random
+import time
+
+# Estrategias de asignación sobre el catálogo de opciones de un aula
+# (la lista `todas_las_opciones` de ReorganizadorAutomatico). Todas son
+# funciones de módulo que reciben solo datos para poder ejecutarse en
+# procesos separados, y devuelven un plan con el formato de `plan_movimientos`.
+
+def clave_grupo(ocupacion, i):
+    """
+    Las sesiones de OFERTA con el mismo CLAVEEVENTO (DATO1) forman un grupo;
+    el resto de ocupaciones se tratan de forma individual
+    """
+    if ocupacion.get('ORIGEN') == 'OFERTA' and ocupacion.get('DATO1'):
+        return ('OFERTA', str(ocupacion['DATO1']))
+    return ('UNICA', i)
+
+def contar_grupos_divididos(plan):
+    """
+    Cantidad de grupos (mismo CLAVEEVENTO) cuyas sesiones quedaron en aulas distintas
+    """
+    aulas_por_grupo = {}
+    for i, movimiento in enumerate(plan['movimientos']):
+        clave = clave_grupo(movimiento['ocupacion'], i)
+        aulas_por_grupo.setdefault(clave, set()).add(movimiento['aula_destino']['codigo'])
+    return sum(1 for aulas in aulas_por_grupo.values() if len(aulas) > 1)
+
+def calcular_objetivo(plan, penalizacion_grupo=0):
+    """
+    Objetivo común para comparar planes: primero el peso total ubicado
+    (prioridad), luego la cantidad de movimientos y al final el score total,
+    descontando `penalizacion_grupo` por cada curso dividido entre aulas
+    """
+    movimientos = plan['movimientos']
+    score_total = sum(m['score'] for m in movimientos)
+    if penalizacion_grupo:
+        score_total -= penalizacion_grupo * contar_grupos_divididos(plan)
+    return (
+        sum(m['prioridad']['peso'] for m in movimientos),
+        len(movimientos),
+        score_total
+    )
+
+def cota_superior_objetivo(todas_las_opciones):
+    """
+    Máximo valor posible de calcular_objetivo: todas las ocupaciones con candidatas
+    ubicadas, cada una en su candidata de mayor score y sin cursos divididos
+    """
+    con_candidatas = [c for c in todas_las_opciones if c['aulas_candidatas']]
+    return (
+        sum(c['prioridad']['peso'] for c in con_candidatas),
+        len(con_candidatas),
+        sum(max(aula['score'] for aula in c['aulas_candidatas']) for c in con_candidatas)
+    )
+
+def construir_plan(todas_las_opciones, asignacion, tipos_conflicto=None):
+    """
+    Arma el plan de movimientos a partir de una asignación índice -> aula candidata,
+    conservando el orden original de las ocupaciones. `tipos_conflicto` permite
+    indicar un tipo de conflicto particular para algunas ocupaciones
+    """
+    plan = {
+        'movimientos': [],
+        'conflictos': [],
+        'aulas_utilizadas': []
+    }
+
+    for i, curso_opciones in enumerate(todas_las_opciones):
+        ocupacion = curso_opciones['ocupacion']
+        prioridad = curso_opciones['prioridad']
+        aula = asignacion.get(i)
+
+        if aula:
+            plan['movimientos'].append({
+                'ocupacion': ocupacion,
+                'prioridad': prioridad,
+                'aula_destino': aula,
+                'score': aula['score']
+            })
+            if aula['codigo'] not in plan['aulas_utilizadas']:
+                plan['aulas_utilizadas'].append(aula['codigo'])
+        elif tipos_conflicto and i in tipos_conflicto:
+            plan['conflictos'].append({
+                'ocupacion': ocupacion,
+                'prioridad': prioridad,
+                'tipo': tipos_conflicto[i]
+            })
+        elif curso_opciones['aulas_candidatas']:
+            plan['conflictos'].append({
+                'ocupacion': ocupacion,
+                'prioridad': prioridad,
+                'tipo': 'TODAS_LAS_AULAS_OCUPADAS'
+            })
+        else:
+            plan['conflictos'].append({
+                'ocupacion': ocupacion,
+                'prioridad': prioridad,
+                'tipo': 'SIN_AULAS_DISPONIBLES'
+            })
+
+    return plan
+
+def _orden_por_prioridad(todas_las_opciones):
+    """
+    Índices ordenados por peso (mayor primero), luego mejor score y hora de inicio
+    """
+    def clave(i):
+        curso_opciones = todas_las_opciones[i]
+        candidatas = curso_opciones['aulas_candidatas']
+        mejor_score = candidatas[0]['score'] if candidatas else 0
+        return (-curso_opciones['prioridad']['peso'], -mejor_score, curso_opciones['ocupacion']['HORAINICIO'])
+    return sorted(range(len(todas_las_opciones)), key=clave)
+
+def _greedy(todas_las_opciones, orden, indice=None):
+    """
+    Asigna a cada ocupación (en el orden dado) la primera candidata libre
+    """
+    if indice is None:
+        indice = IndiceReservas()
+    asignacion = {}
+
+    for i in orden:
+        ocupacion = todas_las_opciones[i]['ocupacion']
+        for aula_candidata in todas_las_opciones[i]['aulas_candidatas']:
+            if indice.esta_libre(aula_candidata['codigo'], ocupacion['CODIGODIA'], ocupacion['HORAINICIO'], ocupacion['HORAFIN']):
+                indice.reservar(aula_candidata['codigo'], ocupacion['CODIGODIA'], ocupacion['HORAINICIO'], ocupacion['HORAFIN'], i)
+                asignacion[i] = aula_candidata
+                break
+
+    return asignacion
+
+def resolver_greedy(todas_las_opciones):
+    """
+    Greedy actual: recorre las ocupaciones en el orden del catálogo y toma la
+    mejor aula que no cruce con lo ya asignado
+    """
+    asignacion = _greedy(todas_las_opciones, range(len(todas_las_opciones)))
+    return construir_plan(todas_las_opciones, asignacion)
+
+def resolver_greedy_por_tier(todas_las_opciones):
+    """
+    Greedy que procesa primero los tiers de mayor peso
+    """
+    asignacion = _greedy(todas_las_opciones, _orden_por_prioridad(todas_las_opciones))
+    return construir_plan(todas_las_opciones, asignacion)
+
+class MatchingAumentante:
+    """
+    Asignación ocupación -> aula construida por caminos aumentantes (Kuhn).
+    Una aula puede recibir varias ocupaciones mientras no se crucen; si una
+    candidata está tomada por una sola ocupación, se intenta reubicar a esa
+    ocupación en otra aula. Una ocupación ya ubicada puede cambiar de aula pero
+    nunca se queda sin aula, así que procesar en orden de prioridad protege
+    a los cursos de mayor peso.
+    """
+    def __init__(self, todas_las_opciones, indice=None):
+        self.opciones = todas_las_opciones
+        self.asignacion = {}
+        self.indice = indice if indice is not None else IndiceReservas()
+
+    def asignar(self, i, aula_candidata):
+        ocupacion = self.opciones[i]['ocupacion']
+        anterior = self.asignacion.get(i)
+        if anterior:
+            self.indice.liberar(anterior['codigo'], ocupacion['CODIGODIA'], ocupacion['HORAINICIO'], ocupacion['HORAFIN'], i)
+        self.indice.reservar(aula_candidata['codigo'], ocupacion['CODIGODIA'], ocupacion['HORAINICIO'], ocupacion['HORAFIN'], i)
+        self.asignacion[i] = aula_candidata
+
+    def aumentar(self, i):
+        """
+        Intenta ubicar la ocupación i, reubicando otras si hace falta
+        """
+        return self._buscar_camino(i, set())
+
+    def _buscar_camino(self, i, visitadas):
+        ocupacion = self.opciones[i]['ocupacion']
+        actual = self.asignacion.get(i)
+        if actual:
+            visitadas.add(actual['codigo'])
+
+        for aula_candidata in self.opciones[i]['aulas_candidatas']:
+            codigo = aula_candidata['codigo']
+            if codigo in visitadas:
+                continue
+            visitadas.add(codigo)
+
+            cruces = self.indice.cruces(codigo, ocupacion['CODIGODIA'], ocupacion['HORAINICIO'], ocupacion['HORAFIN'])
+            if not cruces:
+                self.asignar(i, aula_candidata)
+                return True
+
+            # Solo se desplaza a un único ocupante que pertenezca a esta misma asignación
+            if len(cruces) == 1:
+                j = cruces[0][2]
+                if isinstance(j, int) and j in self.asignacion and self._buscar_camino(j, visitadas):
+                    self.asignar(i, aula_candidata)
+                    return True
+
+        return False
+
+def resolver_matching(todas_las_opciones):
+    """
+    Asignación por caminos aumentantes en orden de prioridad
+    """
+    matching = MatchingAumentante(todas_las_opciones)
+    for i in _orden_por_prioridad(todas_las_opciones):
+        matching.aumentar(i)
+    return construir_plan(todas_las_opciones, matching.asignacion)
+
+def resolver_lexicografico(todas_las_opciones):
+    """
+    Resolución lexicográfica por tier (heurística): primero se ubican todos los que
+    se pueda del tier 1, luego los del tier 2 sin sacar a ninguno del tier 1, y así
+    sucesivamente. Cada etapa aumenta el mismo matching de la etapa anterior (los ya
+    ubicados pueden cambiar de aula pero no quedarse sin ella), en lugar de resolver
+    desde cero. No garantiza el máximo por tier: cada camino aumentante desplaza a lo
+    sumo un ocupante por aula y no vuelve a pasar por un aula ya visitada, aunque sea
+    en otro horario, así que las ubicaciones por tier son una cota inferior
+    """
+    matching = MatchingAumentante(todas_las_opciones)
+    tiers = {}
+    for i, curso_opciones in enumerate(todas_las_opciones):
+        tiers.setdefault(curso_opciones['prioridad']['tier'], []).append(i)
+
+    etapas = []
+    for tier in sorted(tiers):
+        # Dentro del tier, primero los más restringidos (menos candidatas)
+        pendientes = sorted(
+            (i for i in tiers[tier] if todas_las_opciones[i]['aulas_candidatas']),
+            key=lambda i: (len(todas_las_opciones[i]['aulas_candidatas']), todas_las_opciones[i]['ocupacion']['HORAINICIO'])
+        )
+        # Se repite la pasada mientras alguna ubicación nueva habilite otra
+        hubo_mejora = True
+        while pendientes and hubo_mejora:
+            hubo_mejora = False
+            for i in list(pendientes):
+                if matching.aumentar(i):
+                    pendientes.remove(i)
+                    hubo_mejora = True
+
+        etapas.append({
+            'tier': tier,
+            'total': len(tiers[tier]),
+            'ubicados': sum(1 for i in tiers[tier] if i in matching.asignacion)
+        })
+
+    plan = construir_plan(todas_las_opciones, matching.asignacion)
+    plan['etapas_por_tier'] = etapas
+    return plan
+
+def resolver_busqueda_local(todas_las_opciones, semilla=0, limite_segundos=5, max_iteraciones=200):
+    """
+    Construcción greedy aleatorizada + reparación por caminos aumentantes +
+    mejora de score, repetida hasta agotar el tiempo o las iteraciones
+    """
+    rng = random.Random(semilla)
+    fin_busqueda = time.monotonic() + limite_segundos
+    n = len(todas_las_opciones)
+    mejor_asignacion = {}
+    mejor_objetivo = None
+
+    for _ in range(max_iteraciones):
+        if time.monotonic() > fin_busqueda:
+            break
+
+        # 1. Orden aleatorio respetando el peso de cada tier
+        desempate = [rng.random() for _ in range(n)]
+        orden = sorted(range(n), key=lambda i: (-todas_las_opciones[i]['prioridad']['peso'], desempate[i]))
+
+        # 2. Construcción: elegir al azar entre las 3 mejores candidatas libres
+        matching = MatchingAumentante(todas_las_opciones)
+        for i in orden:
+            ocupacion = todas_las_opciones[i]['ocupacion']
+            libres = [
+                c for c in todas_las_opciones[i]['aulas_candidatas']
+                if matching.indice.esta_libre(c['codigo'], ocupacion['CODIGODIA'], ocupacion['HORAINICIO'], ocupacion['HORAFIN'])
+            ]
+            if libres:
+                matching.asignar(i, rng.choice(libres[:3]))
+
+        # 3. Reparación: intentar ubicar los que quedaron fuera
+        for i in orden:
+            if i not in matching.asignacion:
+                matching.aumentar(i)
+
+        # 4. Mejora: mover a una candidata libre de mejor score
+        for i in orden:
+            actual = matching.asignacion.get(i)
+            if not actual:
+                continue
+            ocupacion = todas_las_opciones[i]['ocupacion']
+            for aula_candidata in todas_las_opciones[i]['aulas_candidatas']:
+                if aula_candidata['score'] <= actual['score']:
+                    break
+                if matching.indice.esta_libre(aula_candidata['codigo'], ocupacion['CODIGODIA'], ocupacion['HORAINICIO'], ocupacion['HORAFIN']):
+                    matching.asignar(i, aula_candidata)
+                    break
+
+        objetivo = calcular_objetivo(construir_plan(todas_las_opciones, matching.asignacion))
+        if mejor_objetivo is None or objetivo > mejor_objetivo:
+            mejor_objetivo = objetivo
+            mejor_asignacion = dict(matching.asignacion)
+
+    return construir_plan(todas_las_opciones, mejor_asignacion)
+
+def resolver_agrupado(todas_las_opciones, modo='estricto'):
+    """
+    Ubica cada curso (todas sus sesiones con el mismo CLAVEEVENTO) en una sola aula.
+    Las aulas posibles de un grupo son la intersección de las candidatas de sus
+    sesiones y el cruce con lo ya asignado se verifica con bitsets semanales.
+    En modo 'estricto' un grupo sin aula común queda en conflicto; en modo
+    'flexible' sus sesiones se ubican por separado (con penalización en el objetivo)
+    """
+    # 1. Armar los grupos y la máscara semanal de cada sesión
+    grupos = {}
+    mascaras = []
+    for i, curso_opciones in enumerate(todas_las_opciones):
+        ocupacion = curso_opciones['ocupacion']
+        grupos.setdefault(clave_grupo(ocupacion, i), []).append(i)
+        mascaras.append(mascara_horario(ocupacion['CODIGODIA'], ocupacion['HORAINICIO'], ocupacion['HORAFIN']))
+
+    # 2. Aulas comunes a todas las sesiones del grupo, con su score promedio
+    candidatas_grupo = {}
+    for clave, indices in grupos.items():
+        por_codigo = [{c['codigo']: c for c in todas_las_opciones[i]['aulas_candidatas']} for i in indices]
+        comunes = set.intersection(*(set(candidatas) for candidatas in por_codigo))
+        candidatas = []
+        for codigo in comunes:
+            opciones = [candidatas_sesion[codigo] for candidatas_sesion in por_codigo]
+            candidatas.append((sum(c['score'] for c in opciones) / len(opciones), codigo, opciones))
+        candidatas.sort(key=lambda x: (-x[0], x[1]))
+        candidatas_grupo[clave] = candidatas
+
+    # 3. Primero los grupos de mayor peso, más sesiones y menos aulas comunes
+    def orden_grupo(clave):
+        indices = grupos[clave]
+        peso = max(todas_las_opciones[i]['prioridad']['peso'] for i in indices)
+        return (-peso, -len(indices), len(candidatas_grupo[clave]), min(indices))
+
+    ocupado = {}
+    asignacion = {}
+    sin_aula_comun = []
+    for clave in sorted(grupos, key=orden_grupo):
+        indices = grupos[clave]
+        mascara_grupo = 0
+        for i in indices:
+            mascara_grupo |= mascaras[i]
+
+        ubicado = False
+        for _, codigo, opciones in candidatas_grupo[clave]:
+            if not ocupado.get(codigo, 0) & mascara_grupo:
+                ocupado[codigo] = ocupado.get(codigo, 0) | mascara_grupo
+                for i, opcion in zip(indices, opciones):
+                    asignacion[i] = opcion
+                ubicado = True
+                break
+
+        if not ubicado:
+            sin_aula_comun.append(clave)
+
+    # 4. Grupos sin aula común: conflicto (estricto) o sesiones por separado (flexible)
+    tipos_conflicto = {}
+    for clave in sin_aula_comun:
+        for i in grupos[clave]:
+            if modo == 'flexible':
+                for aula_candidata in todas_las_opciones[i]['aulas_candidatas']:
+                    if not ocupado.get(aula_candidata['codigo'], 0) & mascaras[i]:
+                        ocupado[aula_candidata['codigo']] = ocupado.get(aula_candidata['codigo'], 0) | mascaras[i]
+                        asignacion[i] = aula_candidata
+                        break
+            elif len(grupos[clave]) > 1 and todas_las_opciones[i]['aulas_candidatas']:
+                tipos_conflicto[i] = 'SIN_AULA_COMUN_PARA_EL_CURSO'
+
+    return construir_plan(todas_las_opciones, asignacion, tipos_conflicto)
+
+ESTRATEGIAS = {
+    'greedy': resolver_greedy,
+    'greedy_tier': resolver_greedy_por_tier,
+    'matching': resolver_matching,
+    'busqueda_local': resolver_busqueda_local,
+    'agrupado': resolver_agrupado,
+    'lexicografico': resolver_lexicografico
+}
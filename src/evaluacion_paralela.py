@@ -0,0 +1,72 @@
+from src.contexto_ejecucion import ContextoEjecucion
+from src.generador_soluciones import GeneradorSoluciones
+from concurrent.futures import ProcessPoolExecutor
+import contextlib
+import io
+import os
+
+# Foto de solo lectura compartida por cada proceso trabajador (se envía una sola vez)
+_aulas_libres = None
+_tabla_priorizacion = None
+
+def _inicializar_trabajador(aulas_libres, tabla_priorizacion):
+    global _aulas_libres, _tabla_priorizacion
+    _aulas_libres = aulas_libres
+    _tabla_priorizacion = tabla_priorizacion
+
+def evaluar_aula(codigo_aula, ocupaciones, configuracion, aulas_libres=None, tabla_priorizacion=None):
+    """
+    Evalúa y resuelve un aula sin acceder a la base de datos.
+    Retorna (solucion, log, error); la salida de consola se captura para
+    mostrarla luego en el orden de entrada
+    """
+    salida = io.StringIO()
+    solucion = None
+    error = None
+    with contextlib.redirect_stdout(salida):
+        try:
+            # Contexto sin conexión, con la misma tabla de priorización del proceso principal
+            contexto = ContextoEjecucion(None)
+            contexto.priorizador.tabla_priorizacion = dict(tabla_priorizacion if tabla_priorizacion is not None else _tabla_priorizacion)
+            generador = GeneradorSoluciones(None, contexto)
+            solucion = generador.generar_solucion_desde_datos(
+                codigo_aula,
+                ocupaciones,
+                aulas_libres if aulas_libres is not None else _aulas_libres,
+                campus_code=configuracion['campus_code'],
+                pabellon_codes=configuracion['pabellon_codes'],
+                ano=configuracion['ano'],
+                semestre=configuracion['semestre']
+            )
+        except Exception as e:
+            error = str(e)
+    return solucion, salida.getvalue(), error
+
+def evaluar_aulas(ocupaciones_por_aula, aulas_libres, tabla_priorizacion, configuracion, max_workers=None):
+    """
+    Fase paralela de la reorganización múltiple: cada aula se evalúa de forma
+    independiente contra la misma foto de aulas libres.
+    ocupaciones_por_aula: lista de (codigo_aula, ocupaciones) en el orden de entrada.
+    Retorna una lista de (solucion, log, error) en ese mismo orden
+    """
+    max_workers = min(max_workers or os.cpu_count() or 1, len(ocupaciones_por_aula))
+
+    if max_workers <= 1:
+        return [
+            evaluar_aula(codigo_aula, ocupaciones, configuracion, aulas_libres, tabla_priorizacion)
+            for codigo_aula, ocupaciones in ocupaciones_por_aula
+        ]
+
+    print(f"🧮 Evaluando {len(ocupaciones_por_aula)} aulas en {max_workers} procesos")
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_inicializar_trabajador, initargs=(aulas_libres, tabla_priorizacion)) as executor:
+        futuros = [
+            executor.submit(evaluar_aula, codigo_aula, ocupaciones, configuracion)
+            for codigo_aula, ocupaciones in ocupaciones_por_aula
+        ]
+        resultados = []
+        for futuro in futuros:
+            try:
+                resultados.append(futuro.result())
+            except Exception as e:
+                resultados.append((None, '', str(e)))
+    return resultados
@@ -1,7 +1,6 @@
 from src.db.connection import create_connection
-from src.db.queries import get_aula_libre
-from src.logic.aula_logic import AulaLogic
-from src.priorizador import Priorizador
+from src.contexto_ejecucion import ContextoEjecucion
+from src.compresion import abrir_salida
 import csv
 import sys
 import io
@@ -11,10 +10,12 @@ from datetime import datetime
 sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
 
 class EvaluadorMovimientos:
-    def __init__(self, connection):
+    def __init__(self, connection, contexto=None):
         self.connection = connection
-        self.aula_logic = AulaLogic(connection)
-        self.priorizador = Priorizador(connection)
+        # Priorización, aulas libres y ocupaciones se comparten con los demás componentes
+        self.contexto = contexto if contexto is not None else ContextoEjecucion(connection)
+        self.aula_logic = self.contexto.aula_logic
+        self.priorizador = self.contexto.priorizador
     
     def evaluar_movimientos_aula(self, codigo_aula_origen, campus_code=14, pabellon_codes=None, aulas_especificas=None, excluir_aulas=None, ano='2025', semestre='2'):
         """
@@ -24,28 +25,36 @@ class EvaluadorMovimientos:
         print(f"\n=== EVALUANDO MOVIMIENTOS PARA AULA {codigo_aula_origen} ===")
         
         # 1. Obtener ocupaciones del aula origen
-        ocupaciones_origen = get_aula_libre(self.connection, codigo_aula_origen, ano, semestre)
+        ocupaciones_origen = self.contexto.ocupaciones_aula(codigo_aula_origen, ano, semestre)
         if not ocupaciones_origen:
             print(f"No hay ocupaciones para el aula {codigo_aula_origen}")
             return []
+        
+        # 2. Obtener aulas libres
+        if pabellon_codes is None:
+            pabellon_codes = [3, 4]
+        
+        aulas_libres = self.contexto.aulas_libres(campus_code, pabellon_codes, ano, semestre)
+        
+        return self.evaluar_ocupaciones(codigo_aula_origen, ocupaciones_origen, aulas_libres, aulas_especificas, excluir_aulas)
+    
+    def evaluar_ocupaciones(self, codigo_aula_origen, ocupaciones_origen, aulas_libres, aulas_especificas=None, excluir_aulas=None):
+        """
+        Evalúa los movimientos a partir de datos ya consultados (ocupaciones del aula y
+        aulas libres), sin acceder a la base de datos. Permite evaluar en otro proceso
+        """
         # Inyectar el codigo de aula origen provisto en cada ocupación encontrada (por si la consulta no lo retorna explícitamente)
         for oc in ocupaciones_origen:
             if 'CODIGOAULA' not in oc or not oc['CODIGOAULA']:
                 oc['CODIGOAULA'] = codigo_aula_origen
                 
-        # 2. Establecer priorización por defecto
+        # Establecer priorización por defecto
         self.priorizador.establecer_priorizacion_por_defecto(ocupaciones_origen)
         
-        # 3. Ordenar ocupaciones por prioridad
+        # Ordenar ocupaciones por prioridad
         ocupaciones_ordenadas = self.priorizador.ordenar_ocupaciones_por_prioridad(ocupaciones_origen)
         
-        # 4. Obtener aulas libres
-        if pabellon_codes is None:
-            pabellon_codes = [3, 4]
-        
-        aulas_libres = self.aula_logic.fetch_libres(campus_code, pabellon_codes, ano, semestre)
-        
-        # 5. Evaluar cada ocupación
+        # Evaluar cada ocupación
         movimientos_posibles = []
         
         for item in ocupaciones_ordenadas:
@@ -73,6 +82,13 @@ class EvaluadorMovimientos:
                 if len(aulas_candidatas) > 3:
                     print(f"    ... y {len(aulas_candidatas) - 3} opciones mas")
             else:
+                # Se conserva sin candidatas: la solución la reporta como conflicto (y puede buscarle una cadena)
+                movimientos_posibles.append({
+                    'ocupacion': ocupacion,
+                    'prioridad': prioridad,
+                    'aulas_candidatas': [],
+                    'mejor_opcion': None
+                })
                 print(f"  [X] NO SE ENCONTRARON AULAS CANDIDATAS")
                 print(f"      Este curso NO se puede mover a ninguna aula disponible")
                 print(f"      Posibles razones: horario conflictivo, capacidad insuficiente, o no hay aulas libres")
@@ -159,7 +175,7 @@ class EvaluadorMovimientos:
         Exporta la evaluacion de movimientos a CSV, permitiendo exportar solo
         la mejor opcion o todas las opciones posibles para revision manual.
         """
-        with open(archivo_csv, 'w', newline='', encoding='utf-8') as csvfile:
+        with abrir_salida(archivo_csv) as csvfile:
             writer = csv.writer(csvfile)
             writer.writerow([
                 'Tier', 'Dia', 'Hora_Inicio', 'Hora_Fin', 'Curso', 'Programa', 'Docente', 
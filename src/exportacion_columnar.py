@@ -0,0 +1,174 @@
+from src.logic.indice_reservas import hora_a_minutos
+
+# Salida columnar (Parquet) de catálogos y consolidados, junto a los CSV.
+# Los textos repetidos (curso, programa, docente, aulas, estado) se guardan con
+# codificación de diccionario y día, minutos, capacidad y score con tipo propio,
+# así un análisis puede leer solo las columnas que necesita.
+# pyarrow es opcional: solo se importa al escribir un archivo Parquet.
+
+COLUMNAS_CONSOLIDADO = [
+    ('aula_origen', 'texto'),
+    ('aula_destino', 'texto'),
+    ('tier', 'int8'),
+    ('dia', 'texto'),
+    ('inicio_min', 'int16'),
+    ('fin_min', 'int16'),
+    ('curso', 'texto'),
+    ('programa', 'texto'),
+    ('docente', 'texto'),
+    ('capacidad_requerida', 'int32'),
+    ('capacidad_destino', 'int32'),
+    ('score', 'float32'),
+    ('estado', 'texto')
+]
+
+COLUMNAS_CATALOGO = [
+    ('tier', 'int8'),
+    ('dia', 'texto'),
+    ('inicio_min', 'int16'),
+    ('fin_min', 'int16'),
+    ('curso', 'texto'),
+    ('programa', 'texto'),
+    ('docente', 'texto'),
+    ('capacidad_requerida', 'int32'),
+    ('aula_origen', 'texto'),
+    ('aula_destino', 'texto'),
+    ('capacidad_destino', 'int32'),
+    ('score', 'float32'),
+    ('pabellon_destino', 'texto'),
+    ('estado', 'texto'),
+    ('opcion', 'int16'),
+    ('total_opciones', 'int16')
+]
+
+def pyarrow_disponible():
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def salida_parquet_habilitada(configuracion):
+    """
+    True si la configuración pide Parquet y pyarrow está instalado; si falta, avisa y sigue solo con CSV
+    """
+    if not configuracion.get('parquet'):
+        return False
+    if not pyarrow_disponible():
+        print("⚠️  pyarrow no está instalado (pip install pyarrow): se omite la salida Parquet")
+        return False
+    return True
+
+def _entero(valor):
+    return int(valor) if valor not in (None, '') else None
+
+def _datos_ocupacion(ocupacion):
+    return [
+        ocupacion['CODIGODIA'],
+        hora_a_minutos(ocupacion['HORAINICIO']),
+        hora_a_minutos(ocupacion['HORAFIN']),
+        ocupacion.get('NOMBRE_CURSO') or None,
+        ocupacion.get('NOMBRE_PROGRAMA') or None,
+        ocupacion.get('NOMBRE_DOCENTE') or None,
+        _entero(ocupacion.get('CAPACIDADMAXIMA'))
+    ]
+
+def filas_columnares_consolidado(resultado):
+    """
+    Mismas filas que el consolidado CSV, con valores tipados (vacío = nulo)
+    """
+    aula_origen = resultado['aula']
+    if not (resultado['exito'] and resultado['solucion']):
+        return [[aula_origen] + [None] * 11 + [f"ERROR: {resultado.get('error', 'Error desconocido')}"]]
+
+    filas = []
+    plan = resultado['solucion']['plan_movimientos']
+    for movimiento in plan['movimientos']:
+        dia, inicio, fin, curso, programa, docente, capacidad = _datos_ocupacion(movimiento['ocupacion'])
+        filas.append([
+            aula_origen, movimiento['aula_destino']['codigo'], movimiento['prioridad']['tier'],
+            dia, inicio, fin, curso, programa, docente, capacidad,
+            movimiento['aula_destino']['capacidad'], movimiento['score'], 'MOVIMIENTO_EXITOSO'
+        ])
+    for conflicto in plan['conflictos']:
+        dia, inicio, fin, curso, programa, docente, capacidad = _datos_ocupacion(conflicto['ocupacion'])
+        filas.append([
+            aula_origen, None, conflicto['prioridad']['tier'],
+            dia, inicio, fin, curso, programa, docente, capacidad,
+            None, None, f"CONFLICTO_{conflicto['tipo']}"
+        ])
+    return filas
+
+def filas_columnares_catalogo(movimiento, aula_origen=None):
+    """
+    Mismas filas que el catálogo completo CSV, con valores tipados (vacío = nulo).
+    `aula_origen` se usa si la ocupación no trae su CODIGOAULA
+    """
+    ocupacion = movimiento['ocupacion']
+    dia, inicio, fin, curso, programa, docente, capacidad = _datos_ocupacion(ocupacion)
+    datos_curso = [movimiento['prioridad']['tier'], dia, inicio, fin, curso, programa, docente, capacidad, ocupacion.get('CODIGOAULA') or aula_origen]
+    aulas_candidatas = movimiento['aulas_candidatas']
+
+    if not aulas_candidatas:
+        return [datos_curso + [None, None, None, None, 'SIN_OPCIONES_DISPONIBLES', 0, 0]]
+    return [
+        datos_curso + [
+            aula['codigo'], aula['capacidad'], aula['score'],
+            aula['codigo'][:2] if len(aula['codigo']) >= 2 else 'N/A',
+            'DISPONIBLE', i, len(aulas_candidatas)
+        ]
+        for i, aula in enumerate(aulas_candidatas, 1)
+    ]
+
+class SalidaParquet:
+    """
+    Salida Parquet para ExportadorConsolidado: acumula filas en columnas y escribe
+    un grupo de filas cada `filas_por_grupo`, así la memoria no crece con el lote
+    """
+    def __init__(self, archivo_parquet, columnas, filas_de, filas_por_grupo=50000):
+        self.archivo = archivo_parquet
+        self.columnas = columnas
+        self.filas_de = filas_de
+        self.filas_por_grupo = filas_por_grupo
+        self._writer = None
+        self._esquema = None
+        self._buffer = None
+
+    def abrir(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        tipos = {
+            'texto': pa.dictionary(pa.int32(), pa.string()),
+            'int8': pa.int8(),
+            'int16': pa.int16(),
+            'int32': pa.int32(),
+            'float32': pa.float32()
+        }
+        self._esquema = pa.schema([(nombre, tipos[tipo]) for nombre, tipo in self.columnas])
+        self._writer = pq.ParquetWriter(self.archivo, self._esquema, compression='zstd')
+        self._buffer = [[] for _ in self.columnas]
+
+    def _volcar(self):
+        import pyarrow as pa
+
+        if not self._buffer[0]:
+            return
+        arreglos = [
+            pa.array(valores, type=campo.type.value_type).dictionary_encode() if pa.types.is_dictionary(campo.type)
+            else pa.array(valores, type=campo.type)
+            for valores, campo in zip(self._buffer, self._esquema)
+        ]
+        self._writer.write_table(pa.Table.from_arrays(arreglos, schema=self._esquema))
+        self._buffer = [[] for _ in self.columnas]
+
+    def escribir(self, resultado):
+        for fila in self.filas_de(resultado):
+            for columna, valor in zip(self._buffer, fila):
+                columna.append(valor)
+        if len(self._buffer[0]) >= self.filas_por_grupo:
+            self._volcar()
+
+    def cerrar(self):
+        self._volcar()
+        self._writer.close()
@@ -0,0 +1,181 @@
+from src.compresion import abrir_salida
+import csv
+import json
+
+# Exportación en una sola pasada: cada resultado de aula se entrega una vez al
+# ExportadorConsolidado, que lo reparte a todas las salidas configuradas. Las
+# salidas de este módulo (CSV y JSON) lo escriben de inmediato y no guardan los
+# resultados en memoria; SalidaPlanNormalizado (formato_plan) guarda cada
+# resultado compactado hasta el cierre, Parquet acumula hasta un grupo de filas y
+# XLSX deja cada hoja en un archivo temporal hasta cerrar el libro.
+# Si el lote se corta con una excepción, las salidas con `interrumpir` marcan o
+# descartan su documento parcial en lugar de cerrarlo como completo.
+
+def _json_indentado(valor, nivel):
+    texto = json.dumps(valor, indent=2, ensure_ascii=False, default=str)
+    return texto.replace('\n', '\n' + '  ' * nivel)
+
+class SalidaCSV:
+    """
+    CSV con un encabezado fijo; `filas_de(resultado)` da las filas de cada aula
+    """
+    def __init__(self, archivo_csv, encabezado, filas_de):
+        self.archivo = archivo_csv
+        self.encabezado = encabezado
+        self.filas_de = filas_de
+        self._csvfile = None
+        self._writer = None
+
+    def abrir(self):
+        self._csvfile = abrir_salida(self.archivo)
+        self._writer = csv.writer(self._csvfile)
+        self._writer.writerow(self.encabezado)
+
+    def escribir(self, resultado):
+        self._writer.writerows(self.filas_de(resultado))
+        self._csvfile.flush()
+
+    def cerrar(self):
+        self._csvfile.close()
+
+class SalidaJSONConsolidado:
+    """
+    JSON consolidado escrito por partes: cabecera, un elemento de 'resultados' por
+    aula (`elemento_de(resultado)`) y al cierre la cantidad de aulas procesadas.
+    Mismo contenido que el JSON consolidado de siempre
+    """
+    def __init__(self, archivo_json, cabecera, elemento_de):
+        self.archivo = archivo_json
+        self.cabecera = cabecera
+        self.elemento_de = elemento_de
+        self._jsonfile = None
+        self._cantidad = 0
+
+    def abrir(self):
+        self._jsonfile = abrir_salida(self.archivo)
+        self._jsonfile.write('{\n')
+        for clave, valor in self.cabecera.items():
+            self._jsonfile.write(f"  {json.dumps(clave)}: {_json_indentado(valor, 1)},\n")
+        self._jsonfile.write('  "resultados": [')
+
+    def escribir(self, resultado):
+        separador = ',' if self._cantidad else ''
+        self._jsonfile.write(f"{separador}\n    {_json_indentado(self.elemento_de(resultado), 2)}")
+        self._jsonfile.flush()
+        self._cantidad += 1
+
+    def cerrar(self):
+        if self._cantidad:
+            self._jsonfile.write('\n  ')
+        self._jsonfile.write(f"],\n  \"aulas_procesadas\": {self._cantidad}\n}}\n")
+        self._jsonfile.close()
+
+    def interrumpir(self):
+        """
+        Cierra el JSON parcial marcado con "interrumpido": true (sigue siendo JSON válido)
+        """
+        if self._cantidad:
+            self._jsonfile.write('\n  ')
+        self._jsonfile.write(f"],\n  \"aulas_procesadas\": {self._cantidad},\n  \"interrumpido\": true\n}}\n")
+        self._jsonfile.close()
+
+class SalidaResumen(SalidaCSV):
+    """
+    Una fila de estadísticas por aula; acumula solo contadores para el resumen final
+    """
+    ENCABEZADO = [
+        'Aula', 'Estado', 'Movimientos_Exitosos', 'Conflictos', 'Aulas_Utilizadas',
+        'Score_Promedio', 'Porcentaje_Exito', 'Es_Valida', 'Error'
+    ]
+
+    def __init__(self, archivo_csv):
+        super().__init__(archivo_csv, self.ENCABEZADO, self._fila_resumen)
+        self.total = 0
+        self.exitosos = 0
+        self.suma_movimientos = 0
+        self.suma_scores = 0
+
+    def _fila_resumen(self, resultado):
+        self.total += 1
+        if resultado['exito'] and resultado['solucion']:
+            stats = resultado['solucion']['estadisticas']
+            self.exitosos += 1
+            self.suma_movimientos += stats['total_movimientos']
+            self.suma_scores += stats['score_promedio']
+        return self.filas_resumen(resultado)
+
+    @staticmethod
+    def filas_resumen(resultado):
+        """
+        Fila de estadísticas de un aula, sin acumular contadores
+        """
+        if resultado['exito'] and resultado['solucion']:
+            stats = resultado['solucion']['estadisticas']
+            return [[
+                resultado['aula'],
+                'EXITOSO',
+                stats['total_movimientos'],
+                stats['total_conflictos'],
+                stats['aulas_utilizadas'],
+                stats['score_promedio'],
+                stats['porcentaje_exito'],
+                'SÍ' if resultado['solucion']['es_valida'] else 'NO',
+                ''
+            ]]
+        return [[
+            resultado['aula'],
+            'FALLIDO',
+            '', '', '', '', '', '',
+            resultado.get('error', 'Error desconocido')
+        ]]
+
+    def mostrar(self):
+        print(f"\n{'='*60}")
+        print(f"REPORTE CONSOLIDADO")
+        print(f"{'='*60}")
+        print(f"Total de aulas procesadas: {self.total}")
+        print(f"Exitosos: {self.exitosos}")
+        print(f"Fallidos: {self.total - self.exitosos}")
+        print(f"Archivo de reporte: {self.archivo}")
+        if self.exitosos > 0:
+            print(f"Movimientos promedio por aula: {self.suma_movimientos / self.exitosos:.1f}")
+            print(f"Score promedio: {self.suma_scores / self.exitosos:.1f}")
+
+class ExportadorConsolidado:
+    """
+    Reparte cada resultado a todas las salidas. Se usa como contexto:
+        with ExportadorConsolidado([...]) as exportador:
+            exportador.escribir(resultado)
+    """
+    def __init__(self, salidas):
+        self.salidas = salidas
+
+    def __enter__(self):
+        for salida in self.salidas:
+            salida.abrir()
+        return self
+
+    def escribir(self, resultado):
+        for salida in self.salidas:
+            salida.escribir(resultado)
+
+    def __exit__(self, tipo, valor, traza):
+        """
+        Cierra todas las salidas aunque alguna falle. Si se sale por una excepción, las
+        que tienen `interrumpir` marcan o descartan su documento parcial
+        """
+        primer_error = None
+        for salida in self.salidas:
+            try:
+                if tipo is not None and hasattr(salida, 'interrumpir'):
+                    salida.interrumpir()
+                else:
+                    salida.cerrar()
+            except Exception as e:
+                print(f"❌ Error al cerrar {salida.archivo}: {e}")
+                if primer_error is None:
+                    primer_error = e
+        # Con una excepción en curso, esa es la que se propaga
+        if tipo is None and primer_error is not None:
+            raise primer_error
+        return False
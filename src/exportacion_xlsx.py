@@ -0,0 +1,144 @@
+import re
+
+# Salida XLSX de catálogos, soluciones y consolidados, junto a los CSV. Usa el
+# modo constant_memory de xlsxwriter: cada fila se vuelca al archivo temporal de
+# su hoja apenas se escribe, así la memoria no crece con el tamaño del catálogo.
+# Una hoja por aula (con encabezado fijo) y las columnas numéricas como números,
+# así Excel abre el archivo sin problemas de acentos ni de separadores.
+# xlsxwriter es opcional: solo se importa al escribir un archivo XLSX.
+# En constant_memory cada hoja mantiene abierto su archivo temporal hasta cerrar el
+# libro, así que las hojas por aula se limitan a MAX_HOJAS_POR_LIBRO: las aulas que
+# exceden el límite van juntas a la hoja HOJA_EXCEDENTE (con la columna de aula de
+# cada fila) y no se agota el límite de descriptores de archivo del proceso.
+
+MAX_HOJAS_POR_LIBRO = 200
+HOJA_EXCEDENTE = 'Otras aulas'
+
+COLUMNAS_ENTERAS = {
+    'Tier', 'Capacidad_Requerida', 'Capacidad_Destino', 'Capacidad_Aula',
+    'Movimientos_Exitosos', 'Conflictos', 'Aulas_Utilizadas',
+    'Total_Opciones', 'Opciones_Score_Alto', 'Opciones_Score_Medio'
+}
+COLUMNAS_DECIMALES = {'Score_Compatibilidad', 'Score_Mejor_Opción', 'Score_Promedio', 'Porcentaje_Exito'}
+
+_CARACTERES_HOJA = re.compile(r'[\[\]:*?/\\]')
+
+def xlsxwriter_disponible():
+    try:
+        import xlsxwriter  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def salida_xlsx_habilitada(configuracion):
+    """
+    True si la configuración pide XLSX y xlsxwriter está instalado; si falta, avisa y sigue solo con CSV
+    """
+    if not (configuracion or {}).get('xlsx'):
+        return False
+    if not xlsxwriter_disponible():
+        print("⚠️  xlsxwriter no está instalado (pip install xlsxwriter): se omite la salida XLSX")
+        return False
+    return True
+
+def _tipo_columna(nombre):
+    if nombre in COLUMNAS_ENTERAS:
+        return int
+    if nombre in COLUMNAS_DECIMALES:
+        return float
+    return None
+
+def _numero(valor, tipo):
+    """
+    Valor como número si la columna es numérica y el valor lo permite; si no, None
+    """
+    if isinstance(valor, (int, float)) and not isinstance(valor, bool):
+        return valor
+    if tipo is not None and isinstance(valor, str) and valor:
+        try:
+            return int(float(valor)) if tipo is int else float(valor)
+        except ValueError:
+            return None
+    return None
+
+class _Hoja:
+    """
+    Hoja con encabezado en negrita, fijo al desplazarse; las filas se escriben en orden
+    """
+    def __init__(self, libro, nombre, encabezado, negrita):
+        self.hoja = libro.add_worksheet(nombre)
+        self.hoja.freeze_panes(1, 0)
+        for columna, titulo in enumerate(encabezado):
+            self.hoja.set_column(columna, columna, max(10, min(45, len(titulo) + 4)))
+            self.hoja.write_string(0, columna, titulo, negrita)
+        self.tipos = list(enumerate(_tipo_columna(titulo) for titulo in encabezado))
+        self.fila = 1
+
+    def escribir(self, filas):
+        hoja = self.hoja
+        for fila in filas:
+            for (columna, tipo), valor in zip(self.tipos, fila):
+                if valor is None or valor == '':
+                    continue
+                numero = _numero(valor, tipo)
+                if numero is not None:
+                    hoja.write_number(self.fila, columna, numero)
+                else:
+                    hoja.write_string(self.fila, columna, str(valor))
+            self.fila += 1
+
+class SalidaXLSX:
+    """
+    Salida XLSX para ExportadorConsolidado: las filas de cada resultado (`filas_de`)
+    van a la hoja de su aula (`hoja_de`). Con `resumen` = (nombre, encabezado, filas_de)
+    la primera hoja lleva una fila de resumen por resultado. Pasadas `max_hojas` hojas,
+    el resto de los resultados van a la hoja HOJA_EXCEDENTE
+    """
+    def __init__(self, archivo_xlsx, encabezado, filas_de, hoja_de, resumen=None, max_hojas=MAX_HOJAS_POR_LIBRO):
+        self.archivo = archivo_xlsx
+        self.encabezado = encabezado
+        self.filas_de = filas_de
+        self.hoja_de = hoja_de
+        self.resumen = resumen
+        self.max_hojas = max_hojas
+        self._libro = None
+        self._negrita = None
+        self._hojas = {}
+        self._nombres = set()
+        self._hoja_resumen = None
+
+    def abrir(self):
+        import xlsxwriter
+
+        self._libro = xlsxwriter.Workbook(self.archivo, {'constant_memory': True})
+        self._negrita = self._libro.add_format({'bold': True})
+        if self.resumen:
+            nombre, encabezado, _ = self.resumen
+            self._hoja_resumen = _Hoja(self._libro, self._nombre_hoja(nombre), encabezado, self._negrita)
+
+    def _nombre_hoja(self, nombre):
+        # Excel admite hasta 31 caracteres, sin []:*?/\ y sin repetir nombres
+        base = _CARACTERES_HOJA.sub('_', str(nombre or 'Hoja'))[:31]
+        candidato, n = base, 2
+        while candidato.lower() in self._nombres:
+            sufijo = f"_{n}"
+            candidato, n = base[:31 - len(sufijo)] + sufijo, n + 1
+        self._nombres.add(candidato.lower())
+        return candidato
+
+    def escribir(self, resultado):
+        if self._hoja_resumen:
+            self._hoja_resumen.escribir(self.resumen[2](resultado))
+        clave = self.hoja_de(resultado)
+        if clave not in self._hojas and len(self._hojas) >= self.max_hojas:
+            if HOJA_EXCEDENTE not in self._hojas:
+                print(f"⚠️  {self.archivo}: más de {self.max_hojas} hojas, el resto va a la hoja '{HOJA_EXCEDENTE}'")
+            clave = HOJA_EXCEDENTE
+        if clave not in self._hojas:
+            self._hojas[clave] = _Hoja(self._libro, self._nombre_hoja(clave), self.encabezado, self._negrita)
+        self._hojas[clave].escribir(self.filas_de(resultado))
+
+    def cerrar(self):
+        if not self._hojas and not self._hoja_resumen:
+            _Hoja(self._libro, 'Hoja', self.encabezado, self._negrita)
+        self._libro.close()
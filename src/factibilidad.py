@@ -0,0 +1,101 @@
+from src.logic.indice_reservas import hora_a_minutos
+import bisect
+
+def _capacidad_requerida(ocupacion):
+    capacidad_raw = ocupacion.get('CAPACIDADMAXIMA')
+    return int(capacidad_raw) if capacidad_raw else 0
+
+def verificar_factibilidad(ocupaciones, aulas_libres):
+    """
+    Pre-chequeo rápido antes de resolver. En cada instante de inicio de una ocupación
+    se comparan, para cada umbral de capacidad c, las ocupaciones activas que necesitan
+    al menos c contra las aulas de capacidad >= c libres en ese instante (condición de
+    Hall con capacidades anidadas). El déficit de cada franja es una cota inferior de
+    los conflictos en ella; las franjas cuyos conjuntos de ocupaciones son disjuntos se
+    suman con programación dinámica para obtener la cota global.
+    """
+    # 1. Índice día -> lista de (inicio, fin, capacidad) de bloques libres
+    libres_por_dia = {}
+    for (_, _, capacidad), bloques in aulas_libres.items():
+        for bloque in bloques:
+            libres_por_dia.setdefault(bloque['dia'], []).append(
+                (hora_a_minutos(bloque['inicio']), hora_a_minutos(bloque['fin']), capacidad or 0)
+            )
+
+    # 2. Ocupaciones por día en minutos
+    ocupaciones_por_dia = {}
+    for ocupacion in ocupaciones:
+        ocupaciones_por_dia.setdefault(ocupacion['CODIGODIA'], []).append((
+            hora_a_minutos(ocupacion['HORAINICIO']),
+            hora_a_minutos(ocupacion['HORAFIN']),
+            _capacidad_requerida(ocupacion)
+        ))
+
+    franjas = []
+    cota_total = 0
+    for dia, intervalos in ocupaciones_por_dia.items():
+        bloques_dia = libres_por_dia.get(dia, [])
+        franjas_dia = []
+
+        # 3. Déficit en cada instante de inicio (los máximos de solapamiento ocurren en un inicio)
+        for instante in sorted({ini for ini, _, _ in intervalos}):
+            activas = [(fin, capacidad) for ini, fin, capacidad in intervalos if ini <= instante < fin]
+            capacidades_libres = sorted(capacidad for ini, fin, capacidad in bloques_dia if ini <= instante < fin)
+
+            deficit = 0
+            umbral = 0
+            requeridas = sorted((capacidad for _, capacidad in activas), reverse=True)
+            for k, capacidad in enumerate(requeridas, 1):
+                oferta = len(capacidades_libres) - bisect.bisect_left(capacidades_libres, capacidad)
+                if k - oferta > deficit:
+                    deficit = k - oferta
+                    umbral = capacidad
+
+            if deficit > 0:
+                franjas_dia.append({
+                    'dia': dia,
+                    'hora': f"{instante // 60:02d}:{instante % 60:02d}",
+                    'instante': instante,
+                    # Ninguna ocupación activa sigue viva después de este minuto
+                    'fin_activas': max(fin for fin, _ in activas),
+                    'capacidad_umbral': umbral,
+                    'demanda': sum(1 for c in requeridas if c >= umbral),
+                    'oferta': len(capacidades_libres) - bisect.bisect_left(capacidades_libres, umbral),
+                    'deficit': deficit
+                })
+
+        # 4. Suma máxima de déficits sobre franjas con ocupaciones disjuntas (scheduling ponderado)
+        mejor = [0] * (len(franjas_dia) + 1)
+        instantes = [f['instante'] for f in franjas_dia]
+        for i in range(len(franjas_dia) - 1, -1, -1):
+            siguiente = bisect.bisect_left(instantes, franjas_dia[i]['fin_activas'])
+            mejor[i] = max(mejor[i + 1], franjas_dia[i]['deficit'] + mejor[siguiente])
+        cota_total += mejor[0] if franjas_dia else 0
+        franjas.extend(franjas_dia)
+
+    for franja in franjas:
+        del franja['instante']
+        del franja['fin_activas']
+
+    return {
+        'total_ocupaciones': len(ocupaciones),
+        'cota_minima_conflictos': cota_total,
+        'franjas_sobresuscritas': franjas,
+        'factible': cota_total == 0
+    }
+
+def mostrar_factibilidad(resultado):
+    """
+    Muestra el resultado del pre-chequeo en consola
+    """
+    print(f"\n🔎 Pre-chequeo de factibilidad:")
+    print(f"   • Ocupaciones a reubicar: {resultado['total_ocupaciones']}")
+    print(f"   • Conflictos inevitables (cota mínima): {resultado['cota_minima_conflictos']}")
+    if resultado['franjas_sobresuscritas']:
+        print(f"   • Franjas sobresuscritas: {len(resultado['franjas_sobresuscritas'])}")
+        for franja in resultado['franjas_sobresuscritas'][:10]:
+            print(f"     - {franja['dia']} {franja['hora']} | cap >= {franja['capacidad_umbral']}: {franja['demanda']} ocupaciones para {franja['oferta']} aulas libres (déficit {franja['deficit']})")
+        if len(resultado['franjas_sobresuscritas']) > 10:
+            print(f"     ... y {len(resultado['franjas_sobresuscritas']) - 10} franjas más")
+    else:
+        print(f"   ✅ Ninguna franja está sobresuscrita")
@@ -0,0 +1,425 @@
+from src.compresion import abrir_entrada, abrir_salida, compresion_de_archivo
+from datetime import datetime
+import json
+import os
+
+# Formato normalizado de los planes (JSON de reorganización, consolidados y multicampus).
+# Ocupaciones, aulas y prioridades se guardan una sola vez en tablas (columnas + filas)
+# y los movimientos y conflictos de cada 'plan_movimientos' son filas que las
+# referencian por índice. El resto del documento (solución de un aula, 'resultados',
+# 'aulas_adicionales', 'fragmentos') conserva su forma.
+#   {"formato": "plan_normalizado", "version": 1, "tablas": {...}, "documento": {...}}
+# orjson y msgpack son opcionales: sin orjson se usa json sin sangría, y msgpack
+# solo se usa si se pide.
+# Las aulas agregadas al continuar un plan no reescriben el archivo: se anexan, una
+# por línea, a <archivo>.adicionales.jsonl (cada línea es un plan normalizado propio).
+# leer_plan las integra en 'aulas_adicionales' como si estuvieran en el archivo.
+
+FORMATO_PLAN = 'plan_normalizado'
+VERSION_PLAN = 1
+FORMATOS_SALIDA = ('normalizado', 'legado', 'msgpack')
+
+# Un aula referenciada es [id_aula, score, id_bloque_libre] (id_bloque_libre puede ser null)
+COLUMNAS_MOVIMIENTO = ['ocupacion', 'prioridad', 'aula_destino', 'score', 'aula_origen', 'extra']
+COLUMNAS_CONFLICTO = ['ocupacion', 'prioridad', 'tipo', 'extra']
+
+_CLAVES_MOVIMIENTO = {'ocupacion', 'prioridad', 'aula_destino', 'score', 'aula_origen'}
+_CLAVES_CONFLICTO = {'ocupacion', 'prioridad', 'tipo'}
+
+class _Tabla:
+    """
+    Tabla de registros distintos (dicts). Cada fila es la lista de valores en el
+    orden de las columnas (más corta si le faltan las últimas); un registro con otro
+    juego de claves se guarda tal cual, como objeto
+    """
+    def __init__(self, columnas=None, filas=None):
+        self.columnas = list(columnas or [])
+        self.filas = list(filas or [])
+        self._posicion = {columna: i for i, columna in enumerate(self.columnas)}
+        self._ids = {}
+
+    def id_de(self, registro):
+        # Por texto JSON y no por tupla de items: 1, 1.0 y True son la misma clave de dict
+        clave = json.dumps(registro, sort_keys=True, default=str)
+        id_registro = self._ids.get(clave)
+        if id_registro is None:
+            for columna in registro:
+                if columna not in self._posicion:
+                    self._posicion[columna] = len(self.columnas)
+                    self.columnas.append(columna)
+            id_registro = len(self.filas)
+            columnas = self.columnas[:len(registro)]
+            if set(columnas) == set(registro):
+                self.filas.append([registro[columna] for columna in columnas])
+            else:
+                self.filas.append(dict(registro))
+            self._ids[clave] = id_registro
+        return id_registro
+
+    def registro(self, id_registro):
+        fila = self.filas[id_registro]
+        if isinstance(fila, dict):
+            return dict(fila)
+        return dict(zip(self.columnas, fila))
+
+    def a_dict(self):
+        return {'columnas': self.columnas, 'filas': self.filas}
+
+class CompactadorPlan:
+    """
+    Convierte soluciones al formato normalizado sobre tablas compartidas, así un
+    consolidado guarda cada aula y cada prioridad una sola vez
+    """
+    def __init__(self):
+        self.ocupaciones = _Tabla()
+        self.prioridades = _Tabla()
+        self.aulas = _Tabla()
+        self.bloques = _Tabla()
+
+    def _ref_aula(self, aula):
+        datos = {k: v for k, v in aula.items() if k not in ('score', 'bloque_libre')}
+        bloque = aula.get('bloque_libre')
+        return [
+            self.aulas.id_de(datos),
+            aula.get('score'),
+            self.bloques.id_de(bloque) if bloque else None
+        ]
+
+    def _plan(self, plan):
+        movimientos = []
+        for movimiento in plan.get('movimientos', []):
+            extra = {k: v for k, v in movimiento.items() if k not in _CLAVES_MOVIMIENTO}
+            movimientos.append([
+                self.ocupaciones.id_de(movimiento['ocupacion']),
+                self.prioridades.id_de(movimiento['prioridad']),
+                self._ref_aula(movimiento['aula_destino']),
+                movimiento['score'],
+                movimiento.get('aula_origen'),
+                extra or None
+            ])
+
+        conflictos = []
+        for conflicto in plan.get('conflictos', []):
+            extra = {k: v for k, v in conflicto.items() if k not in _CLAVES_CONFLICTO}
+            if 'aulas_candidatas' in extra:
+                extra['aulas_candidatas'] = [self._ref_aula(aula) for aula in extra['aulas_candidatas']]
+            conflictos.append([
+                self.ocupaciones.id_de(conflicto['ocupacion']),
+                self.prioridades.id_de(conflicto['prioridad']),
+                conflicto['tipo'],
+                extra or None
+            ])
+
+        compacto = {k: v for k, v in plan.items() if k not in ('movimientos', 'conflictos')}
+        if 'aulas_utilizadas' in compacto:
+            compacto['aulas_utilizadas'] = list(compacto['aulas_utilizadas'])
+        compacto['movimientos'] = movimientos
+        compacto['conflictos'] = conflictos
+        return compacto
+
+    def compactar_solucion(self, solucion):
+        return dict(solucion, plan_movimientos=self._plan(solucion['plan_movimientos']))
+
+    def compactar(self, valor):
+        """
+        Compacta toda solución (dict con 'plan_movimientos') que encuentre dentro de `valor`
+        """
+        return _recorrer(valor, self.compactar_solucion)
+
+    def documento(self, contenido):
+        return {
+            'formato': FORMATO_PLAN,
+            'version': VERSION_PLAN,
+            'columnas_movimiento': COLUMNAS_MOVIMIENTO,
+            'columnas_conflicto': COLUMNAS_CONFLICTO,
+            'tablas': {
+                'ocupaciones': self.ocupaciones.a_dict(),
+                'prioridades': self.prioridades.a_dict(),
+                'aulas': self.aulas.a_dict(),
+                'bloques': self.bloques.a_dict()
+            },
+            'documento': contenido
+        }
+
+def _recorrer(valor, transformar):
+    if isinstance(valor, dict):
+        if 'plan_movimientos' in valor:
+            return transformar(valor)
+        return {clave: _recorrer(v, transformar) for clave, v in valor.items()}
+    if isinstance(valor, list):
+        return [_recorrer(v, transformar) for v in valor]
+    return valor
+
+def resultados_del_plan(valor):
+    """
+    Resultados (aula, exito, solucion, error) de todas las soluciones de un plan de cualquier
+    tipo (un aula, consolidado o multicampus), incluidas sus aulas agregadas
+    """
+    if isinstance(valor, dict):
+        if 'plan_movimientos' in valor:
+            yield {'aula': valor.get('aula_origen'), 'exito': True, 'solucion': valor, 'error': None}
+            # Un plan de un aula continuado lleva las aulas agregadas a su lado
+            yield from resultados_del_plan(valor.get('aulas_adicionales', []))
+            return
+        if 'exito' in valor and ('aula' in valor or 'aula_origen' in valor):
+            yield {
+                'aula': valor.get('aula_origen', valor.get('aula')),
+                'exito': valor['exito'],
+                'solucion': valor.get('solucion'),
+                'error': valor.get('error')
+            }
+            return
+        for v in valor.values():
+            yield from resultados_del_plan(v)
+    elif isinstance(valor, list):
+        for v in valor:
+            yield from resultados_del_plan(v)
+
+def compactar_plan(documento):
+    """
+    Documento en formato legado → formato normalizado
+    """
+    compactador = CompactadorPlan()
+    return compactador.documento(compactador.compactar(documento))
+
+def expandir_plan(normalizado):
+    """
+    Documento en formato normalizado → formato legado (el que usa el resto del código)
+    """
+    if normalizado.get('version', 0) > VERSION_PLAN:
+        raise ValueError(f"Versión de plan no soportada: {normalizado.get('version')} (máxima {VERSION_PLAN})")
+
+    tablas = normalizado['tablas']
+    ocupaciones = _Tabla(**tablas['ocupaciones'])
+    prioridades = _Tabla(**tablas['prioridades'])
+    aulas = _Tabla(**tablas['aulas'])
+    bloques = _Tabla(**tablas['bloques'])
+
+    def aula_de(referencia):
+        id_aula, score, bloque = referencia
+        aula = aulas.registro(id_aula)
+        if score is not None:
+            aula['score'] = score
+        if bloque is not None:
+            aula['bloque_libre'] = bloques.registro(bloque)
+        return aula
+
+    def expandir_solucion(solucion):
+        plan = dict(solucion['plan_movimientos'])
+        movimientos = []
+        for id_ocupacion, id_prioridad, aula_destino, score, aula_origen, extra in plan['movimientos']:
+            movimiento = {
+                'ocupacion': ocupaciones.registro(id_ocupacion),
+                'prioridad': prioridades.registro(id_prioridad),
+                'aula_destino': aula_de(aula_destino),
+                'score': score
+            }
+            if aula_origen is not None:
+                movimiento['aula_origen'] = aula_origen
+            movimiento.update(extra or {})
+            movimientos.append(movimiento)
+
+        conflictos = []
+        for id_ocupacion, id_prioridad, tipo, extra in plan['conflictos']:
+            conflicto = {
+                'ocupacion': ocupaciones.registro(id_ocupacion),
+                'prioridad': prioridades.registro(id_prioridad),
+                'tipo': tipo
+            }
+            extra = dict(extra or {})
+            if 'aulas_candidatas' in extra:
+                extra['aulas_candidatas'] = [aula_de(referencia) for referencia in extra['aulas_candidatas']]
+            conflicto.update(extra)
+            conflictos.append(conflicto)
+
+        plan['movimientos'] = movimientos
+        plan['conflictos'] = conflictos
+        return dict(solucion, plan_movimientos=plan)
+
+    return _recorrer(normalizado['documento'], expandir_solucion)
+
+def _por_defecto(valor):
+    if isinstance(valor, (set, frozenset)):
+        return list(valor)
+    return str(valor)
+
+def msgpack_disponible():
+    try:
+        import msgpack  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def formato_plan_de(configuracion):
+    """
+    Formato de salida pedido en la configuración; si pide msgpack y no está instalado, avisa y usa JSON
+    """
+    formato = (configuracion or {}).get('formato_plan') or 'normalizado'
+    if formato == 'msgpack' and not msgpack_disponible():
+        print("⚠️  msgpack no está instalado (pip install msgpack): el plan se guarda como JSON normalizado")
+        return 'normalizado'
+    return formato
+
+def archivo_plan(prefijo_archivo, formato):
+    return f"{prefijo_archivo}.msgpack" if formato == 'msgpack' else f"{prefijo_archivo}.json"
+
+def serializar_plan(documento, formato='normalizado'):
+    """
+    Bytes del plan en el formato pedido (el documento ya normalizado si corresponde)
+    """
+    if formato == 'msgpack':
+        import msgpack
+        return msgpack.packb(documento, default=_por_defecto, use_bin_type=True)
+    if formato == 'legado':
+        return json.dumps(documento, indent=2, ensure_ascii=False, default=_por_defecto).encode('utf-8')
+    try:
+        import orjson
+        return orjson.dumps(documento, default=_por_defecto)
+    except ImportError:
+        return json.dumps(documento, ensure_ascii=False, separators=(',', ':'), default=_por_defecto).encode('utf-8')
+
+def guardar_plan(documento, archivo, formato='normalizado'):
+    """
+    Guarda un documento de plan (formato legado en memoria) en el formato pedido.
+    Escritura atómica: archivo temporal y reemplazo
+    """
+    if formato != 'legado':
+        documento = compactar_plan(documento)
+    temporal = f"{archivo}.tmp"
+    with abrir_salida(temporal, 'wb', compresion_de_archivo(archivo)) as archivo_salida:
+        archivo_salida.write(serializar_plan(documento, formato))
+    os.replace(temporal, archivo)
+
+def _deserializar(contenido):
+    if contenido.lstrip()[:1] in (b'{', b'['):
+        try:
+            import orjson
+            return orjson.loads(contenido)
+        except ImportError:
+            return json.loads(contenido.decode('utf-8'))
+    import msgpack
+    return msgpack.unpackb(contenido, raw=False, strict_map_key=False)
+
+def leer_plan(archivo, con_adicionales=True):
+    """
+    Lee un plan en cualquier formato (JSON legado, JSON normalizado o msgpack),
+    con las aulas agregadas de su sidecar. Retorna (documento en formato legado, formato del archivo)
+    """
+    with abrir_entrada(archivo, 'rb') as archivo_entrada:
+        contenido = archivo_entrada.read()
+    es_json = contenido.lstrip()[:1] in (b'{', b'[')
+    documento = _deserializar(contenido)
+    formato = 'legado'
+    if isinstance(documento, dict) and documento.get('formato') == FORMATO_PLAN:
+        documento = expandir_plan(documento)
+        formato = 'normalizado' if es_json else 'msgpack'
+    if con_adicionales:
+        for entrada in leer_adicionales(archivo):
+            _integrar_adicional(documento, entrada)
+    return documento, formato
+
+def cargar_plan(archivo):
+    return leer_plan(archivo)[0]
+
+def formato_archivo_plan(archivo):
+    """
+    Formato de un plan ya guardado, mirando solo el comienzo del archivo
+    ('formato' es siempre la primera clave del formato normalizado)
+    """
+    with abrir_entrada(archivo, 'rb') as archivo_entrada:
+        inicio = archivo_entrada.read(64).lstrip()
+    if inicio[:1] not in (b'{', b'['):
+        return 'msgpack'
+    return 'normalizado' if f'"formato":"{FORMATO_PLAN}"'.encode() in inicio.replace(b' ', b'') else 'legado'
+
+def archivo_adicionales(archivo):
+    return f"{archivo}.adicionales.jsonl"
+
+def agregar_aula_adicional(archivo, solucion):
+    """
+    Agrega la solución de un aula al plan sin reescribirlo: una línea al final del sidecar
+    """
+    entrada = {
+        'aula_origen': solucion['aula_origen'],
+        'fecha_agregada': datetime.now().isoformat(),
+        'solucion': solucion
+    }
+    with open(archivo_adicionales(archivo), 'ab') as sidecar:
+        sidecar.write(serializar_plan(compactar_plan(entrada)) + b'\n')
+        sidecar.flush()
+        os.fsync(sidecar.fileno())
+    return entrada
+
+def leer_adicionales(archivo):
+    """
+    Aulas agregadas del sidecar, una a una y en orden. Una última línea incompleta
+    (corte durante la escritura) se ignora
+    """
+    ruta = archivo_adicionales(archivo)
+    if not os.path.exists(ruta):
+        return
+    with open(ruta, 'rb') as sidecar:
+        for linea in sidecar:
+            if not linea.strip():
+                continue
+            try:
+                normalizado = _deserializar(linea)
+            except ValueError:
+                print(f"⚠️  Línea incompleta ignorada en {ruta}")
+                continue
+            yield expandir_plan(normalizado)
+
+def _integrar_adicional(documento, entrada):
+    documento.setdefault('aulas_adicionales', []).append(entrada)
+    estadisticas = documento.setdefault('estadisticas_consolidadas', {
+        'total_aulas_procesadas': 0,
+        'total_movimientos_exitosos': 0,
+        'total_conflictos': 0
+    })
+    estadisticas['total_aulas_procesadas'] += 1
+    estadisticas['total_movimientos_exitosos'] += len(entrada['solucion']['plan_movimientos']['movimientos'])
+    estadisticas['total_conflictos'] += len(entrada['solucion']['plan_movimientos']['conflictos'])
+    documento['fecha_ultima_modificacion'] = entrada['fecha_agregada']
+
+def integrar_adicionales(archivo):
+    """
+    Reescribe el plan con las aulas del sidecar incluidas (en su mismo formato) y borra el sidecar
+    """
+    ruta = archivo_adicionales(archivo)
+    if not os.path.exists(ruta):
+        return 0
+    documento, _ = leer_plan(archivo)
+    guardar_plan(documento, archivo, formato_archivo_plan(archivo))
+    os.remove(ruta)
+    return len(documento.get('aulas_adicionales', []))
+
+class SalidaPlanNormalizado:
+    """
+    Salida para ExportadorConsolidado: compacta cada resultado al recibirlo (solo
+    quedan en memoria las tablas y las filas de índices) y escribe el documento al cerrar
+    """
+    def __init__(self, archivo, cabecera, elemento_de, formato='normalizado'):
+        self.archivo = archivo
+        self.cabecera = cabecera
+        self.elemento_de = elemento_de
+        self.formato = formato
+        self._compactador = None
+        self._resultados = None
+
+    def abrir(self):
+        self._compactador = CompactadorPlan()
+        self._resultados = []
+
+    def escribir(self, resultado):
+        self._resultados.append(self._compactador.compactar(self.elemento_de(resultado)))
+
+    def cerrar(self):
+        contenido = dict(self.cabecera, resultados=self._resultados, aulas_procesadas=len(self._resultados))
+        temporal = f"{self.archivo}.tmp"
+        with abrir_salida(temporal, 'wb', compresion_de_archivo(self.archivo)) as archivo_salida:
+            archivo_salida.write(serializar_plan(self._compactador.documento(contenido), self.formato))
+        os.replace(temporal, self.archivo)
+
+    def interrumpir(self):
+        # El documento solo se escribe al cerrar: si el lote se corta no se escribe nada
+        self._resultados = None
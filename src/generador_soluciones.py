@@ -1,13 +1,31 @@
 from src.db.connection import create_connection
 from src.evaluador_movimientos import EvaluadorMovimientos
+from src.exportacion_streaming import ExportadorConsolidado, SalidaCSV
+from src.exportacion_columnar import COLUMNAS_CATALOGO, SalidaParquet, filas_columnares_catalogo
+from src.historial import SalidaHistorial
+from src.exportacion_xlsx import SalidaXLSX
+from src.compresion import abrir_salida
 import csv
 import json
 from datetime import datetime
 
+ENCABEZADO_CATALOGO_COMPLETO = [
+    'Tier', 'Dia', 'Hora_Inicio', 'Hora_Fin', 'Curso', 'Programa', 'Docente', 
+    'Capacidad_Requerida', 'Aula_Origen', 'Aula_Destino', 'Capacidad_Destino', 
+    'Score_Compatibilidad', 'Pabellon_Destino', 'Estado', 'Ranking_Opción'
+]
+
+ENCABEZADO_CATALOGO_RESUMIDO = [
+    'Tier', 'Dia', 'Hora_Inicio', 'Hora_Fin', 'Curso', 'Programa', 'Docente', 
+    'Capacidad_Requerida', 'Aula_Origen', 'Mejor_Aula_Destino', 'Capacidad_Destino', 
+    'Score_Mejor_Opción', 'Total_Opciones', 'Opciones_Score_Alto', 'Opciones_Score_Medio', 'Estado'
+]
+
 class GeneradorSoluciones:
-    def __init__(self, connection):
+    def __init__(self, connection, contexto=None):
         self.connection = connection
-        self.evaluador = EvaluadorMovimientos(connection)
+        self.evaluador = EvaluadorMovimientos(connection, contexto)
+        self.contexto = self.evaluador.contexto
     
     def generar_solucion_completa(self, codigo_aula_origen, campus_code=14, pabellon_codes=None, ano='2025', semestre='2'):
         """
@@ -17,9 +35,30 @@ class GeneradorSoluciones:
         
         # 1. Evaluar todos los movimientos posibles
         movimientos_posibles = self.evaluador.evaluar_movimientos_aula(
-            codigo_aula_origen, campus_code, pabellon_codes, ano, semestre
+            codigo_aula_origen, campus_code, pabellon_codes, ano=ano, semestre=semestre
         )
         
+        return self.generar_solucion_desde_movimientos(codigo_aula_origen, movimientos_posibles, campus_code, pabellon_codes, ano, semestre)
+    
+    def generar_solucion_desde_datos(self, codigo_aula_origen, ocupaciones, aulas_libres, campus_code=14, pabellon_codes=None, ano='2025', semestre='2'):
+        """
+        Igual que generar_solucion_completa, pero con las ocupaciones y las aulas libres
+        ya consultadas (no usa la conexión)
+        """
+        print(f"\n=== GENERANDO SOLUCIÓN COMPLETA PARA AULA {codigo_aula_origen} ===")
+        
+        if not ocupaciones:
+            print(f"No hay ocupaciones para el aula {codigo_aula_origen}")
+            print("No se encontraron movimientos posibles.")
+            return None
+        
+        movimientos_posibles = self.evaluador.evaluar_ocupaciones(codigo_aula_origen, ocupaciones, aulas_libres)
+        return self.generar_solucion_desde_movimientos(codigo_aula_origen, movimientos_posibles, campus_code, pabellon_codes, ano, semestre)
+    
+    def generar_solucion_desde_movimientos(self, codigo_aula_origen, movimientos_posibles, campus_code=14, pabellon_codes=None, ano='2025', semestre='2'):
+        """
+        Arma la solución a partir de movimientos ya evaluados (y eventualmente filtrados)
+        """
         if not movimientos_posibles:
             print("No se encontraron movimientos posibles.")
             return None
@@ -149,7 +188,7 @@ class GeneradorSoluciones:
         """
         Exporta la solución a CSV
         """
-        with open(archivo_csv, 'w', newline='', encoding='utf-8') as csvfile:
+        with abrir_salida(archivo_csv) as csvfile:
             writer = csv.writer(csvfile)
             writer.writerow([
                 'Aula_Origen', 'Aula_Destino', 'Tier', 'Dia', 'Hora_Inicio', 'Hora_Fin',
@@ -206,7 +245,7 @@ class GeneradorSoluciones:
         """
         Exporta la solución completa a JSON
         """
-        with open(archivo_json, 'w', encoding='utf-8') as jsonfile:
+        with abrir_salida(archivo_json) as jsonfile:
             json.dump(solucion, jsonfile, indent=2, ensure_ascii=False)
         
         print(f"Solución completa exportada a {archivo_json}")
@@ -242,65 +281,144 @@ class GeneradorSoluciones:
                 ocupacion = conflicto['ocupacion']
                 print(f"✗ {ocupacion['CODIGODIA']} {ocupacion['HORAINICIO']}-{ocupacion['HORAFIN']} | {ocupacion.get('NOMBRE_CURSO', '')} - {conflicto['tipo']}")
 
+    def _filas_catalogo_completo(self, movimiento):
+        """
+        Filas del catálogo completo para un curso: una por cada opción disponible
+        """
+        ocupacion = movimiento['ocupacion']
+        prioridad = movimiento['prioridad']
+        aulas_candidatas = movimiento['aulas_candidatas']
+        datos_curso = [
+            prioridad['tier'],
+            ocupacion['CODIGODIA'],
+            ocupacion['HORAINICIO'],
+            ocupacion['HORAFIN'],
+            ocupacion.get('NOMBRE_CURSO', ''),
+            ocupacion.get('NOMBRE_PROGRAMA', ''),
+            ocupacion.get('NOMBRE_DOCENTE', ''),
+            ocupacion.get('CAPACIDADMAXIMA') or '',
+            ocupacion.get('CODIGOAULA', '')
+        ]
+        
+        if not aulas_candidatas:
+            # Fila para cursos sin opciones - MUY CLARO
+            return [datos_curso + [
+                '❌ NO HAY AULAS DISPONIBLES',
+                '❌ NO HAY AULAS DISPONIBLES',
+                '❌ NO HAY AULAS DISPONIBLES',
+                '❌ NO HAY AULAS DISPONIBLES',
+                '❌ SIN_OPCIONES_DISPONIBLES',
+                '❌ 0 OPCIONES'
+            ]]
+        
+        # Todas las opciones disponibles, ordenadas por score
+        filas = []
+        for i, aula_candidata in enumerate(aulas_candidatas, 1):
+            pabellon_destino = aula_candidata['codigo'][:2] if len(aula_candidata['codigo']) >= 2 else 'N/A'
+            filas.append(datos_curso + [
+                aula_candidata['codigo'],
+                aula_candidata['capacidad'],
+                aula_candidata['score'],
+                pabellon_destino,
+                'DISPONIBLE',
+                f"Opción {i} de {len(aulas_candidatas)}"
+            ])
+        return filas
+    
+    def _filas_catalogo_resumido(self, movimiento):
+        """
+        Fila del catálogo resumido para un curso: mejor opción y estadísticas
+        """
+        ocupacion = movimiento['ocupacion']
+        prioridad = movimiento['prioridad']
+        aulas_candidatas = movimiento['aulas_candidatas']
+        datos_curso = [
+            prioridad['tier'],
+            ocupacion['CODIGODIA'],
+            ocupacion['HORAINICIO'],
+            ocupacion['HORAFIN'],
+            ocupacion.get('NOMBRE_CURSO', ''),
+            ocupacion.get('NOMBRE_PROGRAMA', ''),
+            ocupacion.get('NOMBRE_DOCENTE', ''),
+            ocupacion.get('CAPACIDADMAXIMA') or '',
+            ocupacion.get('CODIGOAULA', '')
+        ]
+        
+        if not aulas_candidatas:
+            return [datos_curso + [
+                '❌ NO HAY AULAS DISPONIBLES',
+                '❌ NO HAY AULAS DISPONIBLES',
+                '❌ NO HAY AULAS DISPONIBLES',
+                '❌ 0 OPCIONES',
+                '❌ 0 OPCIONES',
+                '❌ SIN_OPCIONES_DISPONIBLES'
+            ]]
+        
+        mejor_opcion = aulas_candidatas[0]
+        
+        # Contar opciones por categoría de score
+        opciones_alto = sum(1 for a in aulas_candidatas if a['score'] >= 90)
+        opciones_medio = sum(1 for a in aulas_candidatas if 70 <= a['score'] < 90)
+        
+        return [datos_curso + [
+            mejor_opcion['codigo'],
+            mejor_opcion['capacidad'],
+            mejor_opcion['score'],
+            len(aulas_candidatas),
+            opciones_alto,
+            opciones_medio,
+            'MÚLTIPLES_OPCIONES'
+        ]]
+    
+    def _salida_catalogo_completo(self, archivo_csv):
+        return SalidaCSV(archivo_csv, ENCABEZADO_CATALOGO_COMPLETO, self._filas_catalogo_completo)
+    
+    def _salida_catalogo_resumido(self, archivo_csv):
+        return SalidaCSV(archivo_csv, ENCABEZADO_CATALOGO_RESUMIDO, self._filas_catalogo_resumido)
+    
+    def salida_catalogo_xlsx(self, archivo_xlsx, aula_origen='Catalogo'):
+        """
+        Libro XLSX del catálogo: hoja 'Resumido' y el completo en una hoja por aula de origen
+        """
+        return SalidaXLSX(
+            archivo_xlsx, ENCABEZADO_CATALOGO_COMPLETO, self._filas_catalogo_completo,
+            lambda movimiento: movimiento['ocupacion'].get('CODIGOAULA') or aula_origen,
+            ('Resumido', ENCABEZADO_CATALOGO_RESUMIDO, self._filas_catalogo_resumido)
+        )
+    
+    def exportar_catalogos(self, movimientos_posibles, archivo_completo, archivo_resumido, archivo_parquet=None, ruta_historial=None, archivo_xlsx=None):
+        """
+        Exporta el catálogo completo y el resumido recorriendo los cursos una sola vez;
+        con `archivo_parquet` también el completo en formato columnar, con `archivo_xlsx`
+        ambos en un libro XLSX y con `ruta_historial` registra sus opciones en el historial
+        """
+        salidas = [self._salida_catalogo_completo(archivo_completo), self._salida_catalogo_resumido(archivo_resumido)]
+        if archivo_parquet:
+            salidas.append(SalidaParquet(archivo_parquet, COLUMNAS_CATALOGO, filas_columnares_catalogo))
+        if ruta_historial:
+            salidas.append(SalidaHistorial(ruta_historial, archivo_completo, 'catalogo', None, 'opciones', filas_columnares_catalogo))
+        if archivo_xlsx:
+            salidas.append(self.salida_catalogo_xlsx(archivo_xlsx))
+        with ExportadorConsolidado(salidas) as exportador:
+            for movimiento in movimientos_posibles:
+                exportador.escribir(movimiento)
+        
+        print(f"Catálogo completo exportado a {archivo_completo}")
+        print(f"Catálogo resumido exportado a {archivo_resumido}")
+        if archivo_parquet:
+            print(f"Catálogo completo (columnar) exportado a {archivo_parquet}")
+        if archivo_xlsx:
+            print(f"Catálogos en Excel exportados a {archivo_xlsx}")
+        print(f"⚠️  Los cursos sin opciones aparecen como '❌ NO HAY AULAS DISPONIBLES'")
+    
     def exportar_catalogo_completo_opciones(self, movimientos_posibles, archivo_csv='catalogo_completo_opciones.csv'):
         """
         Exporta un catálogo completo con TODAS las opciones disponibles para cada curso
         Permite selección manual de la mejor opción
         """
-        with open(archivo_csv, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.writer(csvfile)
-            writer.writerow([
-                'Tier', 'Dia', 'Hora_Inicio', 'Hora_Fin', 'Curso', 'Programa', 'Docente', 
-                'Capacidad_Requerida', 'Aula_Origen', 'Aula_Destino', 'Capacidad_Destino', 
-                'Score_Compatibilidad', 'Pabellon_Destino', 'Estado', 'Ranking_Opción'
-            ])
-            
+        with ExportadorConsolidado([self._salida_catalogo_completo(archivo_csv)]) as exportador:
             for movimiento in movimientos_posibles:
-                ocupacion = movimiento['ocupacion']
-                prioridad = movimiento['prioridad']
-                aulas_candidatas = movimiento['aulas_candidatas']
-                
-                if aulas_candidatas:
-                    # Escribir todas las opciones disponibles, ordenadas por score
-                    for i, aula_candidata in enumerate(aulas_candidatas, 1):
-                        pabellon_destino = aula_candidata['codigo'][:2] if len(aula_candidata['codigo']) >= 2 else 'N/A'
-                        
-                        writer.writerow([
-                            prioridad['tier'],
-                            ocupacion['CODIGODIA'],
-                            ocupacion['HORAINICIO'],
-                            ocupacion['HORAFIN'],
-                            ocupacion.get('NOMBRE_CURSO', ''),
-                            ocupacion.get('NOMBRE_PROGRAMA', ''),
-                            ocupacion.get('NOMBRE_DOCENTE', ''),
-                            ocupacion.get('CAPACIDADMAXIMA') or '',
-                            ocupacion.get('CODIGOAULA', ''),
-                            aula_candidata['codigo'],
-                            aula_candidata['capacidad'],
-                            aula_candidata['score'],
-                            pabellon_destino,
-                            'DISPONIBLE',
-                            f"Opción {i} de {len(aulas_candidatas)}"
-                        ])
-                else:
-                    # Escribir fila para cursos sin opciones - MUY CLARO
-                    writer.writerow([
-                        prioridad['tier'],
-                        ocupacion['CODIGODIA'],
-                        ocupacion['HORAINICIO'],
-                        ocupacion['HORAFIN'],
-                        ocupacion.get('NOMBRE_CURSO', ''),
-                        ocupacion.get('NOMBRE_PROGRAMA', ''),
-                        ocupacion.get('NOMBRE_DOCENTE', ''),
-                        ocupacion.get('CAPACIDADMAXIMA') or '',
-                        ocupacion.get('CODIGOAULA', ''),
-                        '❌ NO HAY AULAS DISPONIBLES',
-                        '❌ NO HAY AULAS DISPONIBLES',
-                        '❌ NO HAY AULAS DISPONIBLES',
-                        '❌ NO HAY AULAS DISPONIBLES',
-                        '❌ SIN_OPCIONES_DISPONIBLES',
-                        '❌ 0 OPCIONES'
-                    ])
+                exportador.escribir(movimiento)
         
         print(f"Catálogo completo exportado a {archivo_csv}")
         print(f"📋 Este archivo contiene TODAS las opciones disponibles para cada curso.")
@@ -311,62 +429,9 @@ class GeneradorSoluciones:
         """
         Exporta un catálogo resumido con las mejores opciones y estadísticas
         """
-        with open(archivo_csv, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.writer(csvfile)
-            writer.writerow([
-                'Tier', 'Dia', 'Hora_Inicio', 'Hora_Fin', 'Curso', 'Programa', 'Docente', 
-                'Capacidad_Requerida', 'Aula_Origen', 'Mejor_Aula_Destino', 'Capacidad_Destino', 
-                'Score_Mejor_Opción', 'Total_Opciones', 'Opciones_Score_Alto', 'Opciones_Score_Medio', 'Estado'
-            ])
-            
+        with ExportadorConsolidado([self._salida_catalogo_resumido(archivo_csv)]) as exportador:
             for movimiento in movimientos_posibles:
-                ocupacion = movimiento['ocupacion']
-                prioridad = movimiento['prioridad']
-                aulas_candidatas = movimiento['aulas_candidatas']
-                
-                if aulas_candidatas:
-                    mejor_opcion = aulas_candidatas[0]
-                    
-                    # Contar opciones por categoría de score
-                    opciones_alto = sum(1 for a in aulas_candidatas if a['score'] >= 90)
-                    opciones_medio = sum(1 for a in aulas_candidatas if 70 <= a['score'] < 90)
-                    
-                    writer.writerow([
-                        prioridad['tier'],
-                        ocupacion['CODIGODIA'],
-                        ocupacion['HORAINICIO'],
-                        ocupacion['HORAFIN'],
-                        ocupacion.get('NOMBRE_CURSO', ''),
-                        ocupacion.get('NOMBRE_PROGRAMA', ''),
-                        ocupacion.get('NOMBRE_DOCENTE', ''),
-                        ocupacion.get('CAPACIDADMAXIMA') or '',
-                        ocupacion.get('CODIGOAULA', ''),
-                        mejor_opcion['codigo'],
-                        mejor_opcion['capacidad'],
-                        mejor_opcion['score'],
-                        len(aulas_candidatas),
-                        opciones_alto,
-                        opciones_medio,
-                        'MÚLTIPLES_OPCIONES'
-                    ])
-                else:
-                    writer.writerow([
-                        prioridad['tier'],
-                        ocupacion['CODIGODIA'],
-                        ocupacion['HORAINICIO'],
-                        ocupacion['HORAFIN'],
-                        ocupacion.get('NOMBRE_CURSO', ''),
-                        ocupacion.get('NOMBRE_PROGRAMA', ''),
-                        ocupacion.get('NOMBRE_DOCENTE', ''),
-                        ocupacion.get('CAPACIDADMAXIMA') or '',
-                        ocupacion.get('CODIGOAULA', ''),
-                        '❌ NO HAY AULAS DISPONIBLES',
-                        '❌ NO HAY AULAS DISPONIBLES',
-                        '❌ NO HAY AULAS DISPONIBLES',
-                        '❌ 0 OPCIONES',
-                        '❌ 0 OPCIONES',
-                        '❌ SIN_OPCIONES_DISPONIBLES'
-                    ])
+                exportador.escribir(movimiento)
         
         print(f"Catálogo resumido exportado a {archivo_csv}")
         print(f"📊 Este archivo muestra solo la mejor opción por curso y estadísticas.")
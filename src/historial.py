@@ -0,0 +1,437 @@
+from src.compresion import abrir_entrada
+from src.exportacion_columnar import COLUMNAS_CATALOGO, COLUMNAS_CONSOLIDADO, filas_columnares_consolidado
+from src.formato_plan import archivo_adicionales, leer_adicionales, leer_plan, resultados_del_plan
+from src.logic.indice_reservas import hora_a_minutos
+import csv
+import glob
+import json
+import os
+import re
+import sqlite3
+from datetime import datetime
+
+# Historial de todas las corridas en un SQLite local: cada plan o catálogo
+# exportado es una corrida, con sus filas de movimientos (mismas columnas que el
+# consolidado) o de opciones (mismas columnas que el catálogo completo). Los
+# exportadores escriben aquí a medida que exportan y `ingestar_archivos` carga
+# los archivos ya generados, así una consulta entre corridas usa los índices
+# en lugar de recorrer decenas de archivos.
+
+HISTORIAL_POR_DEFECTO = 'historial_reorganizaciones.sqlite'
+
+# Archivos que ingesta --ingestar-historial sin rutas: planes y catálogos completos
+PATRONES_INGESTA = [
+    'reorganizacion_*.json*', 'reorganizacion_*.msgpack*', 'consolidado_*.json*', 'consolidado_*.msgpack*',
+    'catalogo_*_completo.csv*', 'reorganizacion_*_completo.csv*', 'consolidado_*_completo.csv*'
+]
+
+FILTROS_BUSQUEDA = ('origen', 'destino', 'dia', 'hora', 'curso', 'desde', 'hasta', 'tabla')
+
+_TIPOS_SQL = {'texto': 'TEXT', 'int8': 'INTEGER', 'int16': 'INTEGER', 'int32': 'INTEGER', 'float32': 'REAL'}
+
+_ESQUEMA = f"""
+CREATE TABLE IF NOT EXISTS corridas (
+    id INTEGER PRIMARY KEY,
+    archivo TEXT UNIQUE NOT NULL,
+    tipo TEXT,
+    fecha TEXT,
+    configuracion TEXT,
+    completa INTEGER DEFAULT 0,
+    registrada TEXT
+);
+CREATE TABLE IF NOT EXISTS movimientos (
+    corrida_id INTEGER NOT NULL REFERENCES corridas(id),
+    {', '.join(f'{nombre} {_TIPOS_SQL[tipo]}' for nombre, tipo in COLUMNAS_CONSOLIDADO)}
+);
+CREATE TABLE IF NOT EXISTS opciones (
+    corrida_id INTEGER NOT NULL REFERENCES corridas(id),
+    {', '.join(f'{nombre} {_TIPOS_SQL[tipo]}' for nombre, tipo in COLUMNAS_CATALOGO)}
+);
+CREATE INDEX IF NOT EXISTS ix_corridas_fecha ON corridas (fecha);
+CREATE INDEX IF NOT EXISTS ix_movimientos_corrida ON movimientos (corrida_id);
+CREATE INDEX IF NOT EXISTS ix_movimientos_origen ON movimientos (aula_origen, dia, inicio_min);
+CREATE INDEX IF NOT EXISTS ix_movimientos_destino ON movimientos (aula_destino, dia, inicio_min);
+CREATE INDEX IF NOT EXISTS ix_movimientos_curso ON movimientos (curso);
+CREATE INDEX IF NOT EXISTS ix_opciones_corrida ON opciones (corrida_id);
+CREATE INDEX IF NOT EXISTS ix_opciones_origen ON opciones (aula_origen, dia, inicio_min);
+CREATE INDEX IF NOT EXISTS ix_opciones_destino ON opciones (aula_destino, dia, inicio_min);
+CREATE INDEX IF NOT EXISTS ix_opciones_curso ON opciones (curso);
+"""
+
+_COLUMNAS_TABLA = {
+    'movimientos': [nombre for nombre, _ in COLUMNAS_CONSOLIDADO],
+    'opciones': [nombre for nombre, _ in COLUMNAS_CATALOGO]
+}
+
+def ruta_historial(configuracion):
+    """
+    Ruta del historial según la configuración; None si está desactivado
+    """
+    return (configuracion or {}).get('historial', HISTORIAL_POR_DEFECTO)
+
+def minutos_a_hora(minutos):
+    return f"{minutos // 60:02d}:{minutos % 60:02d}" if minutos is not None else ''
+
+class HistorialPlanes:
+    """
+    Historial SQLite de corridas. En modo WAL varios procesos (p. ej. los fragmentos
+    de --multicampus) pueden escribir a la vez: cada escritura es una transacción corta
+    """
+    def __init__(self, ruta=HISTORIAL_POR_DEFECTO):
+        self.ruta = ruta
+        self.conexion = sqlite3.connect(ruta, timeout=30)
+        self.conexion.execute('PRAGMA journal_mode=WAL')
+        self.conexion.execute('PRAGMA synchronous=NORMAL')
+        self.conexion.executescript(_ESQUEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        self.cerrar()
+        return False
+
+    def cerrar(self):
+        self.conexion.close()
+
+    def registrar_corrida(self, archivo, tipo, fecha, configuracion=None):
+        """
+        Crea la corrida de un archivo; si el archivo ya estaba registrado, reemplaza sus filas
+        """
+        with self.conexion:
+            self._borrar_corrida(archivo)
+            cursor = self.conexion.execute(
+                'INSERT INTO corridas (archivo, tipo, fecha, configuracion, registrada) VALUES (?, ?, ?, ?, ?)',
+                (archivo, tipo, fecha, json.dumps(configuracion, ensure_ascii=False, default=str) if configuracion else None,
+                 datetime.now().isoformat(timespec='seconds'))
+            )
+        return cursor.lastrowid
+
+    def corrida_de(self, archivo, tipo, fecha, configuracion=None):
+        """
+        Id de la corrida de un archivo, creándola si no existe (sin borrar sus filas)
+        """
+        fila = self.conexion.execute('SELECT id FROM corridas WHERE archivo = ?', (archivo,)).fetchone()
+        return fila[0] if fila else self.registrar_corrida(archivo, tipo, fecha, configuracion)
+
+    def _borrar_corrida(self, archivo):
+        fila = self.conexion.execute('SELECT id FROM corridas WHERE archivo = ?', (archivo,)).fetchone()
+        if fila:
+            self.conexion.execute('DELETE FROM movimientos WHERE corrida_id = ?', fila)
+            self.conexion.execute('DELETE FROM opciones WHERE corrida_id = ?', fila)
+            self.conexion.execute('DELETE FROM corridas WHERE id = ?', fila)
+
+    def borrar_corrida(self, archivo):
+        with self.conexion:
+            self._borrar_corrida(archivo)
+
+    def agregar_filas(self, corrida_id, tabla, filas):
+        columnas = _COLUMNAS_TABLA[tabla]
+        with self.conexion:
+            self.conexion.executemany(
+                f"INSERT INTO {tabla} (corrida_id, {', '.join(columnas)}) VALUES ({', '.join('?' * (len(columnas) + 1))})",
+                ([corrida_id] + list(fila) for fila in filas)
+            )
+
+    def marcar_completa(self, corrida_id):
+        with self.conexion:
+            self.conexion.execute('UPDATE corridas SET completa = 1 WHERE id = ?', (corrida_id,))
+
+    def buscar(self, origen=None, destino=None, dia=None, hora=None, curso=None, desde=None, hasta=None, tabla='movimientos'):
+        """
+        Filas de todas las corridas que cumplen los filtros, de la más reciente a la más antigua.
+        `hora` (HH:MM) busca los horarios que la contienen; `curso` es un prefijo del nombre
+        (p. ej. el código); `desde`/`hasta` comparan la fecha de la corrida (ISO)
+        """
+        if tabla not in _COLUMNAS_TABLA:
+            raise ValueError(f"Tabla desconocida: {tabla} (usar movimientos u opciones)")
+        condiciones = []
+        parametros = []
+        for columna, valor in (('t.aula_origen', origen), ('t.aula_destino', destino), ('t.dia', dia.upper() if dia else None)):
+            if valor:
+                condiciones.append(f"{columna} = ?")
+                parametros.append(str(valor))
+        if hora:
+            minutos = hora_a_minutos(hora)
+            condiciones.append('t.inicio_min <= ? AND t.fin_min > ?')
+            parametros += [minutos, minutos]
+        if curso:
+            # Rango por prefijo en lugar de LIKE, así usa el índice de curso
+            condiciones.append('t.curso >= ? AND t.curso < ?')
+            parametros += [curso, curso + '\uffff']
+        if desde:
+            condiciones.append('c.fecha >= ?')
+            parametros.append(desde)
+        if hasta:
+            condiciones.append('c.fecha <= ?')
+            parametros.append(hasta)
+
+        columnas = _COLUMNAS_TABLA[tabla]
+        consulta = (
+            f"SELECT c.fecha, c.archivo, c.tipo, {', '.join('t.' + c for c in columnas)} "
+            f"FROM {tabla} t JOIN corridas c ON c.id = t.corrida_id"
+            + (f" WHERE {' AND '.join(condiciones)}" if condiciones else '')
+            + " ORDER BY c.fecha DESC, t.aula_origen, t.dia, t.inicio_min"
+        )
+        nombres = ['fecha', 'archivo', 'tipo'] + columnas
+        return [dict(zip(nombres, fila)) for fila in self.conexion.execute(consulta, parametros)]
+
+    def estadisticas(self):
+        return {
+            tabla: self.conexion.execute(f"SELECT COUNT(*) FROM {tabla}").fetchone()[0]
+            for tabla in ('corridas', 'movimientos', 'opciones')
+        }
+
+class SalidaHistorial:
+    """
+    Salida para ExportadorConsolidado: registra la corrida al abrir y guarda las filas
+    de cada resultado (`filas_de`) al recibirlo, en la tabla de movimientos u opciones
+    """
+    def __init__(self, ruta, archivo, tipo, configuracion, tabla, filas_de):
+        self.ruta = ruta
+        self.archivo = archivo
+        self.tipo = tipo
+        self.configuracion = configuracion
+        self.tabla = tabla
+        self.filas_de = filas_de
+        self._historial = None
+        self._corrida = None
+
+    def abrir(self):
+        self._historial = HistorialPlanes(self.ruta)
+        self._corrida = self._historial.registrar_corrida(
+            self.archivo, self.tipo, datetime.now().isoformat(timespec='seconds'), self.configuracion
+        )
+
+    def escribir(self, resultado):
+        self._historial.agregar_filas(self._corrida, self.tabla, self.filas_de(resultado))
+
+    def cerrar(self):
+        self._historial.marcar_completa(self._corrida)
+        self._historial.cerrar()
+
+    def interrumpir(self):
+        # La corrida queda registrada con completa = 0
+        self._historial.cerrar()
+
+def salida_historial(configuracion, archivo, tipo, tabla, filas_de):
+    """
+    SalidaHistorial para un exportador, o None si el historial está desactivado
+    """
+    ruta = ruta_historial(configuracion)
+    return SalidaHistorial(ruta, archivo, tipo, configuracion, tabla, filas_de) if ruta else None
+
+def registrar_en_historial(configuracion, archivo, tipo, tabla, filas):
+    """
+    Registra de una vez una corrida ya exportada (p. ej. el plan de una sola aula)
+    """
+    ruta = ruta_historial(configuracion)
+    if not ruta:
+        return
+    try:
+        with HistorialPlanes(ruta) as historial:
+            corrida = historial.registrar_corrida(archivo, tipo, datetime.now().isoformat(timespec='seconds'), configuracion)
+            historial.agregar_filas(corrida, tabla, filas)
+            historial.marcar_completa(corrida)
+    except sqlite3.Error as e:
+        print(f"⚠️  No se pudo registrar {archivo} en el historial {ruta}: {e}")
+
+def agregar_a_historial(configuracion, archivo, tipo, tabla, filas):
+    """
+    Agrega filas a la corrida de un archivo que crece (el sidecar de un plan continuado)
+    """
+    ruta = ruta_historial(configuracion)
+    if not ruta:
+        return
+    try:
+        with HistorialPlanes(ruta) as historial:
+            corrida = historial.corrida_de(archivo, tipo, datetime.now().isoformat(timespec='seconds'), configuracion)
+            historial.agregar_filas(corrida, tabla, filas)
+            historial.marcar_completa(corrida)
+    except sqlite3.Error as e:
+        print(f"⚠️  No se pudo registrar {archivo} en el historial {ruta}: {e}")
+
+# --- Ingesta de archivos ya generados ---
+
+def _fecha_archivo(archivo):
+    """
+    Fecha de la corrida según el timestamp del nombre (_AAAAMMDD_HHMMSS) o, si no tiene, la del archivo
+    """
+    coincidencia = re.search(r'_(\d{8}_\d{6})', os.path.basename(archivo))
+    if coincidencia:
+        return datetime.strptime(coincidencia.group(1), '%Y%m%d_%H%M%S').isoformat()
+    return datetime.fromtimestamp(os.path.getmtime(archivo)).isoformat(timespec='seconds')
+
+def _valor_csv(valor):
+    valor = (valor or '').strip()
+    return None if not valor or valor.startswith('❌') else valor
+
+def _numero_csv(valor, tipo=int):
+    valor = _valor_csv(valor)
+    try:
+        return tipo(float(valor)) if tipo is int else tipo(valor)
+    except (TypeError, ValueError):
+        return None
+
+def _minutos_csv(valor):
+    valor = _valor_csv(valor)
+    return hora_a_minutos(valor) if valor else None
+
+def _fila_catalogo_csv(fila, aula_origen):
+    """
+    Fila del catálogo completo CSV (cualquiera de sus encabezados) como fila de la tabla de opciones
+    """
+    opcion = re.match(r'Opción (\d+) de (\d+)', fila.get('Ranking_Opción') or fila.get('Ranking') or '')
+    estado = (fila.get('Estado') or '').replace('❌', '').strip()
+    return [
+        _numero_csv(fila.get('Tier')),
+        _valor_csv(fila.get('Dia')),
+        _minutos_csv(fila.get('Hora_Inicio')),
+        _minutos_csv(fila.get('Hora_Fin')),
+        _valor_csv(fila.get('Curso')),
+        _valor_csv(fila.get('Programa')),
+        _valor_csv(fila.get('Docente')),
+        _numero_csv(fila.get('Capacidad_Requerida')),
+        _valor_csv(fila.get('Aula_Origen')) or aula_origen,
+        _valor_csv(fila.get('Aula_Destino')),
+        _numero_csv(fila.get('Capacidad_Destino') or fila.get('Capacidad_Aula')),
+        _numero_csv(fila.get('Score_Compatibilidad'), float),
+        _valor_csv(fila.get('Pabellon_Destino') or fila.get('Pabellon')),
+        'SIN_OPCIONES_DISPONIBLES' if 'NO HAY AULAS' in estado else estado or None,
+        int(opcion.group(1)) if opcion else 0,
+        int(opcion.group(2)) if opcion else 0
+    ]
+
+def _fila_consolidado_csv(fila):
+    """
+    Fila del CSV automático (ENCABEZADO_CONSOLIDADO) como fila de la tabla de movimientos
+    """
+    return [
+        _valor_csv(fila.get('Aula_Origen')),
+        _valor_csv(fila.get('Aula_Destino')),
+        _numero_csv(fila.get('Tier')),
+        _valor_csv(fila.get('Dia')),
+        _minutos_csv(fila.get('Hora_Inicio')),
+        _minutos_csv(fila.get('Hora_Fin')),
+        _valor_csv(fila.get('Curso')),
+        _valor_csv(fila.get('Programa')),
+        _valor_csv(fila.get('Docente')),
+        _numero_csv(fila.get('Capacidad_Requerida')),
+        _numero_csv(fila.get('Capacidad_Destino')),
+        _numero_csv(fila.get('Score_Compatibilidad'), float),
+        _valor_csv(fila.get('Estado'))
+    ]
+
+def _aula_del_nombre(archivo):
+    coincidencia = re.match(r'(?:reorganizacion|catalogo)_([^_]+)_', os.path.basename(archivo))
+    return coincidencia.group(1) if coincidencia else None
+
+def _ingestar_csv(historial, archivo):
+    with abrir_entrada(archivo) as entrada:
+        lector = csv.DictReader(entrada)
+        encabezado = lector.fieldnames or []
+        if 'Ranking_Opción' in encabezado or 'Ranking' in encabezado:
+            tabla, tipo = 'opciones', 'catalogo'
+            aula_origen = _aula_del_nombre(archivo)
+            filas = (_fila_catalogo_csv(fila, aula_origen) for fila in lector)
+        elif '_automatico.csv' in archivo and 'Aula_Destino' in encabezado and 'Aula_Origen' in encabezado:
+            tabla, tipo = 'movimientos', 'csv_automatico'
+            filas = (_fila_consolidado_csv(fila) for fila in lector)
+        else:
+            return None
+        corrida = historial.registrar_corrida(archivo, tipo, _fecha_archivo(archivo))
+        historial.agregar_filas(corrida, tabla, filas)
+    historial.marcar_completa(corrida)
+    return tabla
+
+def _ingestar_plan(historial, archivo):
+    documento, _ = leer_plan(archivo, con_adicionales=False)
+    fecha = (documento.get('fecha_generacion') or _fecha_archivo(archivo))[:19]
+    corrida = historial.registrar_corrida(archivo, documento.get('tipo', 'reorganizacion'), fecha, documento.get('configuracion'))
+    for resultado in resultados_del_plan(documento):
+        historial.agregar_filas(corrida, 'movimientos', filas_columnares_consolidado(resultado))
+    historial.marcar_completa(corrida)
+
+    # Las aulas agregadas al continuar el plan van en su propia corrida (la del sidecar);
+    # si el sidecar ya se integró al archivo, esa corrida sobra
+    sidecar = archivo_adicionales(archivo)
+    if not os.path.exists(sidecar):
+        historial.borrar_corrida(sidecar)
+        return
+    corrida = historial.registrar_corrida(sidecar, 'continuacion', _fecha_archivo(sidecar))
+    for entrada in leer_adicionales(archivo):
+        for resultado in resultados_del_plan(entrada['solucion']):
+            historial.agregar_filas(corrida, 'movimientos', filas_columnares_consolidado(resultado))
+    historial.marcar_completa(corrida)
+
+def _es_plan(archivo):
+    nombre = re.sub(r'\.(gz|zst)$', '', archivo)
+    return nombre.endswith('.json') or nombre.endswith('.msgpack')
+
+def ingestar_archivos(ruta, patrones=None):
+    """
+    Carga en el historial los planes (JSON/msgpack, comprimidos o no) y los catálogos
+    completos CSV indicados por `patrones` (rutas o globs). Si un plan no se puede leer
+    (p. ej. quedó truncado), usa su CSV automático. Retorna la cantidad de archivos ingestados
+    """
+    archivos = []
+    for patron in patrones or PATRONES_INGESTA:
+        for archivo in sorted(glob.glob(patron)) or ([patron] if os.path.exists(patron) else []):
+            archivo = os.path.normpath(archivo)
+            if archivo not in archivos and not archivo.endswith('.adicionales.jsonl') and not archivo.endswith('.tmp'):
+                archivos.append(archivo)
+
+    ingestados = 0
+    with HistorialPlanes(ruta) as historial:
+        for archivo in archivos:
+            try:
+                if _es_plan(archivo):
+                    _ingestar_plan(historial, archivo)
+                    print(f"   📄 {archivo}")
+                elif _ingestar_csv(historial, archivo):
+                    print(f"   📋 {archivo}")
+                else:
+                    print(f"   ⏭️  {archivo} (no es un plan, un catálogo completo ni un CSV automático)")
+                    continue
+                ingestados += 1
+            except (ValueError, KeyError, TypeError, OSError, EOFError) as e:
+                historial.borrar_corrida(archivo)
+                respaldo = re.sub(r'\.(json|msgpack)(\.gz|\.zst)?$', r'_automatico.csv\2', archivo)
+                if _es_plan(archivo) and respaldo != archivo and os.path.exists(respaldo):
+                    print(f"   ⚠️  {archivo} no se pudo leer ({e}); se usa {respaldo}")
+                    try:
+                        if _ingestar_csv(historial, respaldo):
+                            ingestados += 1
+                        else:
+                            print(f"   ❌ {respaldo}: no es un CSV automático")
+                    except (ValueError, KeyError, TypeError, OSError, EOFError) as e:
+                        historial.borrar_corrida(respaldo)
+                        print(f"   ❌ {respaldo}: {e}")
+                else:
+                    print(f"   ❌ {archivo}: {e}")
+        totales = historial.estadisticas()
+    print(f"✅ {ingestados} archivos ingestados en {ruta}: {totales['corridas']} corridas, "
+          f"{totales['movimientos']} movimientos, {totales['opciones']} opciones")
+    return ingestados
+
+def parsear_filtros(argumentos):
+    """
+    Filtros de búsqueda desde argumentos clave=valor de la línea de comandos
+    """
+    filtros = {}
+    for argumento in argumentos:
+        clave, separador, valor = argumento.partition('=')
+        if not separador or clave not in FILTROS_BUSQUEDA:
+            raise ValueError(f"Filtro no válido: {argumento} (usar {', '.join(f'{f}=...' for f in FILTROS_BUSQUEDA)})")
+        filtros[clave] = valor
+    return filtros
+
+def mostrar_busqueda(filas, tabla='movimientos', limite=50):
+    print(f"\n🔎 {len(filas)} {tabla} encontrados")
+    for fila in filas[:limite]:
+        horario = f"{fila['dia']} {minutos_a_hora(fila['inicio_min'])}-{minutos_a_hora(fila['fin_min'])}"
+        destino = fila['aula_destino'] or '—'
+        detalle = fila['estado'] if tabla == 'movimientos' else f"opción {fila['opcion']} de {fila['total_opciones']}"
+        print(f"   {fila['fecha']} | {fila['aula_origen']} → {destino} | {horario} | {(fila['curso'] or '')[:40]} | {detalle} | {fila['archivo']}")
+    if len(filas) > limite:
+        print(f"   ... y {len(filas) - limite} más")
@@ -0,0 +1,139 @@
+from src.compresion import abrir_entrada
+from src.formato_plan import formato_archivo_plan, leer_adicionales, leer_plan, resultados_del_plan
+from src.logic.indice_reservas import IndiceReservas
+
+# Lectura incremental de un plan para continuarlo: el índice de reservas
+# (aula_destino, día) se arma mientras se lee el archivo, sin cargar el documento.
+# Con ijson (opcional) el archivo principal se recorre en streaming: de las tablas
+# del formato normalizado solo se guardan los campos de horario, y de cada
+# movimiento solo su reserva. Sin ijson (o en msgpack) se carga completo, como antes.
+# Las aulas agregadas después están en el sidecar JSONL y se leen línea a línea.
+
+_SUFIJO_MOVIMIENTO = 'plan_movimientos.movimientos.item'
+_CAMPOS_HORARIO = ('CODIGODIA', 'HORAINICIO', 'HORAFIN', 'NOMBRE_CURSO', 'CODIGOAULA')
+_PREFIJOS_TABLAS = {
+    'tablas.ocupaciones.columnas.item', 'tablas.ocupaciones.filas.item',
+    'tablas.aulas.columnas.item', 'tablas.aulas.filas.item'
+}
+
+def ijson_disponible():
+    try:
+        import ijson  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def _movimiento_plano(aula_destino, dia, hora_inicio, hora_fin, curso, aula_origen):
+    # Reserva plana de un movimiento, la que consume IndiceReservas.desde_movimientos
+    return {
+        'aula_destino': aula_destino,
+        'dia': dia,
+        'hora_inicio': hora_inicio,
+        'hora_fin': hora_fin,
+        'curso': curso or '',
+        'aula_origen': aula_origen or ''
+    }
+
+def _movimientos_documento(valor):
+    """
+    Movimientos planos de todas las soluciones de un documento ya cargado
+    """
+    for resultado in resultados_del_plan(valor):
+        if not resultado['solucion']:
+            continue
+        for movimiento in resultado['solucion']['plan_movimientos'].get('movimientos', []):
+            ocupacion = movimiento['ocupacion']
+            yield _movimiento_plano(
+                movimiento['aula_destino']['codigo'], ocupacion['CODIGODIA'], ocupacion['HORAINICIO'],
+                ocupacion['HORAFIN'], ocupacion.get('NOMBRE_CURSO'), ocupacion.get('CODIGOAULA')
+            )
+
+def _valores(eventos, es_objetivo):
+    """
+    (prefijo, valor) de cada valor cuyo prefijo cumple `es_objetivo`, armado con los eventos de ijson
+    """
+    import ijson
+
+    constructor = None
+    for prefijo, evento, valor in eventos:
+        if constructor is None:
+            if not es_objetivo(prefijo) or evento in ('map_key', 'end_map', 'end_array'):
+                continue
+            if evento not in ('start_map', 'start_array'):
+                yield prefijo, valor
+                continue
+            constructor = ijson.ObjectBuilder()
+            objetivo = prefijo
+            profundidad = 0
+        constructor.event(evento, valor)
+        if evento in ('start_map', 'start_array'):
+            profundidad += 1
+        elif evento in ('end_map', 'end_array'):
+            profundidad -= 1
+            if profundidad == 0:
+                yield objetivo, constructor.value
+                constructor = None
+
+def _movimientos_legado_streaming(archivo):
+    import ijson
+
+    with abrir_entrada(archivo, 'rb') as entrada:
+        eventos = ijson.parse(entrada, use_float=True)
+        for _, movimiento in _valores(eventos, lambda prefijo: prefijo.endswith(_SUFIJO_MOVIMIENTO)):
+            ocupacion = movimiento['ocupacion']
+            yield _movimiento_plano(
+                movimiento['aula_destino']['codigo'], ocupacion['CODIGODIA'], ocupacion['HORAINICIO'],
+                ocupacion['HORAFIN'], ocupacion.get('NOMBRE_CURSO'), ocupacion.get('CODIGOAULA')
+            )
+
+def _movimientos_normalizado_streaming(archivo):
+    """
+    Las tablas van antes que el documento, así cada movimiento se resuelve al leerlo
+    """
+    import ijson
+
+    columnas = {'ocupaciones': [], 'aulas': []}
+    horarios = []
+    codigos_aula = []
+
+    def es_objetivo(prefijo):
+        return prefijo in _PREFIJOS_TABLAS or prefijo.endswith(_SUFIJO_MOVIMIENTO)
+
+    with abrir_entrada(archivo, 'rb') as entrada:
+        eventos = ijson.parse(entrada, use_float=True)
+        for prefijo, valor in _valores(eventos, es_objetivo):
+            if prefijo.endswith(_SUFIJO_MOVIMIENTO):
+                id_ocupacion, _, (id_aula, _, _), _, _, _ = valor
+                dia, inicio, fin, curso, codigo_aula = horarios[id_ocupacion]
+                yield _movimiento_plano(codigos_aula[id_aula], dia, inicio, fin, curso, codigo_aula)
+            elif prefijo in ('tablas.ocupaciones.columnas.item', 'tablas.aulas.columnas.item'):
+                columnas[prefijo.split('.')[1]].append(valor)
+            elif prefijo == 'tablas.ocupaciones.filas.item':
+                registro = valor if isinstance(valor, dict) else dict(zip(columnas['ocupaciones'], valor))
+                horarios.append(tuple(registro.get(campo) for campo in _CAMPOS_HORARIO))
+            elif prefijo == 'tablas.aulas.filas.item':
+                registro = valor if isinstance(valor, dict) else dict(zip(columnas['aulas'], valor))
+                codigos_aula.append(registro['codigo'])
+
+def movimientos_del_plan(archivo):
+    """
+    Movimientos planos (aula_destino, dia, hora_inicio, hora_fin, curso, aula_origen)
+    del plan y de sus aulas agregadas, uno a uno
+    """
+    formato = formato_archivo_plan(archivo)
+    if formato != 'msgpack' and not ijson_disponible():
+        print("⚠️  ijson no está instalado (pip install ijson): el plan se carga completo en memoria")
+    if formato == 'msgpack' or not ijson_disponible():
+        yield from _movimientos_documento(leer_plan(archivo, con_adicionales=False)[0])
+    elif formato == 'normalizado':
+        yield from _movimientos_normalizado_streaming(archivo)
+    else:
+        yield from _movimientos_legado_streaming(archivo)
+    for entrada in leer_adicionales(archivo):
+        yield from _movimientos_documento(entrada)
+
+def cargar_indice_plan(archivo):
+    """
+    Índice de reservas con todos los movimientos del plan, armado en una sola lectura
+    """
+    return IndiceReservas.desde_movimientos(movimientos_del_plan(archivo))
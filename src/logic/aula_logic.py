@@ -26,21 +26,35 @@ class AulaLogic:
         self.connection = connection
 
     def fetch_libres(self, campus_code, pabellon_codes, ano='2025', semestre='2'):
+        libres, _ = self.fetch_libres_y_ocupados(campus_code, pabellon_codes, ano, semestre)
+        return libres
+
+    def fetch_libres_y_ocupados(self, campus_code, pabellon_codes, ano='2025', semestre='2'):
+        """
+        Con una sola consulta retorna los bloques libres y los bloques ocupados de cada aula.
+        Los ocupados indican su origen (OFERTA, CARGANOLECTIVA o SEPARACIONAULA)
+        """
         aulas = get_aula_ocupadasas(self.connection, campus_code, pabellon_codes, ano, semestre)
         dias = ['LU', 'MA', 'MI', 'JU', 'VI', 'SA', 'DO']
         hora_inicio_jornada = '07:00'
         hora_fin_jornada = '23:00'
         libres = {}
+        ocupados_por_aula = {}
 
         for aula in aulas:
             key = (aula['CODIGO'], aula['DENOMINACION'], aula['CAPACIDAD'])
             ocupados = []
-            ocupados += parse_bloques(aula['OFERTAS'])
-            ocupados += parse_bloques(aula['CARGANOLECTIVA'])
-            ocupados += parse_bloques(aula['SEPARACIONESAULA'])
+            ocupados += [(dia, ini, fin, 'OFERTA') for dia, ini, fin in parse_bloques(aula['OFERTAS'])]
+            ocupados += [(dia, ini, fin, 'CARGANOLECTIVA') for dia, ini, fin in parse_bloques(aula['CARGANOLECTIVA'])]
+            ocupados += [(dia, ini, fin, 'SEPARACIONAULA') for dia, ini, fin in parse_bloques(aula['SEPARACIONESAULA'])]
+
+            ocupados_por_aula[key] = [
+                {'dia': dia, 'inicio': ini, 'fin': fin, 'origen': origen}
+                for dia, ini, fin, origen in ocupados
+            ]
 
             ocupados_por_dia = {dia: [] for dia in dias}
-            for dia, ini, fin in ocupados:
+            for dia, ini, fin, _ in ocupados:
                 ocupados_por_dia[dia].append((ini, fin))
 
             libres[key] = []
@@ -56,7 +70,7 @@ class AulaLogic:
 
 
         libres_ordenados = dict(sorted(libres.items(), key=lambda x: (x[0][1], x[0][0])))
-        return libres_ordenados
+        return libres_ordenados, ocupados_por_aula
     
     def get_aula_libre(self, campus_code, pabellon_codes, ano='2025', semestre='2'):
         return get_aula_libre(self.connection, campus_code, pabellon_codes, ano, semestre)
\ No newline at end of file
@@ -0,0 +1,86 @@
+DIAS = ['LU', 'MA', 'MI', 'JU', 'VI', 'SA', 'DO']
+
+def hora_a_minutos(hora):
+    """
+    Convierte una hora 'HH:MM' (o 'HH:MM:SS') a minutos desde las 00:00
+    """
+    partes = str(hora).split(':')
+    return int(partes[0]) * 60 + int(partes[1])
+
+def mascara_horario(dia, inicio, fin):
+    """
+    Bitset de la semana con un bit por minuto ocupado por el horario [inicio, fin)
+    """
+    base = DIAS.index(dia) * 24 * 60
+    ini_min = hora_a_minutos(inicio)
+    fin_min = hora_a_minutos(fin)
+    if fin_min <= ini_min:
+        return 0
+    return ((1 << (fin_min - ini_min)) - 1) << (base + ini_min)
+
+class IndiceReservas:
+    """
+    Índice (aula, día) -> lista de intervalos reservados, en minutos.
+    Es la misma idea que las ocupaciones ficticias del reorganizador manual,
+    pero con consultas de cruce sin recorrer todos los movimientos.
+    """
+    def __init__(self):
+        self.reservas = {}
+
+    def cruces(self, aula, dia, inicio, fin):
+        """
+        Retorna las reservas de (aula, día) que se superponen con [inicio, fin)
+        """
+        ini_min = hora_a_minutos(inicio)
+        fin_min = hora_a_minutos(fin)
+        return [
+            reserva for reserva in self.reservas.get((aula, dia), [])
+            if ini_min < reserva[1] and reserva[0] < fin_min
+        ]
+
+    def esta_libre(self, aula, dia, inicio, fin):
+        """
+        Verifica que el aula no tenga reservas que crucen con el horario
+        """
+        return not self.cruces(aula, dia, inicio, fin)
+
+    def reservar(self, aula, dia, inicio, fin, dato=None):
+        """
+        Registra una reserva; `dato` permite identificar quién ocupa el bloque
+        """
+        self.reservas.setdefault((aula, dia), []).append(
+            (hora_a_minutos(inicio), hora_a_minutos(fin), dato)
+        )
+
+    def liberar(self, aula, dia, inicio, fin, dato=None):
+        """
+        Elimina la primera reserva que coincida exactamente con el horario (y el dato)
+        """
+        ini_min = hora_a_minutos(inicio)
+        fin_min = hora_a_minutos(fin)
+        reservas = self.reservas.get((aula, dia), [])
+        for i, reserva in enumerate(reservas):
+            if reserva[0] == ini_min and reserva[1] == fin_min and (dato is None or reserva[2] == dato):
+                del reservas[i]
+                return True
+        return False
+
+    def total_reservas(self):
+        return sum(len(reservas) for reservas in self.reservas.values())
+
+    @classmethod
+    def desde_movimientos(cls, movimientos_existentes):
+        """
+        Construye el índice a partir de la lista plana de movimientos existentes
+        (dicts con aula_destino, dia, hora_inicio, hora_fin y, opcional, curso como dueño de la reserva)
+        """
+        indice = cls()
+        for movimiento in movimientos_existentes:
+            indice.reservar(
+                movimiento['aula_destino'],
+                movimiento['dia'],
+                movimiento['hora_inicio'],
+                movimiento['hora_fin'],
+                movimiento.get('curso')
+            )
+        return indice
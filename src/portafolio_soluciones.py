@@ -0,0 +1,138 @@
+from src.estrategias_solucion import ESTRATEGIAS, calcular_objetivo, contar_grupos_divididos, cota_superior_objetivo, resolver_agrupado, resolver_greedy
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+import os
+import time
+
+def _ejecutar_estrategia(nombre, todas_las_opciones, parametros):
+    """
+    Punto de entrada en el proceso trabajador (debe ser una función de módulo)
+    """
+    inicio = time.monotonic()
+    plan = ESTRATEGIAS[nombre](todas_las_opciones, **parametros)
+    return plan, time.monotonic() - inicio
+
+def _etiqueta(nombre, parametros):
+    if 'semilla' in parametros:
+        return f"{nombre}(semilla={parametros['semilla']})"
+    return nombre
+
+def _terminar_trabajadores(executor):
+    """
+    shutdown(cancel_futures=True) solo cancela las tareas en cola: los procesos que
+    siguen corriendo una estrategia se terminan para no pasarse del presupuesto
+    """
+    # _processes es un detalle interno de ProcessPoolExecutor en CPython (no es API
+    # pública); si no existe, solo se cancelan las tareas en cola
+    procesos = list((getattr(executor, '_processes', None) or {}).values())
+    executor.shutdown(wait=False, cancel_futures=True)
+    for proceso in procesos:
+        if proceso.is_alive():
+            proceso.terminate()
+    for proceso in procesos:
+        proceso.join()
+
+class PortafolioSoluciones:
+    """
+    Ejecuta varias estrategias en paralelo sobre el mismo catálogo de opciones
+    y se queda con el mejor plan según calcular_objetivo
+    """
+    def __init__(self, max_workers=None, presupuesto_segundos=30, semillas=(1, 2, 3, 4), agrupar_sesiones=None, penalizacion_grupo=10):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.presupuesto_segundos = presupuesto_segundos
+        self.semillas = semillas
+        # None, 'estricto' (un curso nunca se divide) o 'flexible' (se penaliza dividirlo)
+        self.agrupar_sesiones = agrupar_sesiones
+        self.penalizacion_grupo = penalizacion_grupo if agrupar_sesiones == 'flexible' else 0
+
+    def _tareas(self):
+        tareas = [('greedy', {}), ('greedy_tier', {}), ('matching', {}), ('lexicografico', {})]
+        # La búsqueda local se corta sola un poco antes del presupuesto
+        limite = max(1, self.presupuesto_segundos * 0.8)
+        for semilla in self.semillas:
+            tareas.append(('busqueda_local', {'semilla': semilla, 'limite_segundos': limite}))
+        if self.agrupar_sesiones:
+            tareas.append(('agrupado', {'modo': self.agrupar_sesiones}))
+        return tareas
+
+    def _es_admisible(self, plan):
+        # En modo estricto se descartan los planes que dividen un curso entre aulas
+        return self.agrupar_sesiones != 'estricto' or contar_grupos_divididos(plan) == 0
+
+    def resolver(self, todas_las_opciones):
+        """
+        Retorna (plan, estrategia_ganadora). El plan base (greedy, o agrupado si se
+        pidió agrupar sesiones) se calcula siempre en el proceso principal, de modo que
+        hay resultado aunque ninguna tarea termine a tiempo. Solo se deja de esperar
+        antes del presupuesto si un plan alcanza la cota superior del objetivo
+        """
+        if self.agrupar_sesiones:
+            mejor_plan = resolver_agrupado(todas_las_opciones, self.agrupar_sesiones)
+            mejor_estrategia = 'agrupado'
+        else:
+            mejor_plan = resolver_greedy(todas_las_opciones)
+            mejor_estrategia = 'greedy'
+        mejor_objetivo = calcular_objetivo(mejor_plan, self.penalizacion_grupo)
+        # Alcanzar la cota mínima de conflictos no basta: el objetivo ordena primero por
+        # peso, así que un plan con esos conflictos puede dejar fuera ocupaciones más pesadas
+        cota_objetivo = cota_superior_objetivo(todas_las_opciones)
+
+        if mejor_objetivo >= cota_objetivo:
+            print(f"🏆 El plan base ({mejor_estrategia}) ya alcanza el objetivo máximo")
+            return mejor_plan, mejor_estrategia
+
+        tareas = self._tareas()
+        print(f"🧮 Portafolio: {len(tareas)} estrategias en {self.max_workers} procesos (presupuesto {self.presupuesto_segundos}s)")
+
+        executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        try:
+            futuros = [
+                (_etiqueta(nombre, parametros), executor.submit(_ejecutar_estrategia, nombre, todas_las_opciones, parametros))
+                for nombre, parametros in tareas
+            ]
+
+            # Esperar hasta agotar el presupuesto o hasta que algún plan alcance el objetivo máximo
+            limite = time.monotonic() + self.presupuesto_segundos
+            pendientes = {f for _, f in futuros}
+            while pendientes:
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    break
+                hechos, pendientes = wait(pendientes, timeout=restante, return_when=FIRST_COMPLETED)
+                if any(
+                    f.exception() is None
+                    and self._es_admisible(f.result()[0])
+                    and calcular_objetivo(f.result()[0], self.penalizacion_grupo) >= cota_objetivo
+                    for f in hechos
+                ):
+                    print("   🎯 Un plan alcanzó el objetivo máximo")
+                    break
+
+            # Recorrer en el orden de las tareas para que los empates sean deterministas
+            for etiqueta, futuro in futuros:
+                if not futuro.done() or futuro.cancelled():
+                    continue
+                try:
+                    plan, duracion = futuro.result()
+                except Exception as e:
+                    print(f"   ❌ {etiqueta}: {e}")
+                    continue
+
+                if not self._es_admisible(plan):
+                    print(f"   • {etiqueta}: descartada (divide cursos entre aulas)")
+                    continue
+
+                objetivo = calcular_objetivo(plan, self.penalizacion_grupo)
+                print(f"   • {etiqueta}: {objetivo[1]} movimientos, peso {objetivo[0]}, score {objetivo[2]} ({duracion:.2f}s)")
+                if objetivo > mejor_objetivo:
+                    mejor_plan = plan
+                    mejor_objetivo = objetivo
+                    mejor_estrategia = etiqueta
+
+            sin_terminar = sum(1 for _, f in futuros if not f.done())
+            if sin_terminar:
+                print(f"   ⏱️  {sin_terminar} estrategias no terminaron dentro del presupuesto")
+        finally:
+            _terminar_trabajadores(executor)
+
+        print(f"🏆 Estrategia ganadora: {mejor_estrategia}")
+        return mejor_plan, mejor_estrategia
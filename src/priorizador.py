@@ -1,7 +1,22 @@
 from src.db.connection import create_connection
 from src.db.queries import get_aula_libre
+from src.compresion import abrir_entrada, abrir_salida
 import csv
 
+def prioridad_por_defecto(codigo_curso):
+    """
+    Prioridad de un curso que no está en la tabla: Tier 1 (máximo peso)
+    """
+    return {'tier': 1, 'peso': 4, 'nombre_curso': codigo_curso}
+
+def prioridad_de(tabla_priorizacion, codigo_curso):
+    """
+    Prioridad del curso en la tabla de priorización, o la de por defecto si no figura
+    """
+    if codigo_curso in tabla_priorizacion:
+        return tabla_priorizacion[codigo_curso]
+    return prioridad_por_defecto(codigo_curso)
+
 class Priorizador:
     def __init__(self, connection):
         self.connection = connection
@@ -14,7 +29,7 @@ class Priorizador:
         Formato esperado: codigo_curso, nombre_curso, tier
         """
         try:
-            with open(archivo_csv, 'r', encoding='utf-8') as csvfile:
+            with abrir_entrada(archivo_csv) as csvfile:
                 reader = csv.DictReader(csvfile)
                 for row in reader:
                     codigo_curso = row['codigo_curso']
@@ -47,11 +62,7 @@ class Priorizador:
         """
         Retorna la prioridad de un curso específico
         """
-        if codigo_curso in self.tabla_priorizacion:
-            return self.tabla_priorizacion[codigo_curso]
-        else:
-            # Por defecto, Tier 1 si no está en la tabla
-            return {'tier': 1, 'peso': 4, 'nombre_curso': codigo_curso}
+        return prioridad_de(self.tabla_priorizacion, codigo_curso)
     
     def ordenar_ocupaciones_por_prioridad(self, ocupaciones_aula):
         """
@@ -80,7 +91,7 @@ class Priorizador:
         """
         Exporta la tabla de priorización actual a CSV
         """
-        with open(archivo_csv, 'w', newline='', encoding='utf-8') as csvfile:
+        with abrir_salida(archivo_csv) as csvfile:
             writer = csv.writer(csvfile)
             writer.writerow(['Codigo_Curso', 'Nombre_Curso', 'Tier', 'Peso'])
             for codigo, info in self.tabla_priorizacion.items():
@@ -0,0 +1,145 @@
+from src.priorizador import prioridad_de
+from src.estrategias_solucion import ESTRATEGIAS
+from concurrent.futures import ProcessPoolExecutor
+import os
+
+def _capacidad_requerida(ocupacion):
+    capacidad_raw = ocupacion.get('CAPACIDADMAXIMA')
+    return int(capacidad_raw) if capacidad_raw else 0
+
+def clave_candidatas(ocupacion):
+    """
+    Las candidatas de una ocupación solo dependen de (día, inicio, fin, capacidad requerida)
+    """
+    return (ocupacion['CODIGODIA'], ocupacion['HORAINICIO'], ocupacion['HORAFIN'], _capacidad_requerida(ocupacion))
+
+def calcular_score_compatibilidad(capacidad_aula, capacidad_requerida):
+    """
+    Calcula el score de compatibilidad entre aula y curso
+    """
+    if capacidad_requerida == 0:
+        return 100  # Si no hay requerimiento específico, score perfecto
+    
+    diferencia = abs(capacidad_aula - capacidad_requerida)
+    if diferencia == 0:
+        return 100  # Capacidad exacta
+    elif diferencia <= 5:
+        return 90   # Muy buena compatibilidad
+    elif diferencia <= 10:
+        return 80   # Buena compatibilidad
+    elif diferencia <= 20:
+        return 70   # Compatibilidad aceptable
+    else:
+        return max(50, 100 - diferencia)  # Penalizar grandes diferencias
+
+def buscar_candidatas(clave, aulas_libres, calcular_score, tolerancia_capacidad=0):
+    """
+    Aulas libres que cubren completamente el horario (dia, inicio, fin) con
+    capacidad suficiente, ordenadas por score (mejor primero).
+    `tolerancia_capacidad` admite aulas hasta esa fracción por debajo de lo requerido
+    """
+    dia, hora_inicio, hora_fin, capacidad_requerida = clave
+    capacidad_minima = capacidad_requerida * (1 - tolerancia_capacidad)
+    candidatas = []
+    for (aula_codigo, aula_nombre, aula_capacidad), bloques in aulas_libres.items():
+        # Filtrar por capacidad
+        if capacidad_requerida > 0 and aula_capacidad < capacidad_minima:
+            continue
+
+        # Buscar un bloque que cubra completamente el horario del curso
+        for bloque in bloques:
+            if bloque['dia'] == dia and bloque['inicio'] <= hora_inicio and bloque['fin'] >= hora_fin:
+                candidatas.append({
+                    'codigo': aula_codigo,
+                    'nombre': aula_nombre,
+                    'capacidad': aula_capacidad,
+                    'pabellon': aula_codigo[:2] if len(aula_codigo) >= 2 else 'N/A',
+                    'score': calcular_score(aula_capacidad, capacidad_requerida),
+                    'bloque_libre': {
+                        'inicio': bloque['inicio'],
+                        'fin': bloque['fin']
+                    }
+                })
+                break
+
+    candidatas.sort(key=lambda x: x['score'], reverse=True)
+    return candidatas
+
+def construir_catalogo_candidatas(ocupaciones_por_aula, aulas_libres, calcular_score):
+    """
+    Calcula una sola vez, para toda la foto, las candidatas de cada horario distinto
+    (día, inicio, fin, capacidad). Lo comparten todas las liberaciones hipotéticas:
+    el aula que se libera nunca aparece como candidata de sus propias ocupaciones,
+    porque en esos horarios no está libre
+    """
+    catalogo = {}
+    for _, ocupaciones in ocupaciones_por_aula:
+        for ocupacion in ocupaciones:
+            clave = clave_candidatas(ocupacion)
+            if clave not in catalogo:
+                catalogo[clave] = buscar_candidatas(clave, aulas_libres, calcular_score)
+    return catalogo
+
+# Catálogo y priorización compartidos por cada proceso trabajador
+_catalogo = None
+_tabla_priorizacion = None
+
+def _inicializar_trabajador(catalogo, tabla_priorizacion):
+    global _catalogo, _tabla_priorizacion
+    _catalogo = catalogo
+    _tabla_priorizacion = tabla_priorizacion
+
+def evaluar_liberacion(codigo_aula, ocupaciones, estrategia='matching', catalogo=None, tabla_priorizacion=None):
+    """
+    Resultado de liberar hipotéticamente un aula: ocupaciones desplazadas,
+    movimientos, conflictos y score promedio
+    """
+    catalogo = catalogo if catalogo is not None else _catalogo
+    tabla_priorizacion = tabla_priorizacion if tabla_priorizacion is not None else _tabla_priorizacion
+
+    todas_las_opciones = [
+        {
+            'ocupacion': ocupacion,
+            'prioridad': prioridad_de(tabla_priorizacion, ocupacion.get('CODIGOCURSO', '')),
+            'aulas_candidatas': catalogo[clave_candidatas(ocupacion)]
+        }
+        for ocupacion in ocupaciones
+    ]
+    plan = ESTRATEGIAS[estrategia](todas_las_opciones)
+    scores = [m['score'] for m in plan['movimientos']]
+
+    return {
+        'aula': codigo_aula,
+        'ocupaciones': len(ocupaciones),
+        'movimientos': len(plan['movimientos']),
+        'conflictos': len(plan['conflictos']),
+        'conflictos_tier_1': sum(1 for c in plan['conflictos'] if c['prioridad']['tier'] == 1),
+        'score_promedio': round(sum(scores) / len(scores), 2) if scores else 0
+    }
+
+def rankear_liberaciones(ocupaciones_por_aula, catalogo, tabla_priorizacion, estrategia='matching', max_workers=None):
+    """
+    Evalúa en paralelo la liberación de cada aula y las ordena de la más barata a la
+    más costosa: menos conflictos, menos ocupaciones desplazadas y mejor score
+    """
+    max_workers = min(max_workers or os.cpu_count() or 1, max(1, len(ocupaciones_por_aula)))
+
+    if max_workers <= 1:
+        resultados = [
+            evaluar_liberacion(codigo_aula, ocupaciones, estrategia, catalogo, tabla_priorizacion)
+            for codigo_aula, ocupaciones in ocupaciones_por_aula
+        ]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_inicializar_trabajador, initargs=(catalogo, tabla_priorizacion)) as executor:
+            resultados = list(executor.map(
+                evaluar_liberacion,
+                [codigo_aula for codigo_aula, _ in ocupaciones_por_aula],
+                [ocupaciones for _, ocupaciones in ocupaciones_por_aula],
+                [estrategia] * len(ocupaciones_por_aula),
+                chunksize=max(1, len(ocupaciones_por_aula) // (max_workers * 4))
+            ))
+
+    resultados.sort(key=lambda r: (r['conflictos'], r['ocupaciones'], -r['score_promedio'], r['aula']))
+    for posicion, resultado in enumerate(resultados, 1):
+        resultado['ranking'] = posicion
+    return resultados
@@ -0,0 +1,204 @@
+import copy
+import json
+import os
+
+# Diario de una reorganización (reorg_configs/<nombre>.jsonl): en lugar de reescribir
+# el JSON completo en cada guardado, cada cambio (aula liberada, movimiento, cambio de
+# aula sugerida, aprobación o rechazo) se anexa como una línea. Al abrir el diario se
+# reproduce una vez para armar la configuración (mismas claves que el JSON) y el
+# índice de ocupaciones ficticias (aula, día) -> [(inicio, fin)]; después ambos se
+# actualizan con cada registro, sin recorrer de nuevo todos los movimientos.
+
+EXTENSION_DIARIO = '.jsonl'
+
+def es_diario(nombre):
+    return nombre.endswith(EXTENSION_DIARIO)
+
+def configuracion_vacia():
+    return {
+        "movimientos": [],
+        "aulas_liberadas": [],
+        "sugerencias": [],
+        "aprobados": [],
+        "rechazados": []
+    }
+
+def _clave_ficticia(movimiento):
+    aula = movimiento["aula_sugerida"]
+    if not aula:
+        return None
+    return (aula[0], movimiento["oferta"]["CODIGODIA"])
+
+def _contenido(movimiento):
+    return json.dumps(movimiento, sort_keys=True, ensure_ascii=False, default=str)
+
+def _bloque(movimiento):
+    return (movimiento["oferta"]["HORAINICIO"], movimiento["oferta"]["HORAFIN"])
+
+class DiarioReorganizacion:
+    """
+    Diario de solo anexado de una reorganización, con su configuración y su índice de
+    ocupaciones ficticias siempre al día. Aprobaciones, rechazos y reasignaciones
+    se refieren a los movimientos por su posición en 'movimientos'
+    """
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self.config = configuracion_vacia()
+        self.ocupaciones_ficticias = {}
+        if os.path.exists(ruta):
+            self._reproducir()
+
+    def _reproducir(self):
+        with open(self.ruta, 'r', encoding='utf-8') as archivo:
+            for linea in archivo:
+                if not linea.strip():
+                    continue
+                try:
+                    registro = json.loads(linea)
+                except json.JSONDecodeError:
+                    # Solo puede faltar el final de la última línea (corte durante la escritura)
+                    print(f"⚠️  Línea incompleta descartada en {self.ruta}")
+                    continue
+                try:
+                    self._validar(registro)
+                    self._aplicar(registro)
+                except (KeyError, IndexError, TypeError) as e:
+                    # Un registro que no se puede aplicar no impide abrir la reorganización
+                    print(f"⚠️  Registro descartado en {self.ruta}: {registro} ({e})")
+
+    def _anexar(self, registro):
+        with open(self.ruta, 'a', encoding='utf-8') as archivo:
+            archivo.write(json.dumps(registro, ensure_ascii=False, default=str) + '\n')
+            archivo.flush()
+            os.fsync(archivo.fileno())
+
+    def _validar(self, registro):
+        # Se valida antes de anexar: un registro inválido no debe llegar al disco
+        indice = registro.get('indice')
+        if indice is not None and not 0 <= indice < len(self.config["movimientos"]):
+            raise IndexError(f"No existe el movimiento {indice + 1}")
+
+    def _registrar(self, registro):
+        self._validar(registro)
+        self._anexar(registro)
+        return self._aplicar(registro)
+
+    def _aplicar(self, registro):
+        tipo = registro['tipo']
+        config = self.config
+        if tipo == 'aula_liberada':
+            config["aulas_liberadas"].append(registro['aula'])
+        elif tipo == 'movimiento':
+            movimiento = registro['movimiento']
+            config["movimientos"].append(movimiento)
+            if registro.get('sugerencia', True):
+                # Copia: una reasignación posterior no debe alterar la sugerencia original
+                config["sugerencias"].append(copy.deepcopy(movimiento))
+            self._agregar_ficticia(movimiento)
+            return movimiento
+        elif tipo == 'sugerencia':
+            # Sugerencia original de un movimiento que después se modificó (JSON migrado)
+            config["sugerencias"].append(registro['movimiento'])
+        elif tipo == 'reasignacion':
+            movimiento = config["movimientos"][registro['indice']]
+            self._quitar_ficticia(movimiento)
+            movimiento["aula_sugerida"] = registro['aula_sugerida']
+            self._agregar_ficticia(movimiento)
+            return movimiento
+        elif tipo in ('aprobado', 'rechazado'):
+            movimiento = config["movimientos"][registro['indice']] if 'indice' in registro else registro['movimiento']
+            config["aprobados" if tipo == 'aprobado' else "rechazados"].append(movimiento)
+            return movimiento
+
+    def _agregar_ficticia(self, movimiento):
+        clave = _clave_ficticia(movimiento)
+        if clave is not None:
+            self.ocupaciones_ficticias.setdefault(clave, []).append(_bloque(movimiento))
+
+    def _quitar_ficticia(self, movimiento):
+        clave = _clave_ficticia(movimiento)
+        if clave is None:
+            return
+        bloques = self.ocupaciones_ficticias.get(clave, [])
+        if _bloque(movimiento) in bloques:
+            bloques.remove(_bloque(movimiento))
+        if not bloques:
+            self.ocupaciones_ficticias.pop(clave, None)
+
+    def liberar_aula(self, codigo_aula):
+        self._registrar({'tipo': 'aula_liberada', 'aula': codigo_aula})
+
+    def agregar_movimiento(self, movimiento, sugerencia=True):
+        registro = {'tipo': 'movimiento', 'movimiento': movimiento}
+        if not sugerencia:
+            registro['sugerencia'] = False
+        return self._registrar(registro)
+
+    def reasignar(self, indice, aula_sugerida):
+        """
+        Cambia el aula sugerida de un movimiento (None lo deja sin asignar)
+        """
+        return self._registrar({'tipo': 'reasignacion', 'indice': indice, 'aula_sugerida': aula_sugerida})
+
+    def aprobar(self, indice):
+        return self._registrar({'tipo': 'aprobado', 'indice': indice})
+
+    def rechazar(self, indice):
+        return self._registrar({'tipo': 'rechazado', 'indice': indice})
+
+    def _registros_estado(self, config):
+        """
+        Registros mínimos que reproducen la configuración: sin reasignaciones intermedias
+        """
+        movimientos = config.get("movimientos", [])
+        # En un JSON cargado las listas no comparten objetos: los movimientos se ubican por
+        # contenido, y si hay repetidos cada elemento toma la siguiente posición con su contenido
+        posiciones = {}
+        for i, movimiento in enumerate(movimientos):
+            posiciones.setdefault(_contenido(movimiento), []).append(i)
+
+        def indices_de(lista):
+            # (posición o None si ya no coincide con ningún movimiento, elemento)
+            usados = {}
+            for movimiento in lista:
+                clave = _contenido(movimiento)
+                candidatos = posiciones.get(clave, [])
+                n = usados.get(clave, 0)
+                if n < len(candidatos):
+                    usados[clave] = n + 1
+                    yield candidatos[n], movimiento
+                else:
+                    yield None, movimiento
+
+        sugerencias = list(indices_de(config.get("sugerencias", [])))
+        sugeridos = {indice for indice, _ in sugerencias}
+        for codigo_aula in config.get("aulas_liberadas", []):
+            yield {'tipo': 'aula_liberada', 'aula': codigo_aula}
+        for i, movimiento in enumerate(movimientos):
+            registro = {'tipo': 'movimiento', 'movimiento': movimiento}
+            if i not in sugeridos:
+                registro['sugerencia'] = False
+            yield registro
+        for indice, movimiento in sugerencias:
+            if indice is None:
+                yield {'tipo': 'sugerencia', 'movimiento': movimiento}
+        for tipo, clave in (('aprobado', "aprobados"), ('rechazado', "rechazados")):
+            for indice, movimiento in indices_de(config.get(clave, [])):
+                yield {'tipo': tipo, 'indice': indice} if indice is not None else {'tipo': tipo, 'movimiento': movimiento}
+
+    def reescribir(self, config=None):
+        """
+        Reescribe el diario con el estado actual (o con `config`, p. ej. un JSON a migrar)
+        en un archivo temporal que reemplaza al anterior de una sola vez
+        """
+        config = self.config if config is None else config
+        temporal = f"{self.ruta}.tmp"
+        with open(temporal, 'w', encoding='utf-8') as archivo:
+            for registro in self._registros_estado(config):
+                archivo.write(json.dumps(registro, ensure_ascii=False, default=str) + '\n')
+            archivo.flush()
+            os.fsync(archivo.fileno())
+        os.replace(temporal, self.ruta)
+        self.config = configuracion_vacia()
+        self.ocupaciones_ficticias = {}
+        self._reproducir()
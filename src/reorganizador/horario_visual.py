@@ -1,9 +1,19 @@
+import argparse
 import csv
+import html
+import os
+from bisect import bisect_left, bisect_right
 from collections import defaultdict, OrderedDict
+from functools import lru_cache
+from src.formato_plan import leer_plan, resultados_del_plan
+from src.logic.indice_reservas import hora_a_minutos
 
 # Configura los días y el orden de columnas
 DIAS = ['LU', 'MA', 'MI', 'JU', 'VI', 'SA', 'DO']
 
+# Las horas de inicio y fin se repiten mucho entre cursos: se convierten a minutos una sola vez
+_minutos = lru_cache(maxsize=None)(hora_a_minutos)
+
 def leer_asignaciones(path):
     asignaciones = []
     with open(path, newline='', encoding='utf-8') as f:
@@ -56,27 +66,151 @@ def generar_intervalos(hora_inicio='07:16', hora_fin='23:00', duracion=45):
         actual = siguiente
     return intervalos
 
+class IndiceIntervalos:
+    # Inicios y fines (en minutos) de los intervalos, ordenados: el rango de intervalos
+    # que se solapa con un bloque sale con dos búsquedas binarias, sin recorrer la grilla
+    def __init__(self, intervalos):
+        self.inicios = [_minutos(ini) for ini, _ in intervalos]
+        self.fines = [_minutos(fin) for _, fin in intervalos]
+
+    def rango(self, hora_inicio, hora_fin):
+        # Mismo criterio de solape que antes: el intervalo no termina antes del bloque ni empieza después
+        primero = bisect_left(self.fines, _minutos(hora_inicio))
+        ultimo = bisect_right(self.inicios, _minutos(hora_fin))
+        return range(primero, ultimo)
+
 def construir_horario_estandar(asignaciones, intervalos):
     # Mapea (intervalo) -> {dia: info}
     horario = OrderedDict()
     for ini, fin in intervalos:
         horario[(ini, fin)] = {d: "" for d in DIAS}
+    indice = IndiceIntervalos(intervalos)
     for row in asignaciones:
-        dia = row['Dia']
-        bloque_ini = row['Hora Inicio']
-        bloque_fin = row['Hora Fin']
         info = f"{row['Capacidad Requerida']} | {row['Nombre Curso']} | {row['Nombre Programa']} | {row['Aula Asignada']}"
-        for (ini, fin) in horario.keys():
-            # Si el intervalo estándar se solapa con el bloque asignado
-            if not (fin < bloque_ini or ini > bloque_fin):
-                horario[(ini, fin)][dia] = info
+        for i in indice.rango(row['Hora Inicio'], row['Hora Fin']):
+            horario[intervalos[i]][row['Dia']] = info
     return horario
 
+# --- Horarios de un plan completo: por aula y por pabellón en una sola pasada ---
+
+def _movimientos_plan(documento):
+    # Movimientos de todas las soluciones del documento (aula, consolidado o multicampus)
+    for resultado in resultados_del_plan(documento):
+        if resultado['solucion']:
+            yield from resultado['solucion']['plan_movimientos'].get('movimientos', [])
+
+def asignaciones_de_plan(documento):
+    # Filas con las mismas columnas que asignacion_sin_cruce.csv, más el pabellón y el aula de origen
+    for movimiento in _movimientos_plan(documento):
+        ocupacion = movimiento['ocupacion']
+        aula_destino = movimiento['aula_destino']
+        yield {
+            'Dia': ocupacion['CODIGODIA'],
+            'Hora Inicio': ocupacion['HORAINICIO'],
+            'Hora Fin': ocupacion['HORAFIN'],
+            'Capacidad Requerida': ocupacion.get('CAPACIDADMAXIMA', ''),
+            'Nombre Curso': ocupacion.get('NOMBRE_CURSO', ''),
+            'Nombre Programa': ocupacion.get('NOMBRE_PROGRAMA', ''),
+            'Aula Asignada': aula_destino['codigo'],
+            'Aula Origen': ocupacion.get('CODIGOAULA', ''),
+            'Pabellon': str(aula_destino.get('pabellon') or aula_destino['codigo'][:2])
+        }
+
+def construir_grillas(asignaciones, intervalos):
+    # Una grilla por aula y otra por pabellón, armadas en la misma pasada. Cada grilla es
+    # una lista plana de celdas (día * intervalos + intervalo) con los cursos de esa celda
+    indice = IndiceIntervalos(intervalos)
+    total = len(DIAS) * len(intervalos)
+    por_aula = defaultdict(lambda: [[] for _ in range(total)])
+    por_pabellon = defaultdict(lambda: [[] for _ in range(total)])
+    for row in asignaciones:
+        if row['Dia'] not in DIAS:
+            continue
+        base = DIAS.index(row['Dia']) * len(intervalos)
+        info = f"{row['Capacidad Requerida']} | {row['Nombre Curso']} | {row['Nombre Programa']} | {row['Aula Asignada']}"
+        grilla_aula = por_aula[row['Aula Asignada']]
+        grilla_pabellon = por_pabellon[row.get('Pabellon', '')]
+        for i in indice.rango(row['Hora Inicio'], row['Hora Fin']):
+            grilla_aula[base + i].append(info)
+            grilla_pabellon[base + i].append(info)
+    return dict(sorted(por_aula.items())), dict(sorted(por_pabellon.items()))
+
+def _filas_grilla(grilla, intervalos):
+    # Filas hora x día; los cursos que comparten celda (cruces o un pabellón) van separados por ' / '
+    for i, (ini, fin) in enumerate(intervalos):
+        yield [f"{ini}-{fin}"] + [' / '.join(grilla[d * len(intervalos) + i]) for d in range(len(DIAS))]
+
+def exportar_grillas_csv(grillas, intervalos, output_path, columna):
+    with open(output_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow([columna, 'Hora'] + DIAS)
+        for clave, grilla in grillas.items():
+            for fila in _filas_grilla(grilla, intervalos):
+                writer.writerow([clave] + fila)
+    print(f"Exportado a {output_path}")
+
+def _tabla_html(titulo, grilla, intervalos):
+    partes = [f"<h3>{html.escape(titulo)}</h3>", "<table>", "<tr><th>Hora</th>" + ''.join(f"<th>{d}</th>" for d in DIAS) + "</tr>"]
+    for fila in _filas_grilla(grilla, intervalos):
+        celdas = ''.join(
+            f"<td class=\"ocupada\">{html.escape(celda).replace(' / ', '<br>')}</td>" if celda else "<td></td>"
+            for celda in fila[1:]
+        )
+        partes.append(f"<tr><th>{fila[0]}</th>{celdas}</tr>")
+    partes.append("</table>")
+    return '\n'.join(partes)
+
+def exportar_grillas_html(por_aula, por_pabellon, intervalos, output_path, titulo='Horario del plan'):
+    estilo = (
+        "body{font-family:sans-serif;font-size:12px}table{border-collapse:collapse;margin-bottom:24px}"
+        "th,td{border:1px solid #ccc;padding:2px 4px;vertical-align:top;min-width:90px}"
+        "td.ocupada{background:#e3f0ff}nav a{margin-right:8px}"
+    )
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(f"<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>{html.escape(titulo)}</title><style>{estilo}</style></head><body>\n")
+        f.write(f"<h1>{html.escape(titulo)}</h1>\n<nav>")
+        f.write(''.join(f"<a href=\"#pab-{html.escape(p)}\">Pabellón {html.escape(p)}</a>" for p in por_pabellon))
+        f.write("</nav>\n<h2>Por pabellón</h2>\n")
+        for pabellon, grilla in por_pabellon.items():
+            f.write(f"<section id=\"pab-{html.escape(pabellon)}\">{_tabla_html(f'Pabellón {pabellon}', grilla, intervalos)}</section>\n")
+        f.write("<h2>Por aula</h2>\n")
+        for aula, grilla in por_aula.items():
+            f.write(f"<section id=\"aula-{html.escape(aula)}\">{_tabla_html(f'Aula {aula}', grilla, intervalos)}</section>\n")
+        f.write("</body></html>\n")
+    print(f"Exportado a {output_path}")
+
+def exportar_horarios(documento, prefijo, titulo, hora_inicio='07:16', hora_fin='23:00', duracion=45):
+    # Horarios por aula destino y por pabellón de un plan ya cargado: dos CSV y un HTML
+    intervalos = generar_intervalos(hora_inicio, hora_fin, duracion)
+    por_aula, por_pabellon = construir_grillas(asignaciones_de_plan(documento), intervalos)
+    exportar_grillas_csv(por_aula, intervalos, f"{prefijo}_horario_aulas.csv", 'Aula')
+    exportar_grillas_csv(por_pabellon, intervalos, f"{prefijo}_horario_pabellones.csv", 'Pabellon')
+    exportar_grillas_html(por_aula, por_pabellon, intervalos, f"{prefijo}_horario.html", titulo)
+    return por_aula, por_pabellon
+
+def horario_de_plan(archivo_plan, prefijo=None, hora_inicio='07:16', hora_fin='23:00', duracion=45):
+    # Horarios semanales por aula destino y por pabellón de un plan (JSON, msgpack, comprimido o no)
+    documento, _ = leer_plan(archivo_plan)
+    if prefijo is None:
+        prefijo = os.path.basename(archivo_plan).split('.')[0]
+    return exportar_horarios(documento, prefijo, f"Horario de {os.path.basename(archivo_plan)}", hora_inicio, hora_fin, duracion)
+
 def main():
+    parser = argparse.ArgumentParser(description='Horario visual por intervalos estándar')
+    parser.add_argument('plan', nargs='?', help='Plan (JSON o msgpack) del que armar los horarios por aula y por pabellón; sin plan, usa asignacion_sin_cruce.csv')
+    parser.add_argument('--desde', default='07:16', help='Hora de inicio de la grilla (default: 07:16)')
+    parser.add_argument('--hasta', default='23:00', help='Hora de fin de la grilla (default: 23:00)')
+    parser.add_argument('--duracion', type=int, default=45, help='Minutos por intervalo (default: 45)')
+    parser.add_argument('--prefijo', help='Prefijo de los archivos generados (default: nombre del plan)')
+    args = parser.parse_args()
+
+    if args.plan:
+        horario_de_plan(args.plan, args.prefijo, args.desde, args.hasta, args.duracion)
+        return
     asignaciones = leer_asignaciones('asignacion_sin_cruce.csv')
-    intervalos = generar_intervalos('07:16', '23:00', 45)  # o el rango/duración que prefieras
+    intervalos = generar_intervalos(args.desde, args.hasta, args.duracion)  # o el rango/duración que prefieras
     horario = construir_horario_estandar(asignaciones, intervalos)
     exportar_horario(horario, 'horario_visual.csv')
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -4,35 +4,57 @@ from src.db.connection import create_connection
 from src.logic.aula_logic import AulaLogic
 # from src.aula_ocupada import get_ocupaciones_aula
 from src.reorganizador.aula_ocupada import get_ocupaciones_aula
-from src.candidatos_para_oferta import asignar_ofertas_sin_cruce
+from src.reorganizador.candidatos_para_oferta import asignar_ofertas_sin_cruce
+from src.reorganizador.diario_reorganizacion import DiarioReorganizacion, configuracion_vacia, es_diario, EXTENSION_DIARIO
 
 CONFIG_DIR = "reorg_configs"
 
 def listar_configuraciones():
     if not os.path.exists(CONFIG_DIR):
         os.makedirs(CONFIG_DIR)
-    archivos = [f for f in os.listdir(CONFIG_DIR) if f.endswith('.json')]
+    archivos = [f for f in os.listdir(CONFIG_DIR) if f.endswith('.json') or es_diario(f)]
     return archivos
 
 def cargar_configuracion(nombre):
+    if es_diario(nombre):
+        return DiarioReorganizacion(os.path.join(CONFIG_DIR, nombre)).config
     with open(os.path.join(CONFIG_DIR, nombre), 'r', encoding='utf-8') as f:
         return json.load(f)
 
 def guardar_configuracion(nombre, data):
+    if es_diario(nombre):
+        # Un diario ya guarda cada cambio al hacerlo: aquí se reescribe completo con `data`
+        DiarioReorganizacion(os.path.join(CONFIG_DIR, nombre)).reescribir(data)
+        return
     with open(os.path.join(CONFIG_DIR, nombre), 'w', encoding='utf-8') as f:
         json.dump(data, f, indent=2, ensure_ascii=False)
 
+def abrir_reorganizacion(nombre):
+    """
+    (config, diario) de una reorganización guardada; diario es None si está en JSON
+    """
+    if es_diario(nombre):
+        diario = DiarioReorganizacion(os.path.join(CONFIG_DIR, nombre))
+        return diario.config, diario
+    return cargar_configuracion(nombre), None
+
+def convertir_a_diario(nombre, config):
+    """
+    Pasa una reorganización en JSON a un diario (.jsonl) con el mismo estado; el JSON queda como está
+    """
+    nombre_diario = os.path.splitext(nombre)[0] + EXTENSION_DIARIO
+    diario = DiarioReorganizacion(os.path.join(CONFIG_DIR, nombre_diario))
+    diario.reescribir(config)
+    return nombre_diario, diario.config, diario
+
 def nueva_configuracion():
-    nombre = input("Nombre para la nueva reorganización: ") + ".json"
-    config = {
-        "movimientos": [],
-        "aulas_liberadas": [],
-        "sugerencias": [],
-        "aprobados": [],
-        "rechazados": []
-    }
-    guardar_configuracion(nombre, config)
-    return nombre, config
+    # Las reorganizaciones nuevas se guardan como diario: cada cambio se anexa al archivo
+    if not os.path.exists(CONFIG_DIR):
+        os.makedirs(CONFIG_DIR)
+    nombre = input("Nombre para la nueva reorganización: ") + EXTENSION_DIARIO
+    diario = DiarioReorganizacion(os.path.join(CONFIG_DIR, nombre))
+    open(diario.ruta, 'a', encoding='utf-8').close()
+    return nombre, diario.config, diario
     
 # def obtener_ocupaciones_ficticias(config):
 #     # Mapea (aula_codigo, dia) -> lista de (inicio, fin)
@@ -76,24 +98,31 @@ def seleccionar_configuracion():
         print(f"{i+1}. {archivo}")
     idx = int(input("Seleccione una reorganización: ")) - 1
     nombre = archivos[idx]
-    config = cargar_configuracion(nombre)
-    return nombre, config
+    config, diario = abrir_reorganizacion(nombre)
+    return nombre, config, diario
 
-def liberar_y_mover_aulas(config, connection, campus_code, pabellon_codes, ano, semestre, codigos_a_liberar):
+def liberar_y_mover_aulas(config, connection, campus_code, pabellon_codes, ano, semestre, codigos_a_liberar, diario=None):
     aula_logic = AulaLogic(connection)
     libres = aula_logic.fetch_libres(campus_code, pabellon_codes, ano, semestre)
-    ocupaciones_ficticias = obtener_ocupaciones_ficticias(config)
+    # Con diario, el índice ya está armado y se mantiene con cada movimiento anexado
+    ocupaciones_ficticias = diario.ocupaciones_ficticias if diario else obtener_ocupaciones_ficticias(config)
     codigos = codigos_a_liberar
     for codigo_aula in codigos:
         ocupaciones = get_ocupaciones_aula(connection, codigo_aula, ano, semestre)
         asignaciones = asignar_ofertas_sin_cruce(ocupaciones, libres, codigo_aula, ocupaciones_ficticias)
-        config["aulas_liberadas"].append(codigo_aula)
+        if diario:
+            diario.liberar_aula(codigo_aula)
+        else:
+            config["aulas_liberadas"].append(codigo_aula)
         for item in asignaciones:
             movimiento = {
                 "aula_origen": codigo_aula,
                 "oferta": item["oferta"],
                 "aula_sugerida": item["aula"]
             }
+            if diario:
+                diario.agregar_movimiento(movimiento)
+                continue
             config["movimientos"].append(movimiento)
             config["sugerencias"].append(movimiento)
             # Actualiza ocupaciones ficticias para siguientes iteraciones
@@ -140,27 +169,28 @@ def liberar_y_mover_aulas(config, connection, campus_code, pabellon_codes, ano,
 def reorganizar_aulas_cli(config_name, codigos_a_liberar, campus_code, pabellon_codes, ano, semestre):
     # Carga o crea la configuración
     config_path = os.path.join(CONFIG_DIR, config_name)
-    if config_name and os.path.exists(config_path):
+    diario = None
+    if es_diario(config_name):
+        if not os.path.exists(CONFIG_DIR):
+            os.makedirs(CONFIG_DIR)
+        config, diario = abrir_reorganizacion(config_name)
+    elif config_name and os.path.exists(config_path):
         config = cargar_configuracion(config_name)
     else:
-        config = {
-            "movimientos": [],
-            "aulas_liberadas": [],
-            "sugerencias": [],
-            "aprobados": [],
-            "rechazados": []
-        }
+        config = configuracion_vacia()
     connection = create_connection()
     try:
         config = liberar_y_mover_aulas(
-            config, connection, campus_code, pabellon_codes, ano, semestre, codigos_a_liberar
+            config, connection, campus_code, pabellon_codes, ano, semestre, codigos_a_liberar, diario
         )
-        guardar_configuracion(config_name, config)
+        # El diario ya anexó cada cambio; el JSON se reescribe completo
+        if diario is None:
+            guardar_configuracion(config_name, config)
     finally:
         connection.close()
     print(f"Reorganización guardada en {config_name}")
     
-def menu_modificar_oferta(config, connection, campus_code, pabellon_codes, ano, semestre):
+def menu_modificar_oferta(config, connection, campus_code, pabellon_codes, ano, semestre, diario=None):
     # 1. Listar ofertas movidas
     print("Ofertas movidas en la simulación:")
     for idx, mov in enumerate(config["movimientos"]):
@@ -170,6 +200,9 @@ def menu_modificar_oferta(config, connection, campus_code, pabellon_codes, ano,
         print(f"{idx+1}. {oferta['NOMBRE_CURSO']} ({oferta['CODIGODIA']} {oferta['HORAINICIO']}-{oferta['HORAFIN']}) | Origen: {aula_origen} | Sugerida: {aula_sugerida}")
 
     seleccion = int(input("Seleccione el número de la oferta a modificar: ")) - 1
+    if not 0 <= seleccion < len(config["movimientos"]):
+        print("Selección inválida.")
+        return
     mov = config["movimientos"][seleccion]
     oferta = mov["oferta"]
 
@@ -179,10 +212,10 @@ def menu_modificar_oferta(config, connection, campus_code, pabellon_codes, ano,
 
     # 3. Buscar aulas candidatas para ese rango
     from src.logic.aula_logic import AulaLogic
-    from src.candidatos_para_oferta import buscar_candidatos
+    from src.reorganizador.candidatos_para_oferta import buscar_candidatos
     aula_logic = AulaLogic(connection)
     libres = aula_logic.fetch_libres(campus_code, pabellones, ano, semestre)
-    ocupaciones_ficticias = obtener_ocupaciones_ficticias(config)
+    ocupaciones_ficticias = diario.ocupaciones_ficticias if diario else obtener_ocupaciones_ficticias(config)
     candidatos = buscar_candidatos(
         libres,
         oferta['CODIGODIA'],
@@ -198,20 +231,38 @@ def menu_modificar_oferta(config, connection, campus_code, pabellon_codes, ano,
     for i, (codigo, nombre, capacidad) in enumerate(candidatos):
         print(f"{i+1}. {codigo} - {nombre} (Cap: {capacidad})")
     idx = int(input("Seleccione el número de aula sugerida (o 0 para dejar sin asignar): "))
-    if idx == 0:
-        mov["aula_sugerida"] = None
+    aula_sugerida = None if idx == 0 else candidatos[idx-1]
+    if diario:
+        diario.reasignar(seleccion, aula_sugerida)
     else:
-        mov["aula_sugerida"] = candidatos[idx-1]
+        mov["aula_sugerida"] = aula_sugerida
 
     print("Movimiento actualizado en la simulación.")
 
+def menu_revisar_movimiento(config, diario=None):
+    for idx, mov in enumerate(config["movimientos"]):
+        oferta = mov["oferta"]
+        print(f"{idx+1}. {oferta['NOMBRE_CURSO']} ({oferta['CODIGODIA']} {oferta['HORAINICIO']}-{oferta['HORAFIN']}) | Origen: {mov['aula_origen']} | Sugerida: {mov['aula_sugerida']}")
+    seleccion = int(input("Seleccione el número del movimiento a revisar: ")) - 1
+    if not 0 <= seleccion < len(config["movimientos"]):
+        print("Selección inválida.")
+        return
+    aprobar = input("¿Aprobar (A) o rechazar (R)? ").strip().upper() == "A"
+    if diario and aprobar:
+        diario.aprobar(seleccion)
+    elif diario:
+        diario.rechazar(seleccion)
+    else:
+        config["aprobados" if aprobar else "rechazados"].append(config["movimientos"][seleccion])
+    print("Movimiento aprobado." if aprobar else "Movimiento rechazado.")
+
 def main():
     print("¿Desea iniciar una nueva reorganización (N) o cargar una existente (C)?")
     opcion = input("N/C: ").strip().upper()
     if opcion == "N":
-        nombre, config = nueva_configuracion()
+        nombre, config, diario = nueva_configuracion()
     else:
-        nombre, config = seleccionar_configuracion()
+        nombre, config, diario = seleccionar_configuracion()
 
     # Parámetros de campus y periodo (puedes pedirlos por input si lo deseas)
     campus_code = 14
@@ -227,19 +278,32 @@ def main():
         print("2. Ver movimientos y sugerencias")
         print("3. Guardar y salir")
         print("4. Modificar una oferta individual")
+        print("5. Aprobar o rechazar un movimiento")
+        print("6. Pasar a diario (.jsonl)" if diario is None else "6. Compactar diario")
         op = input("Seleccione opción: ")
         if op == "1":
             codigos_a_liberar = input("Ingrese códigos de aula a liberar (separados por coma): ").split(",")
             codigos_a_liberar = [c.strip() for c in codigos_a_liberar if c.strip()]
-            config = liberar_y_mover_aulas(config, connection, campus_code, pabellon_codes, ano, semestre, codigos_a_liberar)
+            config = liberar_y_mover_aulas(config, connection, campus_code, pabellon_codes, ano, semestre, codigos_a_liberar, diario)
         elif op == "2":
             print(json.dumps(config, indent=2, ensure_ascii=False))
         elif op == "3":
-            guardar_configuracion(nombre, config)
+            if diario is None:
+                guardar_configuracion(nombre, config)
             print(f"Configuración guardada en {nombre}")
             break
         elif op == "4":
-            menu_modificar_oferta(config, connection, campus_code, pabellon_codes, ano, semestre)
+            menu_modificar_oferta(config, connection, campus_code, pabellon_codes, ano, semestre, diario)
+        elif op == "5":
+            menu_revisar_movimiento(config, diario)
+        elif op == "6":
+            if diario is None:
+                nombre, config, diario = convertir_a_diario(nombre, config)
+            else:
+                # Deja un registro por movimiento, sin las reasignaciones intermedias
+                diario.reescribir()
+                config = diario.config
+            print(f"Diario {nombre}: {len(config['movimientos'])} movimientos")
 
     connection.close()
 
@@ -1,19 +1,54 @@
 from src.db.connection import create_connection
-from src.db.queries import get_aula_libre
-from src.priorizador import Priorizador
+from src.contexto_ejecucion import ContextoEjecucion
 from src.evaluador_movimientos import EvaluadorMovimientos
 from src.generador_soluciones import GeneradorSoluciones
+from src.estrategias_solucion import resolver_agrupado, resolver_greedy, resolver_lexicografico
+from src.portafolio_soluciones import PortafolioSoluciones
+from src.cadenas_eyeccion import BuscadorCadenas, proponer_cadenas
+from src.logic.indice_reservas import IndiceReservas
+from src.factibilidad import verificar_factibilidad, mostrar_factibilidad
+from src.evaluacion_paralela import evaluar_aula, evaluar_aulas
+from src.diario_checkpoint import DiarioCheckpoint
+from src.ranking_liberacion import buscar_candidatas, calcular_score_compatibilidad, clave_candidatas, construir_catalogo_candidatas, rankear_liberaciones
+from src.consolidacion_aulas import PlanificadorConsolidacion
+from src.barrido_parametros import cargar_escenarios, ejecutar_barrido, exportar_comparacion, mostrar_comparacion
+from src.cola_escenarios import encolar_escenarios, estado_cola, recolectar_resultados, reencolar_abandonados, trabajar_cola_en_procesos
+from src.exportacion_streaming import ExportadorConsolidado, SalidaCSV, SalidaJSONConsolidado, SalidaResumen
+from src.exportacion_xlsx import SalidaXLSX, salida_xlsx_habilitada
+from src.exportacion_columnar import COLUMNAS_CONSOLIDADO, SalidaParquet, filas_columnares_catalogo, filas_columnares_consolidado, salida_parquet_habilitada
+from src.formato_plan import FORMATOS_SALIDA, SalidaPlanNormalizado, agregar_aula_adicional, archivo_adicionales, archivo_plan, formato_plan_de, guardar_plan, leer_plan, resultados_del_plan
+from src.reorganizador.horario_visual import exportar_horarios
+from src.lectura_incremental import cargar_indice_plan
+from src.historial import HISTORIAL_POR_DEFECTO, HistorialPlanes, agregar_a_historial, ingestar_archivos, mostrar_busqueda, parsear_filtros, registrar_en_historial, ruta_historial, salida_historial
+from src.ejecucion_multicampus import cargar_fragmentos_desde_csv, ejecutar_fragmentos
+from src.priorizador import Priorizador
+from src.compresion import COMPRESIONES, abrir_entrada, abrir_salida, compresion_de, sufijo_compresion
 import csv
-import json
 import argparse
+import os
+import queue
+import re
+import threading
 from datetime import datetime
 
+ENCABEZADO_CONSOLIDADO = [
+    'Aula_Origen', 'Aula_Destino', 'Tier', 'Dia', 'Hora_Inicio', 'Hora_Fin',
+    'Curso', 'Programa', 'Docente', 'Capacidad_Requerida', 'Capacidad_Destino',
+    'Score_Compatibilidad', 'Estado'
+]
+
 class ReorganizadorAutomatico:
-    def __init__(self, connection):
+    def __init__(self, connection, contexto=None):
         self.connection = connection
-        self.priorizador = Priorizador(connection)
-        self.evaluador = EvaluadorMovimientos(connection)
-        self.generador = GeneradorSoluciones(connection)
+        # Un único contexto por ejecución: cada dato se consulta una sola vez
+        self.contexto = contexto if contexto is not None else ContextoEjecucion(connection)
+        self.priorizador = self.contexto.priorizador
+        self.evaluador = EvaluadorMovimientos(connection, self.contexto)
+        self.generador = GeneradorSoluciones(connection, self.contexto)
+        # Resultado del último pre-chequeo de factibilidad (cota mínima de conflictos)
+        self.ultima_factibilidad = None
+        # Índices de reservas de los planes ya continuados: archivo -> (firma, reservas)
+        self._indices_planes = {}
     
     def reorganizar_aula(self, codigo_aula, configuracion=None):
         """
@@ -28,6 +63,8 @@ class ReorganizadorAutomatico:
                 'archivo_priorizacion': None
             }
         
+        self.contexto.aplicar_configuracion(configuracion)
+        
         print(f"\n{'='*60}")
         print(f"REORGANIZADOR AUTOMÁTICO - AULA {codigo_aula}")
         print(f"{'='*60}")
@@ -43,31 +80,58 @@ class ReorganizadorAutomatico:
 
         if not todas_las_opciones:
             print(f"⚠️  El aula {codigo_aula} no tiene cursos ni actividades asignadas para el periodo seleccionado.")
-            self._exportar_catalogo_sin_opciones(codigo_aula, f"catalogo_{codigo_aula}_sin_opciones.csv")
+            self._exportar_catalogo_sin_opciones(codigo_aula, f"catalogo_{codigo_aula}_sin_opciones.csv{sufijo_compresion(configuracion)}")
             return None
         
         # 2. Generar TODOS los archivos automáticamente
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         prefijo_archivo = f"reorganizacion_{codigo_aula}_{timestamp}"
+        sufijo = sufijo_compresion(configuracion)
         
         # Exportar catálogo COMPLETO (todas las opciones)
-        self._exportar_catalogo_completo(todas_las_opciones, f"{prefijo_archivo}_completo.csv")
+        self._exportar_catalogo_completo(todas_las_opciones, f"{prefijo_archivo}_completo.csv{sufijo}")
+        registrar_en_historial(
+            configuracion, f"{prefijo_archivo}_completo.csv{sufijo}", 'catalogo', 'opciones',
+            [fila for opciones in todas_las_opciones for fila in filas_columnares_catalogo(opciones, codigo_aula)]
+        )
         
         # Generar solución AUTOMÁTICA (selección inteligente sin cruces)
         solucion_automatica = self._generar_solucion_automatica(todas_las_opciones, codigo_aula, configuracion)
         
         if solucion_automatica:
+            # Proponer cadenas de reubicación para los cursos sin aulas disponibles
+            reservas = IndiceReservas()
+            for movimiento in solucion_automatica['plan_movimientos']['movimientos']:
+                ocupacion = movimiento['ocupacion']
+                reservas.reservar(movimiento['aula_destino']['codigo'], ocupacion['CODIGODIA'], ocupacion['HORAINICIO'], ocupacion['HORAFIN'], ocupacion.get('NOMBRE_CURSO', ''))
+            self._proponer_cadenas_eyeccion(solucion_automatica, codigo_aula, configuracion, reservas)
+            
             # Mostrar resultados
             self._mostrar_solucion_automatica(solucion_automatica)
             
             # Exportar solución automática
-            self._exportar_solucion_automatica_csv(solucion_automatica, f"{prefijo_archivo}_automatico.csv")
-            self._exportar_solucion_json(solucion_automatica, f"{prefijo_archivo}.json")
+            self._exportar_solucion_automatica_csv(solucion_automatica, f"{prefijo_archivo}_automatico.csv{sufijo}")
+            formato_plan = formato_plan_de(configuracion)
+            archivo_json = archivo_plan(prefijo_archivo, formato_plan) + sufijo
+            self._exportar_solucion_json(solucion_automatica, archivo_json, formato_plan)
+            registrar_en_historial(
+                configuracion, archivo_json, 'reorganizacion', 'movimientos',
+                filas_columnares_consolidado({'aula': codigo_aula, 'exito': True, 'solucion': solucion_automatica})
+            )
+            con_xlsx = salida_xlsx_habilitada(configuracion)
+            if con_xlsx:
+                with ExportadorConsolidado([self.generador.salida_catalogo_xlsx(f"{prefijo_archivo}_completo.xlsx", codigo_aula)]) as exportador:
+                    for opciones in todas_las_opciones:
+                        exportador.escribir(opciones)
+                with ExportadorConsolidado([self._salida_xlsx(f"{prefijo_archivo}_automatico.xlsx")]) as exportador:
+                    exportador.escribir({'aula': codigo_aula, 'exito': True, 'solucion': solucion_automatica, 'error': None})
             
             print(f"\n✅ Proceso completado. Archivos generados:")
-            print(f"   📋 {prefijo_archivo}_completo.csv (TODAS las opciones)")
-            print(f"   🤖 {prefijo_archivo}_automatico.csv (Solución automática)")
-            print(f"   📄 {prefijo_archivo}.json (Solución completa en JSON)")
+            print(f"   📋 {prefijo_archivo}_completo.csv{sufijo} (TODAS las opciones)")
+            print(f"   🤖 {prefijo_archivo}_automatico.csv{sufijo} (Solución automática)")
+            print(f"   📄 {archivo_json} (Solución completa)")
+            if con_xlsx:
+                print(f"   📗 {prefijo_archivo}_completo.xlsx y {prefijo_archivo}_automatico.xlsx (para Excel)")
         
         return solucion_automatica
     
@@ -79,8 +143,7 @@ class ReorganizadorAutomatico:
         
         # Obtener ocupaciones del aula
         try:
-            ocupaciones = get_aula_libre(
-                self.connection,
+            ocupaciones = self.contexto.ocupaciones_aula(
                 codigo_aula,
                 configuracion['ano'],
                 configuracion['semestre']
@@ -94,13 +157,17 @@ class ReorganizadorAutomatico:
             return []
         
         # Obtener todas las aulas libres
-        aulas_libres = self.evaluador.aula_logic.fetch_libres(
+        aulas_libres = self.contexto.aulas_libres(
             configuracion['campus_code'], 
             configuracion['pabellon_codes'], 
             configuracion['ano'], 
             configuracion['semestre']
         )
         
+        # Pre-chequeo: cota mínima de conflictos antes de resolver
+        self.ultima_factibilidad = verificar_factibilidad(ocupaciones, aulas_libres)
+        mostrar_factibilidad(self.ultima_factibilidad)
+        
         todas_las_opciones = []
         
         for ocupacion in ocupaciones:
@@ -110,41 +177,10 @@ class ReorganizadorAutomatico:
                 'aulas_candidatas': []
             }
             
-            # Buscar aulas candidatas para este curso específico
-            dia = ocupacion['CODIGODIA']
-            hora_inicio = ocupacion['HORAINICIO']
-            hora_fin = ocupacion['HORAFIN']
-            capacidad_requerida = int(ocupacion.get('CAPACIDADMAXIMA', 0)) if ocupacion.get('CAPACIDADMAXIMA') else 0
-            
-            for (aula_codigo, aula_nombre, aula_capacidad), bloques in aulas_libres.items():
-                # Filtrar por capacidad
-                if capacidad_requerida > 0 and aula_capacidad < capacidad_requerida:
-                    continue
-                
-                # Buscar bloques que cubran completamente el horario del curso
-                for bloque in bloques:
-                    if (bloque['dia'] == dia and 
-                        bloque['inicio'] <= hora_inicio and 
-                        bloque['fin'] >= hora_fin):
-                        
-                        # Calcular score de compatibilidad
-                        score = self._calcular_score_compatibilidad(aula_capacidad, capacidad_requerida)
-                        
-                        curso_opciones['aulas_candidatas'].append({
-                            'codigo': aula_codigo,
-                            'nombre': aula_nombre,
-                            'capacidad': aula_capacidad,
-                            'pabellon': aula_codigo[:2] if len(aula_codigo) >= 2 else 'N/A',
-                            'score': score,
-                            'bloque_libre': {
-                                'inicio': bloque['inicio'],
-                                'fin': bloque['fin']
-                            }
-                        })
-                        break  # Solo necesitamos un bloque que cubra el horario
-            
-            # Ordenar por score (mejor primero)
-            curso_opciones['aulas_candidatas'].sort(key=lambda x: x['score'], reverse=True)
+            # Buscar aulas candidatas para este curso específico (ordenadas por score, mejor primero)
+            curso_opciones['aulas_candidatas'] = buscar_candidatas(
+                clave_candidatas(ocupacion), aulas_libres, self._calcular_score_compatibilidad
+            )
             
             todas_las_opciones.append(curso_opciones)
         
@@ -155,26 +191,13 @@ class ReorganizadorAutomatico:
         """
         Calcula el score de compatibilidad entre aula y curso
         """
-        if capacidad_requerida == 0:
-            return 100  # Si no hay requerimiento específico, score perfecto
-        
-        diferencia = abs(capacidad_aula - capacidad_requerida)
-        if diferencia == 0:
-            return 100  # Capacidad exacta
-        elif diferencia <= 5:
-            return 90   # Muy buena compatibilidad
-        elif diferencia <= 10:
-            return 80   # Buena compatibilidad
-        elif diferencia <= 20:
-            return 70   # Compatibilidad aceptable
-        else:
-            return max(50, 100 - diferencia)  # Penalizar grandes diferencias
+        return calcular_score_compatibilidad(capacidad_aula, capacidad_requerida)
     
     def _exportar_catalogo_completo(self, todas_las_opciones, archivo_csv):
         """
         Exporta el catálogo COMPLETO con TODAS las opciones (basado en consulta_aulas.py)
         """
-        with open(archivo_csv, 'w', newline='', encoding='utf-8') as csvfile:
+        with abrir_salida(archivo_csv) as csvfile:
             writer = csv.writer(csvfile)
             writer.writerow([
                 'Curso', 'Programa', 'Docente', 'Dia', 'Hora_Inicio', 'Hora_Fin', 'Capacidad_Requerida',
@@ -250,52 +273,33 @@ class ReorganizadorAutomatico:
             'es_valida': True
         }
         
-        # Almacenar horarios ya utilizados para evitar cruces
-        horarios_utilizados = set()
+        cota_conflictos = None
+        if self.ultima_factibilidad:
+            cota_conflictos = self.ultima_factibilidad['cota_minima_conflictos']
+            solucion['factibilidad'] = {
+                'cota_minima_conflictos': cota_conflictos,
+                'franjas_sobresuscritas': len(self.ultima_factibilidad['franjas_sobresuscritas'])
+            }
         
-        # Procesar cada curso en orden de prioridad
-        for curso_opciones in todas_las_opciones:
-            ocupacion = curso_opciones['ocupacion']
-            prioridad = curso_opciones['prioridad']
-            aulas_candidatas = curso_opciones['aulas_candidatas']
-            
-            if aulas_candidatas:
-                # Buscar la mejor aula disponible (sin cruces)
-                mejor_aula = None
-                for aula_candidata in aulas_candidatas:
-                    # Crear clave única para el horario
-                    horario_key = f"{aula_candidata['codigo']}_{ocupacion['CODIGODIA']}_{ocupacion['HORAINICIO']}_{ocupacion['HORAFIN']}"
-                    
-                    if horario_key not in horarios_utilizados:
-                        mejor_aula = aula_candidata
-                        horarios_utilizados.add(horario_key)
-                        break
-                
-                if mejor_aula:
-                    # Agregar movimiento exitoso
-                    solucion['plan_movimientos']['movimientos'].append({
-                        'ocupacion': ocupacion,
-                        'prioridad': prioridad,
-                        'aula_destino': mejor_aula,
-                        'score': mejor_aula['score']
-                    })
-                    
-                    if mejor_aula['codigo'] not in solucion['plan_movimientos']['aulas_utilizadas']:
-                        solucion['plan_movimientos']['aulas_utilizadas'].append(mejor_aula['codigo'])
-                else:
-                    # Agregar como conflicto
-                    solucion['plan_movimientos']['conflictos'].append({
-                        'ocupacion': ocupacion,
-                        'prioridad': prioridad,
-                        'tipo': 'TODAS_LAS_AULAS_OCUPADAS'
-                    })
-            else:
-                # Agregar como conflicto
-                solucion['plan_movimientos']['conflictos'].append({
-                    'ocupacion': ocupacion,
-                    'prioridad': prioridad,
-                    'tipo': 'SIN_AULAS_DISPONIBLES'
-                })
+        # Resolver con el greedy actual o con el portafolio de estrategias en paralelo
+        if configuracion.get('portafolio'):
+            portafolio = PortafolioSoluciones(
+                max_workers=configuracion.get('workers'),
+                presupuesto_segundos=configuracion.get('presupuesto_segundos', 30),
+                agrupar_sesiones=configuracion.get('agrupar_sesiones')
+            )
+            solucion['plan_movimientos'], solucion['estrategia'] = portafolio.resolver(todas_las_opciones)
+        elif configuracion.get('agrupar_sesiones'):
+            # Todas las sesiones de un mismo curso (CLAVEEVENTO) van a la misma aula
+            solucion['plan_movimientos'] = resolver_agrupado(todas_las_opciones, configuracion['agrupar_sesiones'])
+            solucion['estrategia'] = 'agrupado'
+        elif configuracion.get('lexicografico'):
+            # Maximizar tier 1, congelarlo, luego tier 2, etc.
+            solucion['plan_movimientos'] = resolver_lexicografico(todas_las_opciones)
+            solucion['estrategia'] = 'lexicografico'
+        else:
+            solucion['plan_movimientos'] = resolver_greedy(todas_las_opciones)
+            solucion['estrategia'] = 'greedy'
         
         # Calcular estadísticas
         solucion['estadisticas'] = self._calcular_estadisticas_solucion(solucion['plan_movimientos'])
@@ -303,6 +307,38 @@ class ReorganizadorAutomatico:
         
         return solucion
     
+    def _proponer_cadenas_eyeccion(self, solucion, codigo_aula, configuracion, reservas, buscador=None):
+        """
+        Adjunta cadenas de reubicación a los conflictos sin aulas disponibles.
+        El índice de ocupación se consulta una sola vez y el buscador se reutiliza entre aulas
+        """
+        profundidad = configuracion.get('profundidad_cadenas', 2)
+        tipos = ('SIN_AULAS_DISPONIBLES', 'SIN_DESTINO')
+        if not profundidad or not any(c['tipo'] in tipos for c in solucion['plan_movimientos']['conflictos']):
+            return buscador
+        
+        if buscador is None:
+            _, aulas_ocupadas = self.contexto.libres_y_ocupados(
+                configuracion['campus_code'],
+                configuracion['pabellon_codes'],
+                configuracion['ano'],
+                configuracion['semestre']
+            )
+            buscador = BuscadorCadenas(
+                aulas_ocupadas, reservas=reservas, profundidad_maxima=profundidad, ocupaciones_de=self._ocupaciones_de(configuracion)
+            )
+        
+        encontradas = proponer_cadenas(buscador, solucion['plan_movimientos'], codigo_aula, tipos)
+        if encontradas:
+            print(f"🔗 Cadenas de reubicación propuestas para {encontradas} conflictos del aula {codigo_aula}")
+        return buscador
+    
+    def _ocupaciones_de(self, configuracion):
+        """
+        Consulta (en caché del contexto) de las ocupaciones de un aula del periodo configurado
+        """
+        return lambda codigo: self.contexto.ocupaciones_aula(codigo, configuracion['ano'], configuracion['semestre'])
+    
     def _calcular_estadisticas_solucion(self, plan_movimientos):
         """
         Calcula estadísticas de la solución
@@ -345,6 +381,8 @@ class ReorganizadorAutomatico:
         print(f"   • Score promedio: {stats['score_promedio']:.1f}")
         print(f"   • Porcentaje de éxito: {stats['porcentaje_exito']:.1f}%")
         print(f"   • Solución válida: {'SÍ' if solucion['es_valida'] else 'NO'}")
+        for etapa in solucion['plan_movimientos'].get('etapas_por_tier', []):
+            print(f"   • Tier {etapa['tier']}: {etapa['ubicados']}/{etapa['total']} ubicados")
         
         if solucion['plan_movimientos']['movimientos']:
             print(f"\n🔄 Movimientos exitosos:")
@@ -362,12 +400,14 @@ class ReorganizadorAutomatico:
                 print(f"   {i:2d}. {ocupacion.get('NOMBRE_CURSO', '')[:30]}...")
                 print(f"       {ocupacion['CODIGODIA']} {ocupacion['HORAINICIO']}-{ocupacion['HORAFIN']}")
                 print(f"       → {conflicto['tipo']}")
+                for paso in conflicto.get('cadena', []):
+                    print(f"         ↪ {paso['aula_origen']} → {paso['aula_destino']} | {paso['dia']} {paso['hora_inicio']}-{paso['hora_fin']} | {paso['curso'] or paso['origen']}")
     
     def _exportar_solucion_automatica_csv(self, solucion, archivo_csv):
         """
         Exporta la solución automática a CSV
         """
-        with open(archivo_csv, 'w', newline='', encoding='utf-8') as csvfile:
+        with abrir_salida(archivo_csv) as csvfile:
             writer = csv.writer(csvfile)
             writer.writerow([
                 'Aula_Origen', 'Aula_Destino', 'Tier', 'Dia', 'Hora_Inicio', 'Hora_Fin',
@@ -420,16 +460,15 @@ class ReorganizadorAutomatico:
         
         print(f"🤖 Solución automática exportada: {archivo_csv}")
     
-    def _exportar_solucion_json(self, solucion, archivo_json):
+    def _exportar_solucion_json(self, solucion, archivo_json, formato_plan='normalizado'):
         """
-        Exporta la solución a JSON (formato estandarizado)
+        Exporta la solución a JSON (normalizado, legado o msgpack; ver formato_plan)
         """
         # Convertir set a list para serialización JSON
         if 'aulas_utilizadas' in solucion['plan_movimientos']:
             solucion['plan_movimientos']['aulas_utilizadas'] = list(solucion['plan_movimientos']['aulas_utilizadas'])
         
-        with open(archivo_json, 'w', encoding='utf-8') as jsonfile:
-            json.dump(solucion, jsonfile, indent=2, ensure_ascii=False)
+        guardar_plan(solucion, archivo_json, formato_plan)
         
         print(f"📄 Solución JSON exportada: {archivo_json}")
     
@@ -437,7 +476,7 @@ class ReorganizadorAutomatico:
         """
         Exporta un CSV informativo cuando no se encuentran opciones para un aula
         """
-        with open(archivo_csv, 'w', newline='', encoding='utf-8') as csvfile:
+        with abrir_salida(archivo_csv) as csvfile:
             writer = csv.writer(csvfile)
             writer.writerow([
                 'Aula_Origen', 'Estado', 'Mensaje', 'Fecha_Generacion', 'Configuracion'
@@ -452,6 +491,263 @@ class ReorganizadorAutomatico:
         
         print(f"📋 CSV informativo generado: {archivo_csv}")
     
+    def verificar_factibilidad_aulas(self, codigos_aulas, configuracion):
+        """
+        Pre-chequeo de factibilidad para liberar varias aulas a la vez, sin resolver.
+        Permite descartar al instante escenarios que no tienen solución completa
+        """
+        self.contexto.aplicar_configuracion(configuracion)
+        print(f"\n=== PRE-CHEQUEO DE FACTIBILIDAD: {', '.join(codigos_aulas)} ===")
+        aulas_libres = self.contexto.aulas_libres(
+            configuracion['campus_code'],
+            configuracion['pabellon_codes'],
+            configuracion['ano'],
+            configuracion['semestre']
+        )
+        ocupaciones = []
+        for codigo_aula in codigos_aulas:
+            ocupaciones.extend(self.contexto.ocupaciones_aula(codigo_aula, configuracion['ano'], configuracion['semestre']))
+        
+        resultado = verificar_factibilidad(ocupaciones, aulas_libres)
+        mostrar_factibilidad(resultado)
+        return resultado
+    
+    def rankear_aulas_a_liberar(self, configuracion):
+        """
+        ¿Qué aulas son más baratas de liberar? Evalúa la liberación hipotética de cada
+        aula de los pabellones seleccionados contra una misma foto y las ordena
+        """
+        self.contexto.aplicar_configuracion(configuracion)
+        
+        print(f"\n=== RANKING DE AULAS A LIBERAR: campus {configuracion['campus_code']}, pabellones {configuracion['pabellon_codes']} ===")
+        aulas_libres = self.contexto.aulas_libres(
+            configuracion['campus_code'],
+            configuracion['pabellon_codes'],
+            configuracion['ano'],
+            configuracion['semestre']
+        )
+        
+        ocupaciones_por_aula = []
+        for codigo_aula, _, _ in aulas_libres:
+            try:
+                ocupaciones = self.contexto.ocupaciones_aula(codigo_aula, configuracion['ano'], configuracion['semestre'])
+            except Exception as e:
+                print(f"❌ Error consultando ocupaciones de {codigo_aula}: {e}")
+                continue
+            ocupaciones_por_aula.append((codigo_aula, ocupaciones))
+        
+        # Las candidatas se calculan una sola vez por horario distinto y se reutilizan
+        catalogo = construir_catalogo_candidatas(ocupaciones_por_aula, aulas_libres, self._calcular_score_compatibilidad)
+        print(f"📋 {len(ocupaciones_por_aula)} aulas, {sum(len(o) for _, o in ocupaciones_por_aula)} ocupaciones, {len(catalogo)} horarios distintos")
+        
+        ranking = rankear_liberaciones(
+            ocupaciones_por_aula, catalogo, self.priorizador.tabla_priorizacion, max_workers=configuracion.get('workers')
+        )
+        
+        nombres = {codigo: (nombre, capacidad) for codigo, nombre, capacidad in aulas_libres}
+        archivo_csv = f"ranking_liberacion_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv{sufijo_compresion(configuracion)}"
+        with abrir_salida(archivo_csv) as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow([
+                'Ranking', 'Aula', 'Nombre_Aula', 'Capacidad', 'Ocupaciones_Desplazadas',
+                'Movimientos', 'Conflictos', 'Conflictos_Tier_1', 'Score_Promedio'
+            ])
+            for resultado in ranking:
+                nombre, capacidad = nombres.get(resultado['aula'], ('', ''))
+                writer.writerow([
+                    resultado['ranking'], resultado['aula'], nombre, capacidad, resultado['ocupaciones'],
+                    resultado['movimientos'], resultado['conflictos'], resultado['conflictos_tier_1'], resultado['score_promedio']
+                ])
+        
+        print(f"\n🏅 Aulas más baratas de liberar:")
+        for resultado in ranking[:10]:
+            print(f"   {resultado['ranking']:>3}. {resultado['aula']} | {resultado['ocupaciones']} ocupaciones | {resultado['conflictos']} conflictos | score {resultado['score_promedio']}")
+        print(f"📊 Ranking completo exportado: {archivo_csv}")
+        
+        return ranking
+    
+    def consolidar_aulas(self, codigos_aulas, configuracion):
+        """
+        Concentra la carga de las aulas indicadas (o de todas las aulas de los pabellones
+        seleccionados) en la menor cantidad de aulas posible y exporta el plan de
+        movimientos en los formatos consolidados de la reorganización múltiple
+        """
+        self.contexto.aplicar_configuracion(configuracion)
+        dias = configuracion.get('dias_consolidacion')
+        
+        print(f"\n=== CONSOLIDACIÓN DE AULAS: campus {configuracion['campus_code']}, pabellones {configuracion['pabellon_codes']} ===")
+        aulas_libres = self.contexto.aulas_libres(
+            configuracion['campus_code'],
+            configuracion['pabellon_codes'],
+            configuracion['ano'],
+            configuracion['semestre']
+        )
+        aulas = {codigo: (nombre, capacidad) for codigo, nombre, capacidad in aulas_libres}
+        if codigos_aulas:
+            for codigo_aula in codigos_aulas:
+                if codigo_aula not in aulas:
+                    print(f"⚠️  Aula {codigo_aula} no pertenece a los pabellones seleccionados, se omite")
+            aulas = {codigo: aulas[codigo] for codigo in codigos_aulas if codigo in aulas}
+        
+        ocupaciones_por_aula = []
+        for codigo_aula in aulas:
+            try:
+                ocupaciones = self.contexto.ocupaciones_aula(codigo_aula, configuracion['ano'], configuracion['semestre'])
+            except Exception as e:
+                print(f"❌ Error consultando ocupaciones de {codigo_aula}: {e}")
+                return None
+            ocupaciones_por_aula.append((codigo_aula, ocupaciones))
+        
+        planificador = PlanificadorConsolidacion(aulas, ocupaciones_por_aula, self._calcular_score_compatibilidad, dias)
+        aulas_en_uso = sorted({sesion['aula_actual'] for sesion in planificador.sesiones})
+        print(f"📋 {len(aulas)} aulas, {len(planificador.sesiones)} sesiones{' (' + ','.join(dias) + ')' if dias else ''}, {len(aulas_en_uso)} aulas en uso")
+        print(f"📐 Cota mínima de aulas necesarias: {planificador.cota_minima}")
+        
+        asignacion, abiertas, sin_aula = planificador.planificar(refinar=configuracion.get('consolidacion_refinar', True))
+        planes = planificador.construir_resultados(asignacion, sin_aula, lambda o: self.priorizador.obtener_prioridad_curso(o.get('CODIGOCURSO', '')))
+        
+        resultados = []
+        for codigo_aula in aulas_en_uso:
+            plan = planes[codigo_aula]
+            resultados.append({
+                'aula': codigo_aula,
+                'exito': True,
+                'solucion': {
+                    'aula_origen': codigo_aula,
+                    'fecha_generacion': datetime.now().isoformat(),
+                    'configuracion': configuracion,
+                    'plan_movimientos': plan,
+                    'estadisticas': self._calcular_estadisticas_solucion(plan),
+                    'es_valida': len(plan['conflictos']) == 0,
+                    'estrategia': 'consolidacion',
+                    'aula_liberada': codigo_aula not in abiertas
+                }
+            })
+        
+        liberadas = [codigo for codigo in aulas_en_uso if codigo not in abiertas]
+        total_movimientos = sum(len(plan['movimientos']) for plan in planes.values())
+        print(f"\n🏢 Aulas necesarias: {len(abiertas)} de {len(aulas_en_uso)} en uso (cota mínima {planificador.cota_minima})")
+        print(f"🔓 Aulas liberadas ({len(liberadas)}): {', '.join(liberadas) if liberadas else 'ninguna'}")
+        print(f"🔄 Movimientos: {total_movimientos}")
+        if sin_aula:
+            print(f"⚠️  Sesiones sin aula con capacidad suficiente: {len(sin_aula)}")
+        
+        prefijo_archivo = f"consolidacion_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        self._generar_archivos_consolidados(resultados, prefijo_archivo, configuracion)
+        
+        return {
+            'aulas_abiertas': abiertas,
+            'aulas_liberadas': liberadas,
+            'cota_minima': planificador.cota_minima,
+            'resultados': resultados
+        }
+    
+    def construir_foto_barrido(self, codigos_aulas, escenarios, configuracion):
+        """
+        Foto de datos de un barrido: ocupaciones de las aulas a liberar, bloques libres
+        por pabellón y tablas de priorización. Cada dato se consulta una sola vez
+        """
+        self.contexto.aplicar_configuracion(configuracion)
+        
+        libres_por_pabellon = {}
+        for pabellon in sorted({p for escenario in escenarios for p in escenario['pabellones']}):
+            libres_por_pabellon[pabellon] = self.contexto.aulas_libres(
+                configuracion['campus_code'], [pabellon], configuracion['ano'], configuracion['semestre']
+            )
+        
+        ocupaciones_por_aula = []
+        for codigo_aula in codigos_aulas:
+            try:
+                ocupaciones = self.contexto.ocupaciones_aula(codigo_aula, configuracion['ano'], configuracion['semestre'])
+            except Exception as e:
+                print(f"❌ Error consultando ocupaciones de {codigo_aula}: {e}")
+                return None
+            ocupaciones_por_aula.append((codigo_aula, ocupaciones))
+        
+        # Cada tabla de priorización se lee una sola vez; sin archivo se usa la de la ejecución
+        tablas_priorizacion = {None: self.priorizador.tabla_priorizacion}
+        for archivo in {escenario['priorizacion'] for escenario in escenarios if escenario['priorizacion']}:
+            priorizador = Priorizador(None)
+            priorizador.cargar_priorizacion_desde_csv(archivo)
+            tablas_priorizacion[archivo] = priorizador.tabla_priorizacion
+        
+        print(f"📋 {len(libres_por_pabellon)} pabellones, {sum(len(o) for _, o in ocupaciones_por_aula)} ocupaciones a reubicar")
+        return {
+            'libres_por_pabellon': libres_por_pabellon,
+            'ocupaciones_por_aula': ocupaciones_por_aula,
+            'tablas_priorizacion': tablas_priorizacion
+        }
+    
+    def barrer_parametros(self, codigos_aulas, escenarios, configuracion):
+        """
+        Evalúa la liberación de las aulas bajo varios juegos de parámetros (pabellones,
+        tolerancia de capacidad, aulas excluidas, priorización, estrategia). Los
+        escenarios corren en paralelo sobre una misma foto de datos
+        """
+        print(f"\n=== BARRIDO DE PARÁMETROS: {len(escenarios)} escenarios sobre {', '.join(codigos_aulas)} ===")
+        foto = self.construir_foto_barrido(codigos_aulas, escenarios, configuracion)
+        if foto is None:
+            return None
+        
+        resultados = ejecutar_barrido(escenarios, foto, max_workers=configuracion.get('workers'))
+        
+        archivo_csv = f"barrido_parametros_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv{sufijo_compresion(configuracion)}"
+        exportar_comparacion(resultados, archivo_csv)
+        mostrar_comparacion(resultados)
+        print(f"📊 Tabla comparativa exportada: {archivo_csv}")
+        
+        return resultados
+    
+    def reorganizar_multicampus(self, fragmentos, configuracion):
+        """
+        Reorganiza varios campus (o grupos de pabellones) a la vez: cada fragmento corre
+        en su propio proceso, con su conexión y su foto, y al final se fusionan los
+        consolidados de todos los fragmentos en un único reporte
+        """
+        print(f"\n=== REORGANIZACIÓN MULTICAMPUS ===")
+        for fragmento in fragmentos:
+            print(f"   • Campus {fragmento['campus_code']} | pabellones {fragmento['pabellon_codes']} | {len(fragmento['aulas'])} aulas")
+        
+        inicio = datetime.now()
+        resultados_fragmentos = ejecutar_fragmentos(fragmentos, configuracion, configuracion.get('conexiones') or 4)
+        
+        prefijo_archivo = f"multicampus_{inicio.strftime('%Y%m%d_%H%M%S')}"
+        sufijo = sufijo_compresion(configuracion)
+        self._exportar_multicampus_csv(resultados_fragmentos, f"{prefijo_archivo}.csv{sufijo}")
+        
+        archivo_json = archivo_plan(prefijo_archivo, formato_plan_de(configuracion)) + sufijo
+        guardar_plan({
+            'tipo': 'reorganizacion_multicampus',
+            'fecha_generacion': inicio.isoformat(),
+            'configuracion': configuracion,
+            'fragmentos': resultados_fragmentos
+        }, archivo_json, formato_plan_de(configuracion))
+        
+        print(f"\n📊 Resumen por fragmento:")
+        for fragmento in resultados_fragmentos:
+            movimientos = sum(
+                len(r['solucion']['plan_movimientos']['movimientos']) for r in fragmento['resultados'] if r['exito'] and r['solucion']
+            )
+            estado = f"❌ {fragmento['error']}" if fragmento['error'] else f"{len(fragmento['resultados'])} aulas, {movimientos} movimientos"
+            print(f"   • Campus {fragmento['campus_code']} {fragmento['pabellon_codes']}: {estado} ({fragmento['segundos']} s) → {fragmento['prefijo_archivo']}.*")
+        print(f"⏱️  Tiempo total: {(datetime.now() - inicio).total_seconds():.1f} s")
+        print(f"📄 Consolidado multicampus: {prefijo_archivo}.csv{sufijo}, {archivo_json}")
+        
+        return resultados_fragmentos
+    
+    def _exportar_multicampus_csv(self, fragmentos, archivo_csv):
+        """
+        Consolidado de todos los fragmentos, con el campus y los pabellones de cada fila
+        """
+        with abrir_salida(archivo_csv) as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(['Campus', 'Pabellones'] + ENCABEZADO_CONSOLIDADO)
+            for fragmento in fragmentos:
+                pabellones = ','.join(str(p) for p in fragmento['pabellon_codes'])
+                for resultado in fragmento['resultados']:
+                    for fila in self._filas_resultado_consolidado(resultado):
+                        writer.writerow([fragmento['campus_code'], pabellones] + fila)
+    
     def reorganizar_multiples_aulas(self, codigos_aulas, configuracion=None):
         """
         Reorganiza múltiples aulas y genera un reporte consolidado
@@ -464,118 +760,303 @@ class ReorganizadorAutomatico:
                 'semestre': '2'
             }
         
+        # Reanudar desde un diario de checkpoint o iniciar uno nuevo
+        inicio_previo, completadas = None, {}
+        if configuracion.get('resume'):
+            diario = DiarioCheckpoint(configuracion['resume'])
+            inicio_previo, completadas = diario.cargar()
+            if inicio_previo is None:
+                print(f"❌ El diario {configuracion['resume']} no existe o no tiene registro de inicio")
+                return []
+            codigos_aulas = inicio_previo['aulas']
+            prefijo_archivo = inicio_previo['prefijo_archivo']
+            # El problema (campus, pabellones, periodo, priorización) es el de la corrida original
+            configuracion = dict(configuracion)
+            for clave in ('campus_code', 'pabellon_codes', 'ano', 'semestre', 'archivo_priorizacion'):
+                if clave in inicio_previo['configuracion']:
+                    configuracion[clave] = inicio_previo['configuracion'][clave]
+            self.contexto.aplicar_configuracion(configuracion)
+        else:
+            self.contexto.aplicar_configuracion(configuracion)
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            prefijo_archivo = configuracion.get('prefijo_archivo') or f"consolidado_{timestamp}"
+            diario = DiarioCheckpoint(f"{prefijo_archivo}_checkpoint.jsonl")
+            diario.registrar_inicio(codigos_aulas, prefijo_archivo, configuracion)
+        
         print(f"\n{'='*60}")
         print(f"REORGANIZADOR AUTOMÁTICO - MÚLTIPLES AULAS")
         print(f"{'='*60}")
         print(f"Aulas a procesar: {len(codigos_aulas)}")
         print(f"Aulas: {', '.join(codigos_aulas)}")
         print(f"⚠️  El sistema evitará cruces entre las aulas procesadas")
+        print(f"💾 Checkpoint: {diario.ruta}")
         
-        resultados = []
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        prefijo_archivo = f"consolidado_{timestamp}"
+        # Estado compartido entre aulas para evitar cruces
+        estado = {
+            'movimientos_ya_generados': [],
+            'reservas': IndiceReservas(),
+            'buscador_cadenas': None
+        }
         
-        # Almacenar movimientos ya generados para evitar cruces
-        movimientos_ya_generados = []
+        if completadas:
+            print(f"♻️  Reanudando: {len(completadas)} de {len(codigos_aulas)} aulas ya procesadas")
+            self._restaurar_desde_checkpoint(completadas, configuracion, estado)
         
-        for i, codigo_aula in enumerate(codigos_aulas, 1):
-            print(f"\n--- Procesando aula {i}/{len(codigos_aulas)}: {codigo_aula} ---")
+        resultados_por_indice = {indice: registro['resultado'] for indice, registro in completadas.items()}
+        pendientes = [(indice, codigo_aula) for indice, codigo_aula in enumerate(codigos_aulas) if indice not in completadas]
+        
+        # La foto de aulas libres se consulta una sola vez para todas las aulas
+        aulas_libres = self.contexto.aulas_libres(
+            configuracion['campus_code'],
+            configuracion['pabellon_codes'],
+            configuracion['ano'],
+            configuracion['semestre']
+        )
+        
+        if configuracion.get('pipeline'):
+            exportacion_completa = self._procesar_aulas_en_pipeline(
+                pendientes, len(codigos_aulas), aulas_libres, configuracion, estado, diario, resultados_por_indice, prefijo_archivo
+            )
+            resultados = [resultados_por_indice[indice] for indice in sorted(resultados_por_indice)]
+        else:
+            # Fase 1: consultar las ocupaciones de cada aula y evaluar las aulas en paralelo
+            # (cada una es independiente de las demás)
+            ocupaciones_por_aula = []
+            errores_consulta = []
+            for _, codigo_aula in pendientes:
+                try:
+                    ocupaciones = self.contexto.ocupaciones_aula(codigo_aula, configuracion['ano'], configuracion['semestre'])
+                    errores_consulta.append(None)
+                except Exception as e:
+                    ocupaciones = []
+                    errores_consulta.append(str(e))
+                ocupaciones_por_aula.append((codigo_aula, ocupaciones))
             
-            try:
-                # Generar solución normalmente
-                solucion = self.generador.generar_solucion_completa(
-                    codigo_aula,
-                    campus_code=configuracion['campus_code'],
-                    pabellon_codes=configuracion['pabellon_codes'],
-                    ano=configuracion['ano'],
-                    semestre=configuracion['semestre']
+            evaluaciones = evaluar_aulas(
+                ocupaciones_por_aula, aulas_libres, self.priorizador.tabla_priorizacion, configuracion, configuracion.get('workers')
+            ) if pendientes else []
+            
+            # Fase 2: fusión determinista en el orden de entrada (reglas de cruce entre aulas);
+            # cada aula se exporta apenas se fusiona
+            with self._exportador_consolidado(prefijo_archivo, configuracion) as exportador:
+                # Al reanudar, primero las aulas ya procesadas
+                for indice in sorted(resultados_por_indice):
+                    exportador.escribir(resultados_por_indice[indice])
+                for (indice, codigo_aula), (solucion, log, error), error_consulta in zip(pendientes, evaluaciones, errores_consulta):
+                    print(f"\n--- Procesando aula {indice + 1}/{len(codigos_aulas)}: {codigo_aula} ---")
+                    print(log, end='')
+                    resultados_por_indice[indice] = self._procesar_resultado_aula(
+                        indice, codigo_aula, solucion, error_consulta or error, configuracion, estado, diario
+                    )
+                    exportador.escribir(resultados_por_indice[indice])
+            exportacion_completa = True
+            self._mostrar_archivos_consolidados(prefijo_archivo, configuracion)
+            
+            resultados = [resultados_por_indice[indice] for indice in sorted(resultados_por_indice)]
+        
+        # El diario solo se conserva si la corrida falla o se interrumpe (para --resume)
+        if exportacion_completa:
+            diario.descartar()
+            print(f"🧹 Corrida completa: se eliminó el checkpoint {diario.ruta}")
+        else:
+            print(f"⚠️  La exportación no terminó: se conserva el checkpoint {diario.ruta}")
+        
+        # Mostrar resumen final
+        self._mostrar_resumen_final(resultados, estado['movimientos_ya_generados'])
+        
+        return resultados
+    
+    def _procesar_resultado_aula(self, indice, codigo_aula, solucion, error, configuracion, estado, diario):
+        """
+        Fusiona el resultado de un aula y lo registra en el diario de checkpoint
+        """
+        inicio_movimientos = len(estado['movimientos_ya_generados'])
+        resultado = self._fusionar_resultado_aula(codigo_aula, solucion, error, configuracion, estado)
+        diario.registrar_aula(indice, resultado, estado['movimientos_ya_generados'][inicio_movimientos:])
+        return resultado
+    
+    def _restaurar_desde_checkpoint(self, completadas, configuracion, estado):
+        """
+        Reconstruye las reservas (movimientos y cadenas aceptadas) de las aulas ya procesadas
+        """
+        for indice in sorted(completadas):
+            registro = completadas[indice]
+            for movimiento in registro['movimientos']:
+                estado['movimientos_ya_generados'].append(movimiento)
+                estado['reservas'].reservar(
+                    movimiento['aula_destino'],
+                    movimiento['dia'],
+                    movimiento['hora_inicio'],
+                    movimiento['hora_fin'],
+                    movimiento['curso']
+                )
+            
+            solucion = registro['resultado'].get('solucion')
+            if not solucion:
+                continue
+            cadenas = [c['cadena'] for c in solucion['plan_movimientos']['conflictos'] if c.get('cadena')]
+            if cadenas and estado['buscador_cadenas'] is None:
+                _, aulas_ocupadas = self.contexto.libres_y_ocupados(
+                    configuracion['campus_code'],
+                    configuracion['pabellon_codes'],
+                    configuracion['ano'],
+                    configuracion['semestre']
+                )
+                estado['buscador_cadenas'] = BuscadorCadenas(
+                    aulas_ocupadas, reservas=estado['reservas'], profundidad_maxima=configuracion.get('profundidad_cadenas', 2),
+                    ocupaciones_de=self._ocupaciones_de(configuracion)
                 )
+            for cadena in cadenas:
+                estado['buscador_cadenas'].aplicar(cadena)
+    
+    def _fusionar_resultado_aula(self, codigo_aula, solucion, error, configuracion, estado):
+        """
+        Aplica las reglas de cruce entre aulas a la solución de un aula y registra sus
+        movimientos aceptados en el estado compartido. Retorna el resultado del aula
+        """
+        movimientos_ya_generados = estado['movimientos_ya_generados']
+        reservas = estado['reservas']
+        
+        try:
+            if error:
+                raise Exception(error)
+            
+            if solucion:
+                # Verificar cruces con las reservas ya tomadas (movimientos y cadenas de aulas anteriores)
+                movimientos_sin_cruces = self._verificar_y_filtrar_cruces(solucion, reservas)
                 
-                if solucion:
-                    # Verificar cruces con movimientos ya generados
-                    movimientos_sin_cruces = self._verificar_y_filtrar_cruces(solucion, movimientos_ya_generados)
+                if movimientos_sin_cruces:
+                    # Actualizar la solución con movimientos sin cruces
+                    solucion['plan_movimientos']['movimientos'] = movimientos_sin_cruces
+                    solucion['estadisticas'] = self.generador._calcular_estadisticas_solucion(solucion['plan_movimientos'])
                     
-                    if movimientos_sin_cruces:
-                        # Actualizar la solución con movimientos sin cruces
-                        solucion['plan_movimientos']['movimientos'] = movimientos_sin_cruces
-                        solucion['estadisticas'] = self.generador._calcular_estadisticas_solucion(solucion['plan_movimientos'])
-                        
-                        # Agregar movimientos exitosos a la lista de movimientos ya generados
-                        for movimiento in movimientos_sin_cruces:
-                            movimientos_ya_generados.append({
-                                'aula_origen': codigo_aula,
-                                'aula_destino': movimiento['aula_destino']['codigo'],
-                                'dia': movimiento['ocupacion']['CODIGODIA'],
-                                'hora_inicio': movimiento['ocupacion']['HORAINICIO'],
-                                'hora_fin': movimiento['ocupacion']['HORAFIN'],
-                                'curso': movimiento['ocupacion'].get('NOMBRE_CURSO', ''),
-                                'docente': movimiento['ocupacion'].get('NOMBRE_DOCENTE', '')
-                            })
-                        
-                        resultados.append({
-                            'aula': codigo_aula,
-                            'exito': True,
-                            'solucion': solucion
-                        })
-                        
-                        print(f"✅ Aula {codigo_aula} procesada exitosamente")
-                        print(f"   📊 Movimientos exitosos: {len(movimientos_sin_cruces)}")
-                        print(f"   ⚠️  Conflictos: {len(solucion['plan_movimientos']['conflictos'])}")
-                    else:
-                        resultados.append({
-                            'aula': codigo_aula,
-                            'exito': False,
-                            'error': 'Todos los movimientos generan cruces con aulas anteriores',
-                            'solucion': None
+                    # Agregar movimientos exitosos a la lista de movimientos ya generados
+                    for movimiento in movimientos_sin_cruces:
+                        movimientos_ya_generados.append({
+                            'aula_origen': codigo_aula,
+                            'aula_destino': movimiento['aula_destino']['codigo'],
+                            'dia': movimiento['ocupacion']['CODIGODIA'],
+                            'hora_inicio': movimiento['ocupacion']['HORAINICIO'],
+                            'hora_fin': movimiento['ocupacion']['HORAFIN'],
+                            'curso': movimiento['ocupacion'].get('NOMBRE_CURSO', ''),
+                            'docente': movimiento['ocupacion'].get('NOMBRE_DOCENTE', '')
                         })
-                        print(f"❌ Todos los movimientos de aula {codigo_aula} generan cruces")
-                else:
-                    resultados.append({
-                        'aula': codigo_aula,
-                        'exito': False,
-                        'error': 'No se pudo generar solución',
-                        'solucion': None
-                    })
-                    print(f"❌ No se pudo generar solución para aula {codigo_aula}")
+                        reservas.reservar(
+                            movimiento['aula_destino']['codigo'],
+                            movimiento['ocupacion']['CODIGODIA'],
+                            movimiento['ocupacion']['HORAINICIO'],
+                            movimiento['ocupacion']['HORAFIN'],
+                            movimiento['ocupacion'].get('NOMBRE_CURSO', '')
+                        )
                     
-            except Exception as e:
-                print(f"❌ Error procesando aula {codigo_aula}: {str(e)}")
-                resultados.append({
+                    estado['buscador_cadenas'] = self._proponer_cadenas_eyeccion(
+                        solucion, codigo_aula, configuracion, reservas, estado['buscador_cadenas']
+                    )
+                    
+                    print(f"✅ Aula {codigo_aula} procesada exitosamente")
+                    print(f"   📊 Movimientos exitosos: {len(movimientos_sin_cruces)}")
+                    print(f"   ⚠️  Conflictos: {len(solucion['plan_movimientos']['conflictos'])}")
+                    return {
+                        'aula': codigo_aula,
+                        'exito': True,
+                        'solucion': solucion
+                    }
+                
+                print(f"❌ Todos los movimientos de aula {codigo_aula} generan cruces")
+                return {
                     'aula': codigo_aula,
                     'exito': False,
-                    'error': str(e),
+                    'error': 'Todos los movimientos generan cruces con aulas anteriores',
                     'solucion': None
-                })
+                }
+            
+            print(f"❌ No se pudo generar solución para aula {codigo_aula}")
+            return {
+                'aula': codigo_aula,
+                'exito': False,
+                'error': 'No se pudo generar solución',
+                'solucion': None
+            }
+                
+        except Exception as e:
+            print(f"❌ Error procesando aula {codigo_aula}: {str(e)}")
+            return {
+                'aula': codigo_aula,
+                'exito': False,
+                'error': str(e),
+                'solucion': None
+            }
+    
+    def _procesar_aulas_en_pipeline(self, pendientes, total_aulas, aulas_libres, configuracion, estado, diario, resultados_por_indice, prefijo_archivo):
+        """
+        Modo en pipeline: un hilo consulta por adelantado las ocupaciones de las
+        siguientes aulas (cola acotada) mientras se resuelve la actual, y otro hilo
+        escribe los archivos consolidados a medida que cada aula termina
+        """
+        resultados_previos = [resultados_por_indice[indice] for indice in sorted(resultados_por_indice)]
+        cola_consultas = queue.Queue(maxsize=max(1, configuracion.get('prefetch', 2)))
+        cola_exportacion = queue.Queue()
+        exportacion = {'completa': False}
+        
+        def consultar():
+            for _, codigo_aula in pendientes:
+                try:
+                    ocupaciones = self.contexto.ocupaciones_aula(codigo_aula, configuracion['ano'], configuracion['semestre'])
+                    cola_consultas.put((codigo_aula, ocupaciones, None))
+                except Exception as e:
+                    cola_consultas.put((codigo_aula, [], str(e)))
+        
+        def exportar():
+            with self._exportador_consolidado(prefijo_archivo, configuracion) as exportador:
+                # Al reanudar, primero las aulas ya procesadas
+                for resultado in resultados_previos:
+                    exportador.escribir(resultado)
+                while True:
+                    resultado = cola_exportacion.get()
+                    if resultado is None:
+                        break
+                    exportador.escribir(resultado)
+            exportacion['completa'] = True
         
-        # Generar archivos consolidados
-        self._generar_archivos_consolidados(resultados, prefijo_archivo, configuracion)
+        hilo_consultas = threading.Thread(target=consultar, daemon=True)
+        hilo_exportacion = threading.Thread(target=exportar)
+        hilo_consultas.start()
+        hilo_exportacion.start()
         
-        # Mostrar resumen final
-        self._mostrar_resumen_final(resultados, movimientos_ya_generados)
+        print(f"🔀 Pipeline: consultas con {cola_consultas.maxsize} aulas de adelanto, exportación incremental")
         
-        return resultados
+        try:
+            for indice, _ in pendientes:
+                codigo_aula, ocupaciones, error_consulta = cola_consultas.get()
+                solucion, log, error = evaluar_aula(
+                    codigo_aula, ocupaciones, configuracion, aulas_libres, self.priorizador.tabla_priorizacion
+                )
+                print(f"\n--- Procesando aula {indice + 1}/{total_aulas}: {codigo_aula} ---")
+                print(log, end='')
+                resultado = self._procesar_resultado_aula(
+                    indice, codigo_aula, solucion, error_consulta or error, configuracion, estado, diario
+                )
+                resultados_por_indice[indice] = resultado
+                cola_exportacion.put(resultado)
+        finally:
+            cola_exportacion.put(None)
+            hilo_exportacion.join()
+        
+        self._mostrar_archivos_consolidados(prefijo_archivo, configuracion)
+        return exportacion['completa']
     
-    def _verificar_y_filtrar_cruces(self, solucion, movimientos_ya_generados):
+    def _verificar_y_filtrar_cruces(self, solucion, reservas):
         """
-        Verifica y filtra los movimientos de una solución para evitar cruces con movimientos ya generados
+        Verifica y filtra los movimientos de una solución para evitar cruces con las reservas
+        compartidas: movimientos ya generados y pasos de las cadenas aceptadas
         """
         movimientos_sin_cruces = []
         
         for movimiento in solucion['plan_movimientos']['movimientos']:
-            tiene_cruce = False
-            
-            # Verificar si este movimiento cruza con algún movimiento ya generado
-            for movimiento_existente in movimientos_ya_generados:
-                if (movimiento['aula_destino']['codigo'] == movimiento_existente['aula_destino'] and
-                    movimiento['ocupacion']['CODIGODIA'] == movimiento_existente['dia'] and
-                    self._horarios_se_superponen(
-                        movimiento['ocupacion']['HORAINICIO'],
-                        movimiento['ocupacion']['HORAFIN'],
-                        movimiento_existente['hora_inicio'],
-                        movimiento_existente['hora_fin']
-                    )):
-                    tiene_cruce = True
-                    break
+            ocupacion = movimiento['ocupacion']
+            tiene_cruce = not reservas.esta_libre(
+                movimiento['aula_destino']['codigo'], ocupacion['CODIGODIA'], ocupacion['HORAINICIO'], ocupacion['HORAFIN']
+            )
             
             if not tiene_cruce:
                 movimientos_sin_cruces.append(movimiento)
@@ -617,256 +1098,211 @@ class ReorganizadorAutomatico:
     
 
     
-    def _generar_archivos_consolidados(self, resultados, prefijo_archivo, configuracion):
+    def _exportador_consolidado(self, prefijo_archivo, configuracion):
         """
-        Genera los 3 archivos consolidados: completo, automático y JSON
+        Exportador de una sola pasada hacia los archivos consolidados: completo,
+        automático, JSON y resumen por aula
         """
-        # 1. Archivo completo con todas las opciones
-        self._exportar_consolidado_completo(resultados, f"{prefijo_archivo}_completo.csv")
-        
-        # 2. Archivo automático con solo las mejores opciones
-        self._exportar_consolidado_automatico(resultados, f"{prefijo_archivo}_automatico.csv")
-        
-        # 3. Archivo JSON consolidado
-        self._exportar_consolidado_json(resultados, f"{prefijo_archivo}.json", configuracion)
-        
-        print(f"\n✅ Archivos consolidados generados:")
-        print(f"   📋 {prefijo_archivo}_completo.csv (TODAS las opciones)")
-        print(f"   🤖 {prefijo_archivo}_automatico.csv (Solución automática)")
-        print(f"   📄 {prefijo_archivo}.json (Solución completa en JSON)")
+        cabecera_json = {
+            'tipo': 'reorganizacion_multiple',
+            'fecha_generacion': datetime.now().isoformat(),
+            'configuracion': configuracion
+        }
+        formato_plan = formato_plan_de(configuracion)
+        sufijo = sufijo_compresion(configuracion)
+        if formato_plan == 'legado':
+            salida_json = SalidaJSONConsolidado(f"{prefijo_archivo}.json{sufijo}", cabecera_json, self._elemento_json_consolidado)
+        else:
+            salida_json = SalidaPlanNormalizado(archivo_plan(prefijo_archivo, formato_plan) + sufijo, cabecera_json, self._elemento_json_consolidado, formato_plan)
+        salidas = self._salidas_reportes(prefijo_archivo, configuracion)
+        salidas.insert(2, salida_json)
+        historial = salida_historial(configuracion, salida_json.archivo, cabecera_json['tipo'], 'movimientos', filas_columnares_consolidado)
+        if historial:
+            salidas.append(historial)
+        return ExportadorConsolidado(salidas)
     
-    def _exportar_consolidado_completo(self, resultados, archivo_csv):
+    def _salidas_reportes(self, prefijo_archivo, configuracion):
         """
-        Exporta el catálogo completo consolidado
+        Salidas de los reportes del consolidado (todo menos el plan y el historial):
+        completo, automático, resumen por aula y, si se piden, Parquet y XLSX
         """
-        with open(archivo_csv, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.writer(csvfile)
-            writer.writerow([
-                'Aula_Origen', 'Aula_Destino', 'Tier', 'Dia', 'Hora_Inicio', 'Hora_Fin',
-                'Curso', 'Programa', 'Docente', 'Capacidad_Requerida', 'Capacidad_Destino',
-                'Score_Compatibilidad', 'Estado'
-            ])
-            
+        sufijo = sufijo_compresion(configuracion)
+        salidas = [
+            SalidaCSV(f"{prefijo_archivo}_completo.csv{sufijo}", ENCABEZADO_CONSOLIDADO, self._filas_resultado_consolidado),
+            SalidaCSV(f"{prefijo_archivo}_automatico.csv{sufijo}", ENCABEZADO_CONSOLIDADO, self._filas_resultado_consolidado),
+            SalidaResumen(f"{prefijo_archivo}_resumen.csv{sufijo}")
+        ]
+        if salida_parquet_habilitada(configuracion):
+            salidas.append(SalidaParquet(f"{prefijo_archivo}_completo.parquet", COLUMNAS_CONSOLIDADO, filas_columnares_consolidado))
+        if salida_xlsx_habilitada(configuracion):
+            salidas.append(self._salida_xlsx(f"{prefijo_archivo}.xlsx"))
+        return salidas
+    
+    def _salida_xlsx(self, archivo_xlsx):
+        """
+        Libro XLSX del consolidado: hoja 'Resumen' (una fila por aula) y una hoja por aula
+        """
+        return SalidaXLSX(
+            archivo_xlsx, ENCABEZADO_CONSOLIDADO, self._filas_resultado_consolidado,
+            lambda resultado: resultado['aula'], ('Resumen', SalidaResumen.ENCABEZADO, SalidaResumen.filas_resumen)
+        )
+    
+    def _generar_archivos_consolidados(self, resultados, prefijo_archivo, configuracion):
+        """
+        Genera los archivos consolidados recorriendo los resultados una sola vez
+        """
+        with self._exportador_consolidado(prefijo_archivo, configuracion) as exportador:
             for resultado in resultados:
-                aula_origen = resultado['aula']
-                
-                if resultado['exito'] and resultado['solucion']:
-                    # Exportar movimientos exitosos
-                    for movimiento in resultado['solucion']['plan_movimientos']['movimientos']:
-                        ocupacion = movimiento['ocupacion']
-                        prioridad = movimiento['prioridad']
-                        aula_destino = movimiento['aula_destino']
-                        
-                        writer.writerow([
-                            aula_origen,
-                            aula_destino['codigo'],
-                            prioridad['tier'],
-                            ocupacion['CODIGODIA'],
-                            ocupacion['HORAINICIO'],
-                            ocupacion['HORAFIN'],
-                            ocupacion.get('NOMBRE_CURSO', ''),
-                            ocupacion.get('NOMBRE_PROGRAMA', ''),
-                            ocupacion.get('NOMBRE_DOCENTE', ''),
-                            ocupacion.get('CAPACIDADMAXIMA') or '',
-                            aula_destino['capacidad'],
-                            movimiento['score'],
-                            'MOVIMIENTO_EXITOSO'
-                        ])
-                    
-                    # Exportar conflictos
-                    for conflicto in resultado['solucion']['plan_movimientos']['conflictos']:
-                        ocupacion = conflicto['ocupacion']
-                        prioridad = conflicto['prioridad']
-                        
-                        writer.writerow([
-                            aula_origen,
-                            '',
-                            prioridad['tier'],
-                            ocupacion['CODIGODIA'],
-                            ocupacion['HORAINICIO'],
-                            ocupacion['HORAFIN'],
-                            ocupacion.get('NOMBRE_CURSO', ''),
-                            ocupacion.get('NOMBRE_PROGRAMA', ''),
-                            ocupacion.get('NOMBRE_DOCENTE', ''),
-                            ocupacion.get('CAPACIDADMAXIMA') or '',
-                            '',
-                            '',
-                            f"CONFLICTO_{conflicto['tipo']}"
-                        ])
-                else:
-                    # Exportar error
-                    writer.writerow([
-                        aula_origen,
-                        '',
-                        '',
-                        '',
-                        '',
-                        '',
-                        '',
-                        '',
-                        '',
-                        '',
-                        '',
-                        '',
-                        f"ERROR: {resultado.get('error', 'Error desconocido')}"
-                    ])
+                exportador.escribir(resultado)
+        self._mostrar_archivos_consolidados(prefijo_archivo, configuracion)
+    
+    def _mostrar_archivos_consolidados(self, prefijo_archivo, configuracion):
+        sufijo = sufijo_compresion(configuracion)
+        print(f"\n✅ Archivos consolidados generados:")
+        print(f"   📋 {prefijo_archivo}_completo.csv{sufijo} (TODAS las opciones)")
+        print(f"   🤖 {prefijo_archivo}_automatico.csv{sufijo} (Solución automática)")
+        if os.path.exists(f"{prefijo_archivo}.msgpack{sufijo}"):
+            print(f"   📄 {prefijo_archivo}.msgpack{sufijo} (Solución completa en msgpack)")
+        else:
+            print(f"   📄 {prefijo_archivo}.json{sufijo} (Solución completa en JSON)")
+        print(f"   📊 {prefijo_archivo}_resumen.csv{sufijo} (Resumen por aula)")
+        if os.path.exists(f"{prefijo_archivo}_completo.parquet"):
+            print(f"   🗜️  {prefijo_archivo}_completo.parquet (Completo en formato columnar)")
+        if os.path.exists(f"{prefijo_archivo}.xlsx"):
+            print(f"   📗 {prefijo_archivo}.xlsx (Resumen y una hoja por aula, para Excel)")
     
-    def _exportar_consolidado_automatico(self, resultados, archivo_csv):
+    def _filas_resultado_consolidado(self, resultado):
         """
-        Exporta la solución automática consolidada
+        Filas del consolidado para el resultado de un aula: movimientos, conflictos o error
         """
-        with open(archivo_csv, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.writer(csvfile)
-            writer.writerow([
-                'Aula_Origen', 'Aula_Destino', 'Tier', 'Dia', 'Hora_Inicio', 'Hora_Fin',
-                'Curso', 'Programa', 'Docente', 'Capacidad_Requerida', 'Capacidad_Destino',
-                'Score_Compatibilidad', 'Estado'
-            ])
+        aula_origen = resultado['aula']
+        filas = []
+        
+        if resultado['exito'] and resultado['solucion']:
+            # Movimientos exitosos
+            for movimiento in resultado['solucion']['plan_movimientos']['movimientos']:
+                ocupacion = movimiento['ocupacion']
+                prioridad = movimiento['prioridad']
+                aula_destino = movimiento['aula_destino']
+                
+                filas.append([
+                    aula_origen,
+                    aula_destino['codigo'],
+                    prioridad['tier'],
+                    ocupacion['CODIGODIA'],
+                    ocupacion['HORAINICIO'],
+                    ocupacion['HORAFIN'],
+                    ocupacion.get('NOMBRE_CURSO', ''),
+                    ocupacion.get('NOMBRE_PROGRAMA', ''),
+                    ocupacion.get('NOMBRE_DOCENTE', ''),
+                    ocupacion.get('CAPACIDADMAXIMA') or '',
+                    aula_destino['capacidad'],
+                    movimiento['score'],
+                    'MOVIMIENTO_EXITOSO'
+                ])
             
-            for resultado in resultados:
-                aula_origen = resultado['aula']
+            # Conflictos
+            for conflicto in resultado['solucion']['plan_movimientos']['conflictos']:
+                ocupacion = conflicto['ocupacion']
+                prioridad = conflicto['prioridad']
                 
-                if resultado['exito'] and resultado['solucion']:
-                    for movimiento in resultado['solucion']['plan_movimientos']['movimientos']:
-                        ocupacion = movimiento['ocupacion']
-                        prioridad = movimiento['prioridad']
-                        aula_destino = movimiento['aula_destino']
-                        
-                        writer.writerow([
-                            aula_origen,
-                            aula_destino['codigo'],
-                            prioridad['tier'],
-                            ocupacion['CODIGODIA'],
-                            ocupacion['HORAINICIO'],
-                            ocupacion['HORAFIN'],
-                            ocupacion.get('NOMBRE_CURSO', ''),
-                            ocupacion.get('NOMBRE_PROGRAMA', ''),
-                            ocupacion.get('NOMBRE_DOCENTE', ''),
-                            ocupacion.get('CAPACIDADMAXIMA') or '',
-                            aula_destino['capacidad'],
-                            movimiento['score'],
-                            'MOVIMIENTO_EXITOSO'
-                        ])
-                    
-                    for conflicto in resultado['solucion']['plan_movimientos']['conflictos']:
-                        ocupacion = conflicto['ocupacion']
-                        prioridad = conflicto['prioridad']
-                        
-                        writer.writerow([
-                            aula_origen,
-                            '',
-                            prioridad['tier'],
-                            ocupacion['CODIGODIA'],
-                            ocupacion['HORAINICIO'],
-                            ocupacion['HORAFIN'],
-                            ocupacion.get('NOMBRE_CURSO', ''),
-                            ocupacion.get('NOMBRE_PROGRAMA', ''),
-                            ocupacion.get('NOMBRE_DOCENTE', ''),
-                            ocupacion.get('CAPACIDADMAXIMA') or '',
-                            '',
-                            '',
-                            f"CONFLICTO_{conflicto['tipo']}"
-                        ])
-                else:
-                    writer.writerow([
-                        aula_origen,
-                        '',
-                        '',
-                        '',
-                        '',
-                        '',
-                        '',
-                        '',
-                        '',
-                        '',
-                        '',
-                        '',
-                        f"ERROR: {resultado.get('error', 'Error desconocido')}"
-                    ])
+                filas.append([
+                    aula_origen,
+                    '',
+                    prioridad['tier'],
+                    ocupacion['CODIGODIA'],
+                    ocupacion['HORAINICIO'],
+                    ocupacion['HORAFIN'],
+                    ocupacion.get('NOMBRE_CURSO', ''),
+                    ocupacion.get('NOMBRE_PROGRAMA', ''),
+                    ocupacion.get('NOMBRE_DOCENTE', ''),
+                    ocupacion.get('CAPACIDADMAXIMA') or '',
+                    '',
+                    '',
+                    f"CONFLICTO_{conflicto['tipo']}"
+                ])
+        else:
+            # Error
+            filas.append([aula_origen] + [''] * 11 + [f"ERROR: {resultado.get('error', 'Error desconocido')}"])
+        
+        return filas
     
-    def _exportar_consolidado_json(self, resultados, archivo_json, configuracion):
+    def _elemento_json_consolidado(self, resultado):
         """
-        Exporta la solución consolidada en JSON
+        Elemento de 'resultados' del JSON consolidado para el resultado de un aula
         """
-        solucion_consolidada = {
-            'tipo': 'reorganizacion_multiple',
-            'fecha_generacion': datetime.now().isoformat(),
-            'configuracion': configuracion,
-            'aulas_procesadas': len(resultados),
-            'resultados': []
+        return {
+            'aula_origen': resultado['aula'],
+            'exito': resultado['exito'],
+            'error': resultado.get('error', ''),
+            'solucion': resultado.get('solucion', None)
         }
-        
-        for resultado in resultados:
-            resultado_json = {
-                'aula_origen': resultado['aula'],
-                'exito': resultado['exito'],
-                'error': resultado.get('error', ''),
-                'solucion': resultado.get('solucion', None)
-            }
-            solucion_consolidada['resultados'].append(resultado_json)
-        
-        with open(archivo_json, 'w', encoding='utf-8') as jsonfile:
-            json.dump(solucion_consolidada, jsonfile, indent=2, ensure_ascii=False)
     
     def _generar_reporte_consolidado(self, resultados, timestamp, configuracion):
         """
         Genera un reporte consolidado de todos los resultados
         """
-        archivo_reporte = f"reporte_consolidado_{timestamp}.csv"
-        
-        with open(archivo_reporte, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.writer(csvfile)
-            writer.writerow([
-                'Aula', 'Estado', 'Movimientos_Exitosos', 'Conflictos', 'Aulas_Utilizadas',
-                'Score_Promedio', 'Porcentaje_Exito', 'Es_Valida', 'Error'
-            ])
-            
+        resumen = SalidaResumen(f"reporte_consolidado_{timestamp}.csv{sufijo_compresion(configuracion)}")
+        with ExportadorConsolidado([resumen]) as exportador:
             for resultado in resultados:
-                if resultado['exito'] and resultado['solucion']:
-                    stats = resultado['solucion']['estadisticas']
-                    writer.writerow([
-                        resultado['aula'],
-                        'EXITOSO',
-                        stats['total_movimientos'],
-                        stats['total_conflictos'],
-                        stats['aulas_utilizadas'],
-                        stats['score_promedio'],
-                        stats['porcentaje_exito'],
-                        'SÍ' if resultado['solucion']['es_valida'] else 'NO',
-                        ''
-                    ])
-                else:
-                    writer.writerow([
-                        resultado['aula'],
-                        'FALLIDO',
-                        '', '', '', '', '', '',
-                        resultado.get('error', 'Error desconocido')
-                    ])
-        
-        # Mostrar resumen
-        exitosos = sum(1 for r in resultados if r['exito'])
-        fallidos = len(resultados) - exitosos
+                exportador.escribir(resultado)
+        resumen.mostrar()
+    
+    def renderizar_plan(self, archivo_json, configuracion=None, prefijo_archivo=None):
+        """
+        Regenera los reportes de un plan guardado (un aula, consolidado o multicampus) sin
+        consultar la base de datos: CSV completo y automático, resumen por aula, reporte
+        consolidado y horario visual. El plan no se modifica ni se vuelve a registrar
+        """
+        configuracion = configuracion or {}
+        print(f"\n=== REPORTES DESDE {archivo_json} ===")
+        try:
+            documento, _ = leer_plan(archivo_json)
+        except (OSError, ValueError) as e:
+            print(f"❌ No se pudo leer el plan {archivo_json}: {e}")
+            return None
         
-        print(f"\n{'='*60}")
-        print(f"REPORTE CONSOLIDADO")
-        print(f"{'='*60}")
-        print(f"Total de aulas procesadas: {len(resultados)}")
-        print(f"Exitosos: {exitosos}")
-        print(f"Fallidos: {fallidos}")
-        print(f"Archivo de reporte: {archivo_reporte}")
-        
-        if exitosos > 0:
-            # Calcular estadísticas promedio de las soluciones exitosas
-            soluciones_exitosas = [r['solucion'] for r in resultados if r['exito'] and r['solucion']]
-            if soluciones_exitosas:
-                movimientos_promedio = sum(s['estadisticas']['total_movimientos'] for s in soluciones_exitosas) / len(soluciones_exitosas)
-                score_promedio = sum(s['estadisticas']['score_promedio'] for s in soluciones_exitosas) / len(soluciones_exitosas)
-                print(f"Movimientos promedio por aula: {movimientos_promedio:.1f}")
-                print(f"Score promedio: {score_promedio:.1f}")
+        if prefijo_archivo is None:
+            prefijo_archivo = os.path.join(os.path.dirname(archivo_json), os.path.basename(archivo_json).split('.')[0])
+        sufijo = sufijo_compresion(configuracion)
+        # El reporte consolidado lleva el timestamp de la corrida original, si el nombre lo tiene
+        coincidencia = re.search(r'(\d{8}_\d{6})', os.path.basename(prefijo_archivo))
+        timestamp = coincidencia.group(1) if coincidencia else datetime.now().strftime('%Y%m%d_%H%M%S')
+        reporte = SalidaResumen(os.path.join(os.path.dirname(prefijo_archivo), f"reporte_consolidado_{timestamp}.csv{sufijo}"))
+        
+        # Un plan de un aula no guarda el catálogo con todas las opciones: de él solo sale el automático
+        un_aula = 'plan_movimientos' in documento
+        if un_aula:
+            salidas = [SalidaCSV(f"{prefijo_archivo}_automatico.csv{sufijo}", ENCABEZADO_CONSOLIDADO, self._filas_resultado_consolidado)]
+            if salida_xlsx_habilitada(configuracion):
+                salidas.append(self._salida_xlsx(f"{prefijo_archivo}_automatico.xlsx"))
+        else:
+            salidas = self._salidas_reportes(prefijo_archivo, configuracion)
+        salidas.append(reporte)
+        with ExportadorConsolidado(salidas) as exportador:
+            for resultado in resultados_del_plan(documento):
+                exportador.escribir(resultado)
+        if 'fragmentos' in documento:
+            self._exportar_multicampus_csv(documento['fragmentos'], f"{prefijo_archivo}.csv{sufijo}")
+        exportar_horarios(documento, prefijo_archivo, f"Horario de {os.path.basename(archivo_json)}")
+        
+        reporte.mostrar()
+        # Solo lo que se escribió ahora: el plan de origen no se toca (puede ser .json.gz o .msgpack)
+        print(f"\n✅ Reportes regenerados:")
+        for salida in salidas:
+            print(f"   📄 {salida.archivo}")
+        if 'fragmentos' in documento:
+            print(f"   🌐 {prefijo_archivo}.csv{sufijo} (Consolidado multicampus)")
+        print(f"   🗓️  {prefijo_archivo}_horario.html, _horario_aulas.csv y _horario_pabellones.csv (Horario visual)")
+        if un_aula:
+            print(f"   ⚠️  {prefijo_archivo}_completo.csv no se regenera: el plan de un aula no guarda el catálogo de opciones")
+        return documento
     
     def continuar_desde_json(self, archivo_json, codigo_aula, configuracion=None):
         """
-        Continúa la reorganización basándose en un JSON existente, actualizando el mismo archivo
+        Continúa la reorganización basándose en un JSON existente, actualizando el mismo archivo.
+        Los movimientos previos se cargan una sola vez en un índice de reservas y el aula
+        nueva se consulta y evalúa una sola vez contra ese estado
         """
         if configuracion is None:
             configuracion = {
@@ -876,19 +1312,21 @@ class ReorganizadorAutomatico:
                 'semestre': '2'
             }
         
+        self.contexto.aplicar_configuracion(configuracion)
+        
         print(f"\n{'='*60}")
         print(f"CONTINUAR DESDE JSON - AULA {codigo_aula}")
         print(f"{'='*60}")
         print(f"Archivo JSON: {archivo_json}")
         
-        # Cargar JSON existente
-        solucion_existente, movimientos_existentes = cargar_json_existente(archivo_json)
-        if not solucion_existente:
+        # Índice de reservas de los movimientos existentes, armado mientras se lee el plan
+        reservas = self._indice_plan(archivo_json)
+        if reservas is None:
             return None
+        total_existentes = reservas.total_reservas()
+        print(f"⚠️  Evitando cruces con {total_existentes} movimientos existentes")
         
-        print(f"⚠️  Evitando cruces con {len(movimientos_existentes)} movimientos existentes")
-        
-        # Evaluar movimientos para la nueva aula
+        # Evaluar movimientos para la nueva aula (una sola consulta)
         movimientos_posibles = self.evaluador.evaluar_movimientos_aula(
             codigo_aula,
             campus_code=configuracion['campus_code'],
@@ -901,12 +1339,13 @@ class ReorganizadorAutomatico:
             print("❌ No se encontraron movimientos posibles para esta aula.")
             return None
         
-        # Filtrar movimientos para evitar cruces con los existentes
-        movimientos_filtrados = self._filtrar_cruces_con_existentes(movimientos_posibles, movimientos_existentes)
+        # Quitar las aulas candidatas que cruzan con movimientos existentes
+        movimientos_filtrados = self._filtrar_cruces_con_existentes(movimientos_posibles, reservas)
         
-        # Generar solución para la nueva aula
-        solucion_nueva = self.generador.generar_solucion_completa(
+        # Generar solución para la nueva aula sobre los candidatos filtrados
+        solucion_nueva = self.generador.generar_solucion_desde_movimientos(
             codigo_aula,
+            movimientos_filtrados,
             campus_code=configuracion['campus_code'],
             pabellon_codes=configuracion['pabellon_codes'],
             ano=configuracion['ano'],
@@ -914,58 +1353,37 @@ class ReorganizadorAutomatico:
         )
         
         if solucion_nueva:
-            # Actualizar el JSON existente con la nueva solución
-            self._actualizar_json_existente(archivo_json, solucion_nueva, movimientos_existentes)
+            # Agregar la nueva solución al plan (sin reescribirlo) y a su índice
+            self._actualizar_json_existente(archivo_json, solucion_nueva, reservas, configuracion)
             
             print(f"\n✅ JSON actualizado exitosamente:")
-            print(f"   📄 {archivo_json} (actualizado con nueva aula)")
+            print(f"   📄 {archivo_json} (nueva aula en {archivo_adicionales(archivo_json)})")
             print(f"   🆕 Aula agregada: {codigo_aula}")
-            print(f"   📊 Total de movimientos: {len(movimientos_existentes) + len(solucion_nueva['plan_movimientos']['movimientos'])}")
+            print(f"   📊 Total de movimientos: {total_existentes + len(solucion_nueva['plan_movimientos']['movimientos'])}")
             
             return solucion_nueva
         else:
             print("❌ No se pudo generar solución para la nueva aula.")
             return None
     
-    def _filtrar_cruces_con_existentes(self, movimientos_posibles, movimientos_existentes):
+    def _filtrar_cruces_con_existentes(self, movimientos_posibles, reservas):
         """
-        Filtra los movimientos posibles para evitar cruces con movimientos existentes
+        Filtra las aulas candidatas de cada movimiento que cruzan con las reservas existentes
         """
         movimientos_filtrados = []
         
         for movimiento in movimientos_posibles:
-            aulas_candidatas_filtradas = []
-            
-            for aula_candidata in movimiento['aulas_candidatas']:
-                # Verificar si hay cruces con movimientos existentes
-                tiene_cruce = False
-                
-                for movimiento_existente in movimientos_existentes:
-                    if (aula_candidata['codigo'] == movimiento_existente['aula_destino'] and
-                        movimiento['ocupacion']['CODIGODIA'] == movimiento_existente['dia'] and
-                        self._horarios_se_superponen(
-                            movimiento['ocupacion']['HORAINICIO'],
-                            movimiento['ocupacion']['HORAFIN'],
-                            movimiento_existente['hora_inicio'],
-                            movimiento_existente['hora_fin']
-                        )):
-                        tiene_cruce = True
-                        break
-                
-                if not tiene_cruce:
-                    aulas_candidatas_filtradas.append(aula_candidata)
+            ocupacion = movimiento['ocupacion']
+            aulas_candidatas_filtradas = [
+                aula_candidata for aula_candidata in movimiento['aulas_candidatas']
+                if reservas.esta_libre(aula_candidata['codigo'], ocupacion['CODIGODIA'], ocupacion['HORAINICIO'], ocupacion['HORAFIN'])
+            ]
             
-            if aulas_candidatas_filtradas:
-                movimiento_filtrado = movimiento.copy()
-                movimiento_filtrado['aulas_candidatas'] = aulas_candidatas_filtradas
-                movimiento_filtrado['mejor_opcion'] = aulas_candidatas_filtradas[0] if aulas_candidatas_filtradas else None
-                movimientos_filtrados.append(movimiento_filtrado)
-            else:
-                # Mantener el movimiento pero sin opciones
-                movimiento_filtrado = movimiento.copy()
-                movimiento_filtrado['aulas_candidatas'] = []
-                movimiento_filtrado['mejor_opcion'] = None
-                movimientos_filtrados.append(movimiento_filtrado)
+            # Si no queda ninguna, el movimiento se mantiene sin opciones
+            movimiento_filtrado = movimiento.copy()
+            movimiento_filtrado['aulas_candidatas'] = aulas_candidatas_filtradas
+            movimiento_filtrado['mejor_opcion'] = aulas_candidatas_filtradas[0] if aulas_candidatas_filtradas else None
+            movimientos_filtrados.append(movimiento_filtrado)
         
         return movimientos_filtrados
     
@@ -986,43 +1404,56 @@ class ReorganizadorAutomatico:
         # Dos horarios se superponen si uno empieza antes de que termine el otro
         return inicio1_min < fin2_min and inicio2_min < fin1_min
     
-    def _actualizar_json_existente(self, archivo_json, solucion_nueva, movimientos_existentes):
+    def _firma_plan(self, archivo_json):
+        # Cambia si el plan o su sidecar se modificaron fuera de esta ejecución
+        sidecar = archivo_adicionales(archivo_json)
+        return (
+            os.path.getmtime(archivo_json), os.path.getsize(archivo_json),
+            os.path.getsize(sidecar) if os.path.exists(sidecar) else 0
+        )
+    
+    def _indice_plan(self, archivo_json):
         """
-        Actualiza el JSON existente agregando la nueva solución
+        Índice de reservas del plan: se lee una sola vez por ejecución y después se
+        actualiza con cada aula agregada. Retorna None si el archivo no se puede leer
         """
         try:
-            # Cargar JSON existente
-            with open(archivo_json, 'r', encoding='utf-8') as jsonfile:
-                json_existente = json.load(jsonfile)
-            
-            # Agregar la nueva solución
-            if 'aulas_adicionales' not in json_existente:
-                json_existente['aulas_adicionales'] = []
-            
-            json_existente['aulas_adicionales'].append({
-                'aula_origen': solucion_nueva['aula_origen'],
-                'fecha_agregada': datetime.now().isoformat(),
-                'solucion': solucion_nueva
-            })
-            
-            # Actualizar estadísticas
-            if 'estadisticas_consolidadas' not in json_existente:
-                json_existente['estadisticas_consolidadas'] = {
-                    'total_aulas_procesadas': 0,
-                    'total_movimientos_exitosos': 0,
-                    'total_conflictos': 0
-                }
+            firma = self._firma_plan(archivo_json)
+            guardado = self._indices_planes.get(archivo_json)
+            if guardado and guardado[0] == firma:
+                print(f"✅ Índice del plan en memoria: {archivo_json}")
+                return guardado[1]
             
-            json_existente['estadisticas_consolidadas']['total_aulas_procesadas'] += 1
-            json_existente['estadisticas_consolidadas']['total_movimientos_exitosos'] += len(solucion_nueva['plan_movimientos']['movimientos'])
-            json_existente['estadisticas_consolidadas']['total_conflictos'] += len(solucion_nueva['plan_movimientos']['conflictos'])
-            
-            # Actualizar fecha de modificación
-            json_existente['fecha_ultima_modificacion'] = datetime.now().isoformat()
-            
-            # Guardar JSON actualizado
-            with open(archivo_json, 'w', encoding='utf-8') as jsonfile:
-                json.dump(json_existente, jsonfile, indent=2, ensure_ascii=False)
+            reservas = cargar_indice_plan(archivo_json)
+            self._indices_planes[archivo_json] = (firma, reservas)
+            print(f"✅ Plan leído: {archivo_json}")
+            return reservas
+        except FileNotFoundError:
+            print(f"❌ Archivo {archivo_json} no encontrado.")
+        except ValueError as e:
+            print(f"❌ Error al leer el archivo {archivo_json}: {str(e)}")
+        except Exception as e:
+            print(f"❌ Error inesperado: {str(e)}")
+        return None
+    
+    def _actualizar_json_existente(self, archivo_json, solucion_nueva, reservas, configuracion=None):
+        """
+        Agrega la nueva solución al plan: una línea en su sidecar JSONL, sin reescribir
+        el archivo, y sus movimientos al índice de reservas del plan
+        """
+        try:
+            agregar_aula_adicional(archivo_json, solucion_nueva)
+            agregar_a_historial(
+                configuracion, archivo_adicionales(archivo_json), 'continuacion', 'movimientos',
+                filas_columnares_consolidado({'aula': solucion_nueva['aula_origen'], 'exito': True, 'solucion': solucion_nueva})
+            )
+            for movimiento in solucion_nueva['plan_movimientos']['movimientos']:
+                ocupacion = movimiento['ocupacion']
+                reservas.reservar(
+                    movimiento['aula_destino']['codigo'], ocupacion['CODIGODIA'],
+                    ocupacion['HORAINICIO'], ocupacion['HORAFIN'], ocupacion.get('NOMBRE_CURSO', '')
+                )
+            self._indices_planes[archivo_json] = (self._firma_plan(archivo_json), reservas)
                 
         except Exception as e:
             print(f"❌ Error actualizando JSON: {str(e)}")
@@ -1085,7 +1516,7 @@ def cargar_aulas_desde_csv(archivo_csv):
     """
     aulas = []
     try:
-        with open(archivo_csv, 'r', encoding='utf-8') as csvfile:
+        with abrir_entrada(archivo_csv) as csvfile:
             reader = csv.DictReader(csvfile)
             for row in reader:
                 codigo_aula = row.get('codigo_aula', '').strip()
@@ -1099,49 +1530,6 @@ def cargar_aulas_desde_csv(archivo_csv):
     
     return aulas
 
-def cargar_json_existente(archivo_json):
-    """
-    Carga un JSON existente con movimientos ya realizados
-    """
-    try:
-        with open(archivo_json, 'r', encoding='utf-8') as jsonfile:
-            solucion_existente = json.load(jsonfile)
-        
-        print(f"✅ JSON cargado: {archivo_json}")
-        print(f"   📋 Aula origen: {solucion_existente.get('aula_origen', 'N/A')}")
-        print(f"   📅 Fecha: {solucion_existente.get('fecha_generacion', 'N/A')}")
-        
-        # Extraer movimientos existentes
-        movimientos_existentes = []
-        if 'plan_movimientos' in solucion_existente:
-            for movimiento in solucion_existente['plan_movimientos'].get('movimientos', []):
-                ocupacion = movimiento['ocupacion']
-                aula_destino = movimiento['aula_destino']
-                
-                movimientos_existentes.append({
-                    'aula_destino': aula_destino['codigo'],
-                    'dia': ocupacion['CODIGODIA'],
-                    'hora_inicio': ocupacion['HORAINICIO'],
-                    'hora_fin': ocupacion['HORAFIN'],
-                    'curso': ocupacion.get('NOMBRE_CURSO', ''),
-                    'aula_origen': ocupacion.get('CODIGOAULA', '')
-                })
-        
-        print(f"   📊 Movimientos existentes: {len(movimientos_existentes)}")
-        return solucion_existente, movimientos_existentes
-        
-    except FileNotFoundError:
-        print(f"❌ Archivo {archivo_json} no encontrado.")
-        return None, []
-    except json.JSONDecodeError:
-        print(f"❌ Error al leer el archivo JSON {archivo_json}.")
-        return None, []
-    except Exception as e:
-        print(f"❌ Error inesperado: {str(e)}")
-        return None, []
-
-
-
 def main():
     """
     Función principal con interfaz de línea de comandos
@@ -1155,6 +1543,36 @@ def main():
     parser.add_argument('--ano', type=str, default='2025', help='Año académico (default: 2025)')
     parser.add_argument('--semestre', type=str, default='2', help='Semestre (default: 2)')
     parser.add_argument('--priorizacion', type=str, help='Archivo CSV con tabla de priorización')
+    parser.add_argument('--portafolio', action='store_true', help='Resolver con varias estrategias en paralelo y quedarse con la mejor')
+    parser.add_argument('--presupuesto', type=float, default=30, help='Tiempo máximo en segundos para el portafolio (default: 30)')
+    parser.add_argument('--workers', type=int, help='Cantidad de procesos a usar en el portafolio y en la evaluación de múltiples aulas (default: núcleos disponibles)')
+    parser.add_argument('--solo-factibilidad', action='store_true', help='Solo calcular la cota mínima de conflictos (sin resolver)')
+    parser.add_argument('--pipeline', action='store_true', help='Múltiples aulas: consultar las siguientes aulas mientras se resuelve la actual y exportar a medida que terminan')
+    parser.add_argument('--prefetch', type=int, default=2, help='Aulas consultadas por adelantado en modo pipeline (default: 2)')
+    parser.add_argument('--resume', type=str, help='Reanudar una reorganización múltiple desde su diario de checkpoint (consolidado_*_checkpoint.jsonl)')
+    parser.add_argument('--ranking-liberacion', action='store_true', help='Ranking de las aulas más baratas de liberar en los pabellones seleccionados')
+    parser.add_argument('--multicampus', action='store_true', help='Con --aulas-csv (columnas campus y pabellones): ejecutar cada campus/grupo de pabellones en paralelo')
+    parser.add_argument('--conexiones', type=int, default=4, help='Máximo de fragmentos (y conexiones a la base) simultáneos en --multicampus (default: 4)')
+    parser.add_argument('--barrido', type=str, help='Archivo JSON con los escenarios (o grilla de parámetros) a comparar para --aula/--aulas-csv')
+    parser.add_argument('--parquet', action='store_true', help='Además de los CSV, exportar catálogos y consolidados completos en Parquet (requiere pyarrow)')
+    parser.add_argument('--xlsx', action='store_true', help='Además de los CSV, exportar catálogos, soluciones y consolidados en Excel (requiere xlsxwriter)')
+    parser.add_argument('--comprimir', choices=COMPRESIONES, help='Comprimir los archivos de salida: gzip (.gz) o zstd (.zst, requiere zstandard)')
+    parser.add_argument('--formato-plan', choices=FORMATOS_SALIDA, default='normalizado', help='Formato del JSON de la solución: normalizado (tablas, sin sangría), legado (indent=2) o msgpack (requiere msgpack) (default: normalizado)')
+    parser.add_argument('--historial', type=str, default=HISTORIAL_POR_DEFECTO, help=f'Base SQLite donde se registran los planes y catálogos exportados (default: {HISTORIAL_POR_DEFECTO})')
+    parser.add_argument('--sin-historial', action='store_true', help='No registrar los archivos exportados en el historial')
+    parser.add_argument('--ingestar-historial', nargs='*', metavar='ARCHIVO', help='Cargar en el historial planes y catálogos ya generados (rutas o globs; sin argumentos, los del directorio actual)')
+    parser.add_argument('--buscar-historial', nargs='+', metavar='FILTRO', help='Buscar en el historial con filtros clave=valor: origen, destino, dia, hora, curso, desde, hasta, tabla (movimientos u opciones)')
+    parser.add_argument('--render', nargs='+', metavar='PLAN', help='Regenerar los reportes (CSV, resumen, reporte consolidado y horario visual) de planes ya guardados, sin base de datos')
+    parser.add_argument('--cola', type=str, help='Con --barrido: encolar los escenarios en este directorio compartido en lugar de ejecutarlos')
+    parser.add_argument('--trabajar-cola', type=str, help='Procesar escenarios del directorio de cola indicado (usa --workers procesos, no requiere base de datos)')
+    parser.add_argument('--recolectar-cola', type=str, help='Reunir los resultados del directorio de cola en una tabla comparativa')
+    parser.add_argument('--reencolar-segundos', type=int, help='Con --recolectar-cola: devolver a pendientes los escenarios tomados hace más de estos segundos')
+    parser.add_argument('--consolidar', action='store_true', help='Concentrar la carga de las aulas (--aulas-csv o todas las de los pabellones) en la menor cantidad de aulas')
+    parser.add_argument('--dias-consolidacion', type=str, help='Días a consolidar separados por coma (ej: SA,DO); por defecto todos')
+    parser.add_argument('--sin-refinamiento', action='store_true', help='Consolidación solo con primer ajuste decreciente, sin intentar cerrar más aulas')
+    parser.add_argument('--lexicografico', action='store_true', help='Resolver por etapas de tier (heurística): ubicar el tier 1, congelarlo, luego tier 2, etc.')
+    parser.add_argument('--agrupar-sesiones', choices=['estricto', 'flexible'], help='Mantener juntas en una misma aula las sesiones de un curso (mismo CLAVEEVENTO)')
+    parser.add_argument('--profundidad-cadenas', type=int, default=2, help='Pasos máximos de las cadenas de reubicación para conflictos (0 desactiva, default: 2)')
     
     args = parser.parse_args()
     
@@ -1169,14 +1587,105 @@ def main():
         'pabellon_codes': pabellon_codes,
         'ano': args.ano,
         'semestre': args.semestre,
-        'archivo_priorizacion': args.priorizacion
+        'archivo_priorizacion': args.priorizacion,
+        'portafolio': args.portafolio,
+        'presupuesto_segundos': args.presupuesto,
+        'workers': args.workers,
+        'profundidad_cadenas': args.profundidad_cadenas,
+        'agrupar_sesiones': args.agrupar_sesiones,
+        'lexicografico': args.lexicografico,
+        'pipeline': args.pipeline,
+        'prefetch': args.prefetch,
+        'resume': args.resume,
+        'dias_consolidacion': [d.strip().upper() for d in args.dias_consolidacion.split(',')] if args.dias_consolidacion else None,
+        'consolidacion_refinar': not args.sin_refinamiento,
+        'conexiones': args.conexiones,
+        'parquet': args.parquet,
+        'xlsx': args.xlsx,
+        'formato_plan': args.formato_plan,
+        'compresion': args.comprimir,
+        'historial': None if args.sin_historial else args.historial
     }
+    # Resolver la compresión una sola vez (avisa si falta zstandard)
+    configuracion['compresion'] = compresion_de(configuracion)
+    
+    # El historial se consulta y se carga sin base de datos
+    if args.ingestar_historial is not None:
+        print(f"\n=== INGESTA EN EL HISTORIAL {args.historial} ===")
+        ingestar_archivos(args.historial, args.ingestar_historial)
+        return
+    if args.buscar_historial:
+        try:
+            filtros = parsear_filtros(args.buscar_historial)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return
+        with HistorialPlanes(args.historial) as historial:
+            mostrar_busqueda(historial.buscar(**filtros), filtros.get('tabla', 'movimientos'))
+        return
+    
+    # Los reportes de un plan guardado se rehacen solo con el archivo, sin base de datos
+    if args.render:
+        reorganizador = ReorganizadorAutomatico(None)
+        for archivo in args.render:
+            reorganizador.renderizar_plan(archivo, configuracion)
+        return
+    
+    # Los trabajadores y la recolección de la cola solo usan la foto compartida, sin base de datos
+    if args.trabajar_cola:
+        procesados = trabajar_cola_en_procesos(args.trabajar_cola, args.workers or 1)
+        print(f"✅ {procesados} escenarios procesados desde {args.trabajar_cola}")
+        return
+    if args.recolectar_cola:
+        if args.reencolar_segundos is not None:
+            print(f"♻️  Escenarios reencolados: {reencolar_abandonados(args.recolectar_cola, args.reencolar_segundos)}")
+        print(f"📦 Estado de la cola: {estado_cola(args.recolectar_cola)}")
+        resultados = recolectar_resultados(args.recolectar_cola)
+        archivo_csv = f"barrido_parametros_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv{sufijo_compresion(configuracion)}"
+        exportar_comparacion(resultados, archivo_csv)
+        mostrar_comparacion(resultados)
+        print(f"📊 Tabla comparativa exportada: {archivo_csv}")
+        return
     
     connection = create_connection()
-    reorganizador = ReorganizadorAutomatico(connection)
+    reorganizador = ReorganizadorAutomatico(connection, ContextoEjecucion(connection, args.priorizacion))
     
     try:
-        if args.aula:
+        if args.ranking_liberacion:
+            reorganizador.rankear_aulas_a_liberar(configuracion)
+        
+        elif args.multicampus and args.aulas_csv:
+            fragmentos = cargar_fragmentos_desde_csv(args.aulas_csv, configuracion['campus_code'], configuracion['pabellon_codes'])
+            if fragmentos:
+                reorganizador.reorganizar_multicampus(fragmentos, configuracion)
+            else:
+                print("No se pudieron cargar aulas desde el archivo CSV.")
+        
+        elif args.barrido and (args.aula or args.aulas_csv):
+            aulas = [args.aula] if args.aula else cargar_aulas_desde_csv(args.aulas_csv)
+            if aulas:
+                escenarios = cargar_escenarios(args.barrido, configuracion['pabellon_codes'])
+                if args.cola:
+                    foto = reorganizador.construir_foto_barrido(aulas, escenarios, configuracion)
+                    if foto is not None:
+                        encolar_escenarios(args.cola, escenarios, foto)
+                else:
+                    reorganizador.barrer_parametros(aulas, escenarios, configuracion)
+            else:
+                print("No se pudieron cargar aulas desde el archivo CSV.")
+        
+        elif args.consolidar:
+            aulas = cargar_aulas_desde_csv(args.aulas_csv) if args.aulas_csv else None
+            reorganizador.consolidar_aulas(aulas, configuracion)
+        
+        elif args.solo_factibilidad and (args.aula or args.aulas_csv):
+            aulas = [args.aula] if args.aula else cargar_aulas_desde_csv(args.aulas_csv)
+            if aulas:
+                reorganizador.verificar_factibilidad_aulas(aulas, configuracion)
+            else:
+                print("No se pudieron cargar aulas desde el archivo CSV.")
+        
+        elif args.aula:
             if args.solo_catalogos:
                 # Generar solo catálogos de opciones
                 print(f"\n=== GENERANDO CATÁLOGOS PARA AULA {args.aula} ===")
@@ -1192,24 +1701,29 @@ def main():
                 timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
                 prefijo_archivo = f"catalogo_{args.aula}_{timestamp}"
                 
-                reorganizador.generador.exportar_catalogo_completo_opciones(
-                    movimientos_posibles, 
-                    f"{prefijo_archivo}_completo.csv"
-                )
+                sufijo = sufijo_compresion(configuracion)
                 
-                reorganizador.generador.exportar_catalogo_resumido(
+                reorganizador.generador.exportar_catalogos(
                     movimientos_posibles, 
-                    f"{prefijo_archivo}_resumido.csv"
+                    f"{prefijo_archivo}_completo.csv{sufijo}",
+                    f"{prefijo_archivo}_resumido.csv{sufijo}",
+                    f"{prefijo_archivo}_completo.parquet" if salida_parquet_habilitada(configuracion) else None,
+                    ruta_historial(configuracion),
+                    f"{prefijo_archivo}.xlsx" if salida_xlsx_habilitada(configuracion) else None
                 )
                 
                 print(f"\n✅ Catálogos generados:")
-                print(f"   📋 {prefijo_archivo}_completo.csv (TODAS las opciones disponibles)")
-                print(f"   📊 {prefijo_archivo}_resumido.csv (Resumen con estadísticas)")
+                print(f"   📋 {prefijo_archivo}_completo.csv{sufijo} (TODAS las opciones disponibles)")
+                print(f"   📊 {prefijo_archivo}_resumido.csv{sufijo} (Resumen con estadísticas)")
                 print(f"   ⚠️  Los cursos sin opciones aparecen como '❌ NO HAY AULAS DISPONIBLES'")
             else:
                 # Reorganizar una aula específica
                 reorganizador.reorganizar_aula(args.aula, configuracion)
         
+        elif args.resume:
+            # Reanudar una reorganización múltiple interrumpida (las aulas salen del diario)
+            reorganizador.reorganizar_multiples_aulas([], configuracion)
+        
         elif args.aulas_csv:
             # Reorganizar múltiples aulas desde CSV
             aulas = cargar_aulas_desde_csv(args.aulas_csv)
@@ -1280,19 +1794,20 @@ def main():
                     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
                     prefijo_archivo = f"catalogo_{aula}_{timestamp}"
                     
-                    reorganizador.generador.exportar_catalogo_completo_opciones(
-                        movimientos_posibles, 
-                        f"{prefijo_archivo}_completo.csv"
-                    )
+                    sufijo = sufijo_compresion(configuracion)
                     
-                    reorganizador.generador.exportar_catalogo_resumido(
+                    reorganizador.generador.exportar_catalogos(
                         movimientos_posibles, 
-                        f"{prefijo_archivo}_resumido.csv"
+                        f"{prefijo_archivo}_completo.csv{sufijo}",
+                        f"{prefijo_archivo}_resumido.csv{sufijo}",
+                        f"{prefijo_archivo}_completo.parquet" if salida_parquet_habilitada(configuracion) else None,
+                        ruta_historial(configuracion),
+                        f"{prefijo_archivo}.xlsx" if salida_xlsx_habilitada(configuracion) else None
                     )
                     
                     print(f"\n✅ Catálogos generados:")
-                    print(f"   📋 {prefijo_archivo}_completo.csv (TODAS las opciones disponibles)")
-                    print(f"   📊 {prefijo_archivo}_resumido.csv (Resumen con estadísticas)")
+                    print(f"   📋 {prefijo_archivo}_completo.csv{sufijo} (TODAS las opciones disponibles)")
+                    print(f"   📊 {prefijo_archivo}_resumido.csv{sufijo} (Resumen con estadísticas)")
                     print(f"   ⚠️  Los cursos sin opciones aparecen como '❌ NO HAY AULAS DISPONIBLES'")
                 else:
                     print("Código de aula no válido.")
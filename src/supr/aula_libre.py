@@ -1,5 +1,6 @@
 from src.db.connection import create_connection
 from src.logic.aula_logic import AulaLogic
+from src.compresion import abrir_salida
 
 import csv
 
@@ -14,7 +15,7 @@ def exportar_aulas_libres(aula_logic, campus_code, pabellon_codes, ano, semestre
             else:
                 print(f"{bloque['dia']} {bloque['inicio']}-{bloque['fin']}")
     # Exportar a CSV
-    with open(output_csv, 'w', newline='', encoding='utf-8') as csvfile:
+    with abrir_salida(output_csv) as csvfile:
         writer = csv.writer(csvfile)
         writer.writerow(['Aula Codigo', 'Aula Nombre', 'Capacidad', 'Dia', 'Hora Inicio', 'Hora Fin'])
         for (aula_codigo, aula_nombre, capacidad), bloques in libres.items():
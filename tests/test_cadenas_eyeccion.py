@@ -0,0 +1,50 @@
+import unittest
+
+from src.cadenas_eyeccion import BuscadorCadenas, proponer_cadenas
+
+# Aulas: A (30) libre, B (60) con un curso de OFERTA que necesita 25 y C (100)
+# con una separación (no se mueve). El curso a ubicar necesita 50: solo entra en B
+# si el curso de B pasa a A, una cadena de dos pasos.
+AULAS_OCUPADAS = {
+    ('A', 'AULA A', 30): [],
+    ('B', 'AULA B', 60): [{'dia': 'LU', 'inicio': '08:00', 'fin': '09:30', 'origen': 'OFERTA'}],
+    ('C', 'AULA C', 100): [{'dia': 'LU', 'inicio': '08:00', 'fin': '09:30', 'origen': 'SEPARACIONAULA'}],
+}
+OCUPACIONES = {
+    'B': [{'CODIGODIA': 'LU', 'HORAINICIO': '08:00', 'HORAFIN': '09:30', 'CAPACIDADMAXIMA': 25}],
+}
+OCUPACION = {
+    'CODIGODIA': 'LU', 'HORAINICIO': '08:00', 'HORAFIN': '09:30',
+    'CAPACIDADMAXIMA': 50, 'ORIGEN': 'OFERTA', 'NOMBRE_CURSO': 'CURSO X'
+}
+
+
+def _buscador(ocupaciones_de):
+    return BuscadorCadenas(AULAS_OCUPADAS, profundidad_maxima=2, ocupaciones_de=ocupaciones_de)
+
+
+class TestBuscadorCadenas(unittest.TestCase):
+    def test_cadena_de_dos_pasos(self):
+        cadena = _buscador(lambda codigo: OCUPACIONES.get(codigo, [])).buscar(OCUPACION, 'O')
+        self.assertIsNotNone(cadena)
+        self.assertEqual(
+            [(paso['aula_origen'], paso['aula_destino'], paso['curso']) for paso in cadena],
+            [('B', 'A', None), ('O', 'B', 'CURSO X')]
+        )
+
+    def test_sin_requerimiento_usa_la_capacidad_del_aula(self):
+        # Sin las ocupaciones, el curso de B debe caber en 60: no hay cadena posible
+        self.assertIsNone(_buscador(None).buscar(OCUPACION, 'O'))
+
+    def test_proponer_cadenas_reserva_los_pasos(self):
+        buscador = _buscador(lambda codigo: OCUPACIONES.get(codigo, []))
+        plan = {'conflictos': [{'ocupacion': OCUPACION, 'prioridad': {'tier': 1}, 'tipo': 'SIN_DESTINO'}]}
+        self.assertEqual(proponer_cadenas(buscador, plan, 'O'), 1)
+        self.assertFalse(buscador.reservas.esta_libre('A', 'LU', '08:00', '09:30'))
+        self.assertFalse(buscador.reservas.esta_libre('B', 'LU', '08:00', '09:30'))
+        # El curso desplazado ya no ocupa B en el índice de la base
+        self.assertEqual(buscador.ocupados.cruces('B', 'LU', '08:00', '09:30'), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from src import cola_escenarios
+from src.cola_escenarios import (
+    _tomar_escenario, encolar_escenarios, estado_cola, reencolar_abandonados, trabajar_cola
+)
+
+FOTO = {'libres_por_pabellon': {}, 'ocupaciones_por_aula': [], 'tablas_priorizacion': {}}
+
+
+class TestColaEscenarios(unittest.TestCase):
+    def setUp(self):
+        self.directorio = tempfile.TemporaryDirectory()
+        self.cola = self.directorio.name
+
+    def tearDown(self):
+        self.directorio.cleanup()
+
+    def _en_proceso(self):
+        return sorted(os.listdir(os.path.join(self.cola, 'en_proceso')))
+
+    def test_cada_escenario_se_toma_una_sola_vez(self):
+        encolar_escenarios(self.cola, [{'umbral': i} for i in range(40)], FOTO)
+        tomados = []
+        candado = threading.Lock()
+
+        def trabajador(id_trabajador):
+            while True:
+                tomado = _tomar_escenario(self.cola, id_trabajador)
+                if tomado is None:
+                    return
+                with candado:
+                    tomados.append(tomado[1]['numero'])
+
+        hilos = [threading.Thread(target=trabajador, args=(f't{i}',)) for i in range(8)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        self.assertEqual(sorted(tomados), list(range(40)))
+        self.assertEqual(estado_cola(self.cola)['pendientes'], 0)
+        self.assertEqual(estado_cola(self.cola)['en_proceso'], 40)
+
+    def test_tomar_marca_la_hora(self):
+        encolar_escenarios(self.cola, [{'umbral': 0}], FOTO)
+        pendiente = os.path.join(self.cola, 'pendientes', '00000.json')
+        os.utime(pendiente, (0, 0))
+        ruta, trabajo = _tomar_escenario(self.cola, 'h1-10')
+        self.assertEqual(os.path.basename(ruta), '00000.h1-10.json')
+        self.assertEqual(trabajo, {'numero': 0, 'escenario': {'umbral': 0}})
+        # Un escenario que esperó mucho en pendientes no parece abandonado al tomarlo
+        self.assertEqual(reencolar_abandonados(self.cola, 60), 0)
+
+    def test_reencolar_abandonados(self):
+        encolar_escenarios(self.cola, [{'umbral': 0}, {'umbral': 1}], FOTO)
+        abandonado, _ = _tomar_escenario(self.cola, 'h1-10')
+        _tomar_escenario(self.cola, 'h2-20')
+        hace_una_hora = time.time() - 3600
+        os.utime(abandonado, (hace_una_hora, hace_una_hora))
+
+        self.assertEqual(reencolar_abandonados(self.cola, 60), 1)
+        self.assertEqual(os.listdir(os.path.join(self.cola, 'pendientes')), ['00000.json'])
+        self.assertEqual(self._en_proceso(), ['00001.h2-20.json'])
+
+        # Otro trabajador lo retoma con el mismo número
+        _, trabajo = _tomar_escenario(self.cola, 'h3-30')
+        self.assertEqual(trabajo['numero'], 0)
+
+    def test_trabajar_cola_tolera_escenario_reencolado(self):
+        encolar_escenarios(self.cola, [{'umbral': 0}, {'umbral': 1}], FOTO)
+
+        def evaluar(escenario, foto):
+            if escenario['umbral'] == 1:
+                raise ValueError('sin aulas')
+            # Mientras se evalúa, el coordinador lo da por abandonado y lo toma otro trabajador
+            self.assertEqual(reencolar_abandonados(self.cola, -1), 1)
+            self.assertEqual(_tomar_escenario(self.cola, 'h2-20')[1]['numero'], 0)
+            return {'umbral': escenario['umbral']}
+
+        with mock.patch.object(cola_escenarios, 'evaluar_escenario', evaluar):
+            self.assertEqual(trabajar_cola(self.cola, 'h1-10'), 2)
+
+        self.assertEqual(estado_cola(self.cola), {'pendientes': 0, 'en_proceso': 1, 'resultados': 1, 'fallidos': 1})
+        self.assertEqual(self._en_proceso(), ['00000.h2-20.json'])
+        self.assertEqual(cola_escenarios.recolectar_resultados(self.cola), [{'umbral': 0, 'trabajador': 'h1-10'}])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import unittest
+
+from src.consolidacion_aulas import PlanificadorConsolidacion, cota_minima_aulas
+from src.logic.indice_reservas import hora_a_minutos
+
+
+def _ocupacion(inicio, fin, capacidad, dia='LU', curso='C'):
+    return {'CODIGODIA': dia, 'HORAINICIO': inicio, 'HORAFIN': fin, 'CAPACIDADMAXIMA': capacidad, 'NOMBRE_CURSO': curso}
+
+
+def _sesion(inicio, fin, capacidad, dia='LU'):
+    return {'ocupacion': _ocupacion(inicio, fin, capacidad, dia), 'capacidad': capacidad}
+
+
+def _score(capacidad_aula, capacidad_requerida):
+    return 100 - (capacidad_aula - capacidad_requerida)
+
+
+class TestCotaMinimaAulas(unittest.TestCase):
+    def test_simultaneas(self):
+        sesiones = [_sesion('08:00', '09:30', 50), _sesion('08:00', '09:30', 50), _sesion('09:00', '10:00', 20)]
+        self.assertEqual(cota_minima_aulas(sesiones), 3)
+
+    def test_intervalos_que_se_tocan_no_se_cruzan(self):
+        sesiones = [_sesion('08:00', '09:00', 50), _sesion('09:00', '10:00', 50)]
+        self.assertEqual(cota_minima_aulas(sesiones), 1)
+
+    def test_umbral_de_capacidad(self):
+        # Con umbral 20 se cruzan a lo sumo dos sesiones; con 50 nunca
+        sesiones = [_sesion('08:00', '09:00', 50), _sesion('09:00', '10:00', 50), _sesion('08:00', '10:00', 20)]
+        self.assertEqual(cota_minima_aulas(sesiones), 2)
+
+    def test_dias_distintos_no_se_suman(self):
+        sesiones = [_sesion('08:00', '09:00', 30), _sesion('08:00', '09:00', 30, dia='MA')]
+        self.assertEqual(cota_minima_aulas(sesiones), 1)
+
+    def test_sin_sesiones(self):
+        self.assertEqual(cota_minima_aulas([]), 0)
+
+
+class TestPlanificadorConsolidacion(unittest.TestCase):
+    def _verificar(self, planificador, asignacion, abiertas):
+        reservas = {}
+        for i, codigo in asignacion.items():
+            sesion = planificador.sesiones[i]
+            ocupacion = sesion['ocupacion']
+            self.assertIn(codigo, abiertas)
+            self.assertGreaterEqual(planificador.aulas[codigo][1], sesion['capacidad'])
+            reservas.setdefault((codigo, ocupacion['CODIGODIA']), []).append(
+                (hora_a_minutos(ocupacion['HORAINICIO']), hora_a_minutos(ocupacion['HORAFIN']))
+            )
+        for bloques in reservas.values():
+            bloques.sort()
+            for (_, fin), (inicio, _) in zip(bloques, bloques[1:]):
+                self.assertLessEqual(fin, inicio)
+
+    def test_concentra_en_una_aula(self):
+        aulas = {'A': ('AULA A', 60), 'B': ('AULA B', 60), 'C': ('AULA C', 30)}
+        ocupaciones = [
+            ('A', [_ocupacion('08:00', '09:00', 40)]),
+            ('B', [_ocupacion('10:00', '11:00', 40)]),
+            ('C', [_ocupacion('12:00', '13:00', 20)])
+        ]
+        planificador = PlanificadorConsolidacion(aulas, ocupaciones, _score)
+        self.assertEqual(planificador.cota_minima, 1)
+
+        asignacion, abiertas, sin_aula = planificador.planificar()
+        self.assertEqual(len(abiertas), 1)
+        self.assertEqual(sin_aula, [])
+        self.assertEqual(len(asignacion), 3)
+        self._verificar(planificador, asignacion, abiertas)
+        # Las sesiones del aula que queda abierta no se mueven
+        self.assertEqual(planificador._movimientos(asignacion), 2)
+
+    def test_respeta_capacidad_y_cruces(self):
+        aulas = {'A': ('AULA A', 100), 'B': ('AULA B', 50), 'C': ('AULA C', 50), 'D': ('AULA D', 30)}
+        ocupaciones = [
+            ('A', [_ocupacion('08:00', '10:00', 90), _ocupacion('10:00', '12:00', 45)]),
+            ('B', [_ocupacion('09:00', '11:00', 45), _ocupacion('08:00', '09:00', 25)]),
+            ('C', [_ocupacion('11:00', '12:00', 45), _ocupacion('09:00', '10:00', 25)]),
+            ('D', [_ocupacion('14:00', '15:00', 25)])
+        ]
+        planificador = PlanificadorConsolidacion(aulas, ocupaciones, _score)
+        asignacion, abiertas, sin_aula = planificador.planificar()
+        self.assertEqual(sin_aula, [])
+        # A las 09:00 hay tres sesiones de al menos 25 a la vez: tres aulas bastan y hacen falta
+        self.assertEqual(planificador.cota_minima, 3)
+        self.assertEqual(len(abiertas), 3)
+        self._verificar(planificador, asignacion, abiertas)
+
+        sin_refinar = PlanificadorConsolidacion(aulas, ocupaciones, _score).planificar(refinar=False)[1]
+        self.assertLessEqual(len(abiertas), len(sin_refinar))
+
+    def test_sesion_sin_aula_con_capacidad(self):
+        aulas = {'A': ('AULA A', 40)}
+        ocupaciones = [('A', [_ocupacion('08:00', '09:00', 30), _ocupacion('10:00', '11:00', 80, curso='GRANDE')])]
+        planificador = PlanificadorConsolidacion(aulas, ocupaciones, _score)
+        asignacion, abiertas, sin_aula = planificador.planificar()
+        self.assertEqual(sin_aula, [1])
+        self.assertEqual(asignacion, {0: 'A'})
+
+        planes = planificador.construir_resultados(asignacion, sin_aula, lambda ocupacion: {'tier': 1, 'peso': 4})
+        self.assertEqual(planes['A']['movimientos'], [])
+        self.assertEqual([c['tipo'] for c in planes['A']['conflictos']], ['SIN_AULA_CON_CAPACIDAD'])
+
+    def test_filtra_dias(self):
+        aulas = {'A': ('AULA A', 40)}
+        ocupaciones = [('A', [_ocupacion('08:00', '09:00', 30), _ocupacion('08:00', '09:00', 30, dia='MA')])]
+        planificador = PlanificadorConsolidacion(aulas, ocupaciones, _score, dias=['LU'])
+        self.assertEqual(len(planificador.sesiones), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import os
+import tempfile
+import unittest
+
+from src.diario_checkpoint import DiarioCheckpoint
+
+
+def _resultado(aula):
+    return {'aula': aula, 'exito': True, 'movimientos': 1}
+
+
+class TestDiarioCheckpoint(unittest.TestCase):
+    def setUp(self):
+        self.directorio = tempfile.TemporaryDirectory()
+        self.ruta = os.path.join(self.directorio.name, 'corrida.checkpoint.jsonl')
+        self.diario = DiarioCheckpoint(self.ruta)
+
+    def tearDown(self):
+        self.directorio.cleanup()
+
+    def _registrar_dos_aulas(self):
+        self.diario.registrar_inicio(['A1', 'A2', 'Ñ3'], 'plan', {'umbral': 50})
+        self.diario.registrar_aula(0, _resultado('A1'), [{'aula_destino': 'B1'}])
+        self.diario.registrar_aula(1, _resultado('A2'), [])
+
+    def test_sin_archivo(self):
+        self.assertEqual(self.diario.cargar(), (None, {}))
+
+    def test_carga_inicio_y_aulas(self):
+        self._registrar_dos_aulas()
+        inicio, completadas = self.diario.cargar()
+        self.assertEqual(inicio['aulas'], ['A1', 'A2', 'Ñ3'])
+        self.assertEqual(inicio['configuracion'], {'umbral': 50})
+        self.assertEqual(sorted(completadas), [0, 1])
+        self.assertEqual(completadas[0]['movimientos'], [{'aula_destino': 'B1'}])
+
+    def test_ultima_linea_cortada(self):
+        self._registrar_dos_aulas()
+        self.diario.registrar_aula(2, _resultado('Ñ3'), [])
+        with open(self.ruta, 'rb') as archivo:
+            contenido = archivo.read()
+        # Se corta la última línea en varios puntos, incluso a mitad de la Ñ
+        inicio_ultima = contenido.rindex(b'\n', 0, len(contenido) - 1) + 1
+        for corte in range(inicio_ultima + 1, len(contenido) - 1):
+            with open(self.ruta, 'wb') as archivo:
+                archivo.write(contenido[:corte])
+            inicio, completadas = self.diario.cargar()
+            self.assertEqual(inicio['prefijo_archivo'], 'plan')
+            self.assertEqual(sorted(completadas), [0, 1])
+
+    def test_descartar(self):
+        self._registrar_dos_aulas()
+        self.diario.descartar()
+        self.assertFalse(os.path.exists(self.ruta))
+        self.diario.descartar()
+        self.assertEqual(self.diario.cargar(), (None, {}))
+
+
+if __name__ == '__main__':
+    unittest.main()
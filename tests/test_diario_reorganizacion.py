@@ -0,0 +1,97 @@
+import json
+import os
+import tempfile
+import unittest
+
+from src.reorganizador.diario_reorganizacion import DiarioReorganizacion
+
+AULA_A = ['A', 'AULA A', 40]
+AULA_B = ['B', 'AULA B', 60]
+
+
+def _movimiento(curso, inicio, fin, aula):
+    return {
+        'aula_origen': 'X',
+        'oferta': {'NOMBRE_CURSO': curso, 'CODIGODIA': 'LU', 'HORAINICIO': inicio, 'HORAFIN': fin},
+        'aula_sugerida': aula
+    }
+
+
+class TestDiarioReorganizacion(unittest.TestCase):
+    def setUp(self):
+        self.directorio = tempfile.TemporaryDirectory()
+        self.ruta = os.path.join(self.directorio.name, 'prueba.jsonl')
+
+    def tearDown(self):
+        self.directorio.cleanup()
+
+    def _lineas(self):
+        with open(self.ruta, encoding='utf-8') as archivo:
+            return [json.loads(linea) for linea in archivo]
+
+    def test_reproduce_configuracion_e_indice(self):
+        diario = DiarioReorganizacion(self.ruta)
+        diario.liberar_aula('X')
+        diario.agregar_movimiento(_movimiento('C1', '08:00', '09:30', AULA_A))
+        diario.agregar_movimiento(_movimiento('C2', '10:00', '11:30', AULA_A))
+        diario.aprobar(0)
+        diario.rechazar(1)
+
+        reabierto = DiarioReorganizacion(self.ruta)
+        self.assertEqual(reabierto.config, diario.config)
+        self.assertEqual(reabierto.ocupaciones_ficticias, {('A', 'LU'): [('08:00', '09:30'), ('10:00', '11:30')]})
+
+    def test_reasignar_conserva_la_sugerencia(self):
+        diario = DiarioReorganizacion(self.ruta)
+        diario.agregar_movimiento(_movimiento('C1', '08:00', '09:30', AULA_A))
+        diario.reasignar(0, AULA_B)
+        self.assertEqual(diario.config['movimientos'][0]['aula_sugerida'], AULA_B)
+        self.assertEqual(diario.config['sugerencias'][0]['aula_sugerida'], AULA_A)
+        self.assertEqual(diario.ocupaciones_ficticias, {('B', 'LU'): [('08:00', '09:30')]})
+
+        reabierto = DiarioReorganizacion(self.ruta)
+        self.assertEqual(reabierto.config, diario.config)
+
+        # La compactación deja el movimiento final y la sugerencia original, sin la reasignación
+        reabierto.reescribir()
+        self.assertEqual([registro['tipo'] for registro in self._lineas()], ['movimiento', 'sugerencia'])
+        self.assertEqual(DiarioReorganizacion(self.ruta).config, diario.config)
+
+    def test_compactar_migra_un_json(self):
+        movimiento = _movimiento('C1', '08:00', '09:30', AULA_A)
+        config = {
+            'movimientos': [movimiento, dict(movimiento)],
+            'aulas_liberadas': ['X'],
+            'sugerencias': [movimiento],
+            'aprobados': [movimiento],
+            'rechazados': []
+        }
+        diario = DiarioReorganizacion(self.ruta)
+        diario.reescribir(json.loads(json.dumps(config)))
+        self.assertEqual(diario.config, config)
+        self.assertEqual(DiarioReorganizacion(self.ruta).config, config)
+
+    def test_indice_invalido_no_llega_al_disco(self):
+        diario = DiarioReorganizacion(self.ruta)
+        diario.agregar_movimiento(_movimiento('C1', '08:00', '09:30', AULA_A))
+        for indice in (7, -1):
+            with self.assertRaises(IndexError):
+                diario.aprobar(indice)
+        self.assertEqual(len(self._lineas()), 1)
+        self.assertEqual(len(DiarioReorganizacion(self.ruta).config['movimientos']), 1)
+
+    def test_reproduccion_descarta_registros_invalidos_y_lineas_cortadas(self):
+        diario = DiarioReorganizacion(self.ruta)
+        diario.agregar_movimiento(_movimiento('C1', '08:00', '09:30', AULA_A))
+        with open(self.ruta, 'a', encoding='utf-8') as archivo:
+            archivo.write(json.dumps({'tipo': 'aprobado', 'indice': 7}) + '\n')
+            archivo.write('{"tipo": "rechaz')
+
+        reabierto = DiarioReorganizacion(self.ruta)
+        self.assertEqual(len(reabierto.config['movimientos']), 1)
+        self.assertEqual(reabierto.config['aprobados'], [])
+        self.assertEqual(reabierto.config['rechazados'], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
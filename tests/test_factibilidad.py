@@ -0,0 +1,58 @@
+import unittest
+
+from src.factibilidad import verificar_factibilidad
+
+
+def _ocupacion(inicio, fin, capacidad, dia='LU'):
+    return {'CODIGODIA': dia, 'HORAINICIO': inicio, 'HORAFIN': fin, 'CAPACIDADMAXIMA': capacidad}
+
+
+def _libres(*capacidades, dia='LU', inicio='07:00', fin='13:00'):
+    return {
+        (f'L{i}', f'AULA L{i}', capacidad): [{'dia': dia, 'inicio': inicio, 'fin': fin}]
+        for i, capacidad in enumerate(capacidades)
+    }
+
+
+class TestVerificarFactibilidad(unittest.TestCase):
+    def test_franja_sobresuscrita_por_capacidad(self):
+        # Dos cursos de 50 y uno de 20 a la vez, con un aula de 60 y otra de 30:
+        # hay aulas para tres cursos, pero solo una sirve para los de 50
+        ocupaciones = [_ocupacion('08:00', '09:30', 50), _ocupacion('08:00', '09:30', 50), _ocupacion('08:00', '09:30', 20)]
+        resultado = verificar_factibilidad(ocupaciones, _libres(60, 30))
+        self.assertEqual(resultado['cota_minima_conflictos'], 1)
+        self.assertFalse(resultado['factible'])
+        self.assertEqual(resultado['franjas_sobresuscritas'], [{
+            'dia': 'LU', 'hora': '08:00', 'capacidad_umbral': 50, 'demanda': 2, 'oferta': 1, 'deficit': 1
+        }])
+
+    def test_sin_deficit(self):
+        ocupaciones = [_ocupacion('08:00', '09:30', 50), _ocupacion('09:30', '11:00', 50)]
+        resultado = verificar_factibilidad(ocupaciones, _libres(60))
+        self.assertEqual(resultado['cota_minima_conflictos'], 0)
+        self.assertTrue(resultado['factible'])
+
+    def test_franjas_con_una_ocupacion_en_comun_no_se_suman(self):
+        # El curso largo está en las dos franjas: basta dejarlo fuera a él
+        ocupaciones = [_ocupacion('08:00', '12:00', 50), _ocupacion('08:00', '09:00', 50), _ocupacion('10:00', '11:00', 50)]
+        resultado = verificar_factibilidad(ocupaciones, _libres(60))
+        self.assertEqual(len(resultado['franjas_sobresuscritas']), 2)
+        self.assertEqual(resultado['cota_minima_conflictos'], 1)
+
+    def test_franjas_disjuntas_y_dias_se_suman(self):
+        ocupaciones = [
+            _ocupacion('08:00', '09:00', 50), _ocupacion('08:00', '09:00', 50),
+            _ocupacion('10:00', '11:00', 50), _ocupacion('10:00', '11:00', 50),
+            _ocupacion('08:00', '09:00', 20, dia='MA')
+        ]
+        resultado = verificar_factibilidad(ocupaciones, _libres(60))
+        # Martes no tiene bloques libres
+        self.assertEqual(resultado['cota_minima_conflictos'], 3)
+
+    def test_bloque_libre_fuera_de_horario(self):
+        ocupaciones = [_ocupacion('14:00', '15:00', 20)]
+        self.assertEqual(verificar_factibilidad(ocupaciones, _libres(60))['cota_minima_conflictos'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+import copy
+import json
+import os
+import tempfile
+import unittest
+
+from src.formato_plan import (
+    agregar_aula_adicional, archivo_adicionales, compactar_plan, expandir_plan,
+    formato_archivo_plan, guardar_plan, integrar_adicionales, leer_plan
+)
+
+
+def _ocupacion(curso, inicio, fin):
+    return {'CODIGODIA': 'LU', 'HORAINICIO': inicio, 'HORAFIN': fin, 'NOMBRE_CURSO': curso, 'CAPACIDADMAXIMA': 40}
+
+
+def _solucion(aula_origen, aula_destino, capacidad=60):
+    prioridad = {'tier': 1, 'peso': 4, 'nombre_curso': 'C1'}
+    aula = {'codigo': aula_destino, 'nombre': f'AULA {aula_destino}', 'capacidad': capacidad}
+    return {
+        'aula_origen': aula_origen,
+        'fecha_generacion': '2025-09-02T15:54:48',
+        'plan_movimientos': {
+            'movimientos': [
+                {
+                    'ocupacion': _ocupacion('C1', '08:00', '09:30'),
+                    'prioridad': prioridad,
+                    'aula_destino': dict(aula, score=95.5, bloque_libre={'inicio': '07:00', 'fin': '12:00'}),
+                    'score': 95.5
+                },
+                {
+                    'ocupacion': _ocupacion('C2', '10:00', '11:30'),
+                    'prioridad': prioridad,
+                    'aula_destino': dict(aula, score=80),
+                    'score': 80,
+                    'aula_origen': aula_origen,
+                    'cadena': [{'aula_origen': 'X', 'aula_destino': 'Y'}]
+                }
+            ],
+            'conflictos': [
+                {
+                    'ocupacion': _ocupacion('C3', '08:00', '09:30'),
+                    'prioridad': {'tier': 2, 'peso': 3, 'nombre_curso': 'C3'},
+                    'tipo': 'TODAS_LAS_AULAS_OCUPADAS',
+                    'aulas_candidatas': [dict(aula, score=70)]
+                }
+            ],
+            'aulas_utilizadas': [aula_destino]
+        },
+        'estadisticas': {'total_movimientos': 2, 'total_conflictos': 1},
+        'es_valida': True
+    }
+
+
+def _consolidado():
+    return {
+        'tipo': 'consolidado',
+        'resultados': [
+            {'aula_origen': 'A1', 'exito': True, 'error': None, 'solucion': _solucion('A1', 'B1')},
+            {'aula_origen': 'A2', 'exito': True, 'error': None, 'solucion': _solucion('A2', 'B1')},
+            {'aula_origen': 'A3', 'exito': False, 'error': 'sin ocupaciones', 'solucion': None}
+        ],
+        'aulas_procesadas': 3
+    }
+
+
+class TestCompactacion(unittest.TestCase):
+    def test_ida_y_vuelta(self):
+        for documento in (_solucion('A1', 'B1'), _consolidado()):
+            original = copy.deepcopy(documento)
+            normalizado = json.loads(json.dumps(compactar_plan(documento)))
+            self.assertEqual(expandir_plan(normalizado), original)
+
+    def test_registros_repetidos_se_guardan_una_vez(self):
+        tablas = compactar_plan(_consolidado())['tablas']
+        # B1 con los mismos datos en los dos planes (el score va en la referencia)
+        self.assertEqual(len(tablas['aulas']['filas']), 1)
+        self.assertEqual(len(tablas['prioridades']['filas']), 2)
+
+    def test_valores_iguales_de_distinto_tipo_no_se_mezclan(self):
+        documento = _consolidado()
+        documento['resultados'][1]['solucion'] = _solucion('A2', 'B1', capacidad=60.0)
+        normalizado = json.loads(json.dumps(compactar_plan(documento)))
+        expandido = expandir_plan(normalizado)
+        capacidades = [
+            type(r['solucion']['plan_movimientos']['movimientos'][0]['aula_destino']['capacidad'])
+            for r in expandido['resultados'][:2]
+        ]
+        self.assertEqual(capacidades, [int, float])
+
+    def test_version_futura(self):
+        normalizado = compactar_plan(_solucion('A1', 'B1'))
+        normalizado['version'] += 1
+        with self.assertRaises(ValueError):
+            expandir_plan(normalizado)
+
+
+class TestArchivosPlan(unittest.TestCase):
+    def setUp(self):
+        self.directorio = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directorio.cleanup()
+
+    def _ruta(self, nombre):
+        return os.path.join(self.directorio.name, nombre)
+
+    def test_guardar_y_leer_en_cada_formato(self):
+        documento = _consolidado()
+        for formato, nombre in (('normalizado', 'plan.json'), ('legado', 'legado.json'), ('normalizado', 'plan.json.gz')):
+            ruta = self._ruta(nombre)
+            guardar_plan(documento, ruta, formato)
+            self.assertEqual(formato_archivo_plan(ruta), formato)
+            self.assertEqual(leer_plan(ruta), (documento, formato))
+
+    def test_json_legado_escrito_a_mano(self):
+        ruta = self._ruta('viejo.json')
+        with open(ruta, 'w', encoding='utf-8') as archivo:
+            json.dump(_solucion('A1', 'B1'), archivo, indent=2)
+        self.assertEqual(leer_plan(ruta), (_solucion('A1', 'B1'), 'legado'))
+
+    def test_aulas_adicionales_en_el_sidecar(self):
+        ruta = self._ruta('plan.json')
+        guardar_plan(_solucion('A1', 'B1'), ruta)
+        agregar_aula_adicional(ruta, _solucion('A2', 'B2'))
+        agregar_aula_adicional(ruta, _solucion('A3', 'B3'))
+        # Corte a mitad de la última escritura
+        with open(archivo_adicionales(ruta), 'ab') as sidecar:
+            sidecar.write(b'{"formato": "plan_norm')
+
+        documento, _ = leer_plan(ruta)
+        self.assertEqual([a['aula_origen'] for a in documento['aulas_adicionales']], ['A2', 'A3'])
+        self.assertEqual(documento['aulas_adicionales'][0]['solucion'], _solucion('A2', 'B2'))
+        self.assertEqual(documento['estadisticas_consolidadas']['total_movimientos_exitosos'], 4)
+        self.assertNotIn('aulas_adicionales', leer_plan(ruta, con_adicionales=False)[0])
+
+        self.assertEqual(integrar_adicionales(ruta), 2)
+        self.assertFalse(os.path.exists(archivo_adicionales(ruta)))
+        self.assertEqual(leer_plan(ruta)[0], documento)
+
+
+if __name__ == '__main__':
+    unittest.main()